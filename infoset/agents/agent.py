@@ -12,9 +12,11 @@ Description:
 # Standard libraries
 import os
 import sys
-import json
+import socket
 import logging
 import time
+import threading
+from concurrent import futures
 from collections import defaultdict
 import hashlib
 from random import random
@@ -28,11 +30,38 @@ from infoset.utils import hidden
 from infoset.utils import Daemon
 from infoset.utils import log
 from infoset.utils import jm_general
+from infoset.utils import codec
+from infoset.utils import pool
 
 
 logging.getLogger('requests').setLevel(logging.WARNING)
 logging.basicConfig(level=logging.DEBUG)
 
+# Seconds to wait before the first retry of a failed post, and the most
+# to wait before any retry
+_BACKOFF = 1
+_MAX_BACKOFF = 30
+
+# HTTP sessions are kept for the life of the process, one per thread, so
+# that connections to the server are reused by every Agent object
+_SESSIONS = threading.local()
+
+# Only one thread may purge the cache directory at a time
+_PURGE_LOCK = threading.Lock()
+
+# Threads polling hosts are kept for the life of the process, one pool per
+# agent name. The hosts being polled are tracked so that hosts still being
+# polled from a previous cycle aren't polled again
+_POLL_LOCK = threading.Lock()
+_POLL_POOLS = {}
+_POLLING = defaultdict(set)
+
+# Statistics reported as agent datapoints. Post statistics are keyed by
+# agent UID, and poll overruns by agent name
+_STATS_LOCK = threading.Lock()
+_POST_STATS = defaultdict(lambda: {'latency': None, 'retries': 0})
+_OVERRUNS = defaultdict(int)
+
 
 class Agent(object):
     """Infoset agent that gathers data.
@@ -78,10 +107,32 @@ class Agent(object):
             prefix = 'https://'
         else:
             prefix = 'http://'
-        self.url = (
-            '%s%s:%s/receive/%s') % (
+        self.server = (
+            '%s%s:%s') % (
                 prefix, self.config.server_name(),
-                self.config.server_port(), uid)
+                self.config.server_port())
+        self.url = ('%s/receive/%s') % (self.server, uid)
+
+        # Encode posts using the configured content type if possible
+        self.content_type = self.config.server_content_type()
+        if codec.supported(self.content_type) is False:
+            log_message = (
+                'Content type %s is not supported. Using %s'
+                '') % (self.content_type, codec.JSON)
+            log.log2warn(1067, log_message)
+            self.content_type = codec.JSON
+
+        # Compress posts using the configured content encoding if possible
+        self.content_encoding = self.config.server_content_encoding()
+        if codec.encoding_supported(self.content_encoding) is False:
+            log_message = (
+                'Content encoding %s is not supported. Using %s'
+                '') % (self.content_encoding, codec.IDENTITY)
+            log.log2warn(1069, log_message)
+            self.content_encoding = codec.IDENTITY
+        self.headers = {'Content-Type': self.content_type}
+        if self.content_encoding != codec.IDENTITY:
+            self.headers['Content-Encoding'] = self.content_encoding
 
         # Create the cache directory
         self.cache_dir = self.config.agent_cache_directory()
@@ -233,6 +284,9 @@ class Agent(object):
     def post(self, save=True, data=None):
         """Post data to central server.
 
+        Failed posts are retried. The data is only cached if the server
+        can't be reached or has an error.
+
         Args:
             save: When True, save data to cache directory if postinf fails
             data: Data to post. If None, then uses self.data
@@ -242,33 +296,23 @@ class Agent(object):
 
         """
         # Initialize key variables
-        success = False
-        response = False
         timestamp = self.data['timestamp']
         uid = self.data['uid']
 
-        # Create data to post
+        # Create data to post. Include statistics of previous posts
         if data is None:
+            self._populate_stats()
             data = self.data
 
         # Post data save to cache if this fails
-        try:
-            result = requests.post(self.url, json=data)
-            response = True
-        except:
-            if save is True:
-                # Create a unique very long filename to reduce risk of
-                filename = ('%s/%s_%s.json') % (
-                    self.cache_dir, timestamp, uid)
-
-                # Save data
-                with open(filename, 'w') as f_handle:
-                    json.dump(self.data, f_handle)
-
-        # Define success
-        if response is True:
-            if result.status_code == 200:
-                success = True
+        (success, available) = self._send(self.url, data)
+        if available is False and save is True:
+            # Create a unique very long filename to reduce risk of
+            filename = os.path.join(
+                self.cache_dir, codec.cache_filename(timestamp, uid))
+
+            # Save data. Never leave a partially written file
+            jm_general.atomic_json_dump(data, filename)
 
         # Log message
         if success is True:
@@ -285,9 +329,48 @@ class Agent(object):
         # Return
         return success
 
+    def post_batch(self, uid, samples):
+        """Post many cached samples to central server at once.
+
+        The server stores all the samples in a single transaction.
+
+        Args:
+            uid: UID of the agent that created the samples
+            samples: List of data dicts, oldest first
+
+        Returns:
+            success: "True: if successful
+
+        """
+        # Initialize key variables
+        url = ('%s/receive/%s/batch') % (self.server, uid)
+        data = {'uid': uid, 'samples': samples}
+
+        # Post data. The samples stay cached if this fails
+        (success, _) = self._send(url, data)
+
+        # Log message
+        if success is True:
+            log_message = (
+                'Agent "%s" successfully posted %s cached samples to '
+                'server %s') % (self.name(), len(samples), url)
+            log.log2quiet(1070, log_message)
+        else:
+            log_message = (
+                'Agent "%s" failed to post %s cached samples to '
+                'server %s') % (self.name(), len(samples), url)
+            log.log2warn(1071, log_message)
+
+        # Return
+        return success
+
     def purge(self):
         """Purge data from cache by posting to central server.
 
+        Cached samples are posted in batches per agent UID, oldest first.
+        Purging stops at the first batch that can't be posted. Nothing is
+        done if another thread is already purging.
+
         Args:
             None
 
@@ -295,30 +378,229 @@ class Agent(object):
             success: "True: if successful
 
         """
-        # Add files in cache directory to list
-        filenames = [filename for filename in os.listdir(
-            self.cache_dir) if os.path.isfile(
-                os.path.join(self.cache_dir, filename))]
+        # Purge in one thread at a time
+        if _PURGE_LOCK.acquire(blocking=False) is False:
+            return True
+        try:
+            success = self._purge()
+        finally:
+            _PURGE_LOCK.release()
+        return success
+
+    def _purge(self):
+        """Post the cached samples to central server.
+
+        Args:
+            None
 
-        # Read cache file
-        for filename in filenames:
+        Returns:
+            success: "True: if successful
+
+        """
+        # Initialize key variables
+        batch_size = max(1, self.config.agent_batch_size())
+        cached = defaultdict(list)
+
+        # Group cache files by agent UID. Skip temporary files
+        for filename in os.listdir(self.cache_dir):
+            match = codec.CACHE_FILENAME.match(filename)
+            if bool(match) is False:
+                continue
             filepath = os.path.join(self.cache_dir, filename)
-            with open(filepath, 'r') as f_handle:
-                data = json.load(f_handle)
+            if os.path.isfile(filepath) is False:
+                continue
+            cached[match.group(2)].append((int(match.group(1)), filepath))
+
+        # Post the samples of each agent in batches
+        for uid, files in sorted(cached.items()):
+            files.sort()
+            for pointer in range(0, len(files), batch_size):
+                # Read cache files. Set aside files that can't be read
+                filepaths = []
+                samples = []
+                for (_, filepath) in files[pointer:pointer + batch_size]:
+                    try:
+                        samples.append(codec.load(filepath))
+                    except (ValueError, OSError) as exception_error:
+                        log_message = (
+                            'Cache file %s could not be read: %s'
+                            '') % (filepath, exception_error)
+                        log.log2warn(1072, log_message)
+                        self._set_aside(filepath)
+                        continue
+                    filepaths.append(filepath)
+                if bool(samples) is False:
+                    continue
+
+                # Post samples. Try again later if this fails
+                if self.post_batch(uid, samples) is False:
+                    return False
+
+                # Delete files
+                for filepath in filepaths:
+                    os.remove(filepath)
+
+                    # Log removal
+                    log_message = (
+                        'Purging cache file %s after successfully '
+                        'contacting server %s'
+                        '') % (filepath, self.server)
+                    log.log2quiet(1029, log_message)
 
-            # Post file
-            success = self.post(save=False, data=data)
+        # Return
+        return True
 
-            # Delete file if successful
-            if success is True:
-                os.remove(filepath)
+    def _set_aside(self, filepath):
+        """Move a cache file that can't be read out of the cache directory.
 
-                # Log removal
-                log_message = (
-                    'Purging cache file %s after successfully '
-                    'contacting server %s'
-                    '') % (filepath, self.url)
-                log.log2quiet(1029, log_message)
+        The file is moved to the "failures" subdirectory for further
+        analysis by administrators, so it isn't read again.
+
+        Args:
+            filepath: Cache file
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        failures_dir = os.path.join(self.cache_dir, 'failures')
+
+        # Move
+        try:
+            os.makedirs(failures_dir, exist_ok=True)
+            os.replace(filepath, os.path.join(
+                failures_dir, os.path.basename(filepath)))
+        except OSError as exception_error:
+            log_message = (
+                'Cache file %s could not be moved to %s: %s'
+                '') % (filepath, failures_dir, exception_error)
+            log.log2warn(1089, log_message)
+
+    def _encode(self, data):
+        """Encode and compress data to post to central server.
+
+        Args:
+            data: Data to post
+
+        Returns:
+            payload: Body of the post as bytes
+
+        """
+        # Return
+        payload = codec.compress(
+            codec.dumps(data, self.content_type), self.content_encoding)
+        return payload
+
+    def _send(self, url, data):
+        """Post data to central server, retrying if required.
+
+        Connection errors, timeouts and server errors are retried after
+        an exponential backoff with random jitter. This keeps agents from
+        posting in step after an outage.
+
+        Servers that can't decode the configured content type or content
+        encoding answer 400 or 415. The data is then posted again as
+        uncompressed JSON, which every server accepts.
+
+        Args:
+            url: URL to post to
+            data: Data to post
+
+        Returns:
+            (success, available): success is True if the server accepted
+                the data. available is False if the server couldn't be
+                reached, had an error, or couldn't decode the data
+
+        """
+        # Initialize key variables
+        status = None
+        latency = None
+        retried = 0
+        timeout = (
+            self.config.server_connect_timeout(),
+            self.config.server_read_timeout())
+        retries = max(0, self.config.server_retries())
+        session = _session()
+
+        # Use uncompressed JSON if the server can't decode the data
+        formats = [(self._encode(data), self.headers)]
+        if self.headers != {'Content-Type': codec.JSON}:
+            formats.append(
+                (codec.dumps(data), {'Content-Type': codec.JSON}))
+
+        # Post
+        for (payload, headers) in formats:
+            for attempt in range(retries + 1):
+                # Wait before retrying
+                if attempt > 0:
+                    backoff = min(
+                        _MAX_BACKOFF, _BACKOFF * (2 ** (attempt - 1)))
+                    time.sleep(backoff * random())
+
+                # Try posting
+                start = time.time()
+                try:
+                    result = session.post(
+                        url, data=payload, headers=headers,
+                        timeout=timeout)
+                except requests.exceptions.RequestException:
+                    continue
+
+                # Retry only if the server had an error
+                if result.status_code < 500:
+                    status = result.status_code
+                    latency = time.time() - start
+                    break
+            retried += attempt
+
+            # Only try another format if the server couldn't decode this one
+            if status not in [400, 415]:
+                break
+
+        # Data the server can't decode is cached. It can be posted again
+        # when the server is upgraded
+        success = status == 200
+        available = status is not None and status != 415
+
+        # Update statistics
+        with _STATS_LOCK:
+            stats = _POST_STATS[data.get('uid')]
+            stats['retries'] += retried
+            if latency is not None:
+                stats['latency'] = latency
+
+        # Return
+        return (success, available)
+
+    def _populate_stats(self):
+        """Populate the agent with statistics of previous posts.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Get statistics
+        with _STATS_LOCK:
+            stats = _POST_STATS[self.data['uid']]
+            latency = stats['latency']
+            retries = stats['retries']
+            overruns = _OVERRUNS[self.data['agent']]
+
+        # Update agent
+        if latency is not None:
+            self.populate(
+                'agent_post_latency', latency,
+                base_type='floating', chartable=True)
+        self.populate(
+            'agent_post_retries', retries,
+            base_type='counter32', chartable=True)
+        self.populate(
+            'agent_poll_overruns', overruns,
+            base_type='counter32', chartable=True)
 
 
 class AgentDaemon(Daemon):
@@ -363,11 +645,101 @@ class AgentDaemon(Daemon):
             None
 
         """
+        # Initialize key variables
+        key = ('%s:%s') % (self.poller.name(), socket.getfqdn())
+        schedule = Schedule(self.poller.config.agent_interval(), key)
+        next_run = schedule.next_run(time.time())
+
         # Start polling
         while True:
-            time.sleep(1)
+            # Wait. Start again if the clock was turned back
+            now = time.time()
+            if next_run - now > schedule.interval:
+                next_run = schedule.next_run(now)
+            time.sleep(max(0, next_run - now))
+
+            # Poll
             self.poller.query()
-            time.sleep(300)
+
+            # Skip the polls that should have started during this one
+            (next_run, skipped) = schedule.after(next_run, time.time())
+            if skipped > 0:
+                with _STATS_LOCK:
+                    _OVERRUNS[self.poller.name()] += skipped
+                log_message = (
+                    'Agent "%s" took longer than its %s second interval '
+                    'to poll. Skipped %s polls.'
+                    '') % (self.poller.name(), schedule.interval, skipped)
+                log.log2warn(1073, log_message)
+
+
+class Schedule(object):
+    """Poll schedule aligned to multiples of a fixed interval.
+
+    Each agent polls at a fixed offset from the start of the interval.
+    The offset is derived from a key, so it doesn't change when the
+    agent restarts, and agents started together don't poll together.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+
+    def __init__(self, interval, key):
+        """Method initializing the class.
+
+        Args:
+            interval: Seconds between polls
+            key: String to derive the offset from. It should be unique
+                to the agent
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.interval = max(1, int(interval))
+        hasher = hashlib.sha256()
+        hasher.update(bytes(key.encode()))
+        self.offset = int(hasher.hexdigest(), 16) % self.interval
+
+    def next_run(self, now):
+        """Get the first poll time after a time.
+
+        Args:
+            now: Epoch time
+
+        Returns:
+            result: Epoch time of the poll
+
+        """
+        # Return
+        result = (
+            (now - self.offset) // self.interval + 1
+            ) * self.interval + self.offset
+        return result
+
+    def after(self, previous, now):
+        """Get the poll time that follows a poll.
+
+        Args:
+            previous: Epoch time the previous poll was scheduled for
+            now: Epoch time the previous poll finished
+
+        Returns:
+            (result, skipped): Epoch time of the poll, and the number of
+                poll times that passed while polling
+
+        """
+        # Initialize key variables
+        skipped = max(0, int((now - previous) // self.interval))
+
+        # Return
+        result = previous + (skipped + 1) * self.interval
+        return (result, skipped)
 
 
 class AgentCLI(object):
@@ -497,6 +869,155 @@ class AgentCLI(object):
             sys.exit(2)
 
 
+def poll_hosts(name, hostnames, function, threads=10, timeout=None):
+    """Poll hosts in parallel.
+
+    Hosts that take longer than the timeout are reported, and no longer
+    waited for. Their polls continue in the background, and the hosts are
+    skipped by later calls until their polls finish.
+
+    Args:
+        name: Name of agent
+        hostnames: List of hostnames
+        function: Function that polls the hostname passed to it
+        threads: Maximum number of hosts to poll at once. Only used the
+            first time the agent polls
+        timeout: Seconds polling each host may take. No limit if None
+
+    Returns:
+        slow: List of hostnames that took longer than the timeout, or
+            were still being polled from a previous call
+
+    """
+    # Initialize key variables
+    slow = []
+    started = {}
+    pending = {}
+    workers = _poll_pool(name, threads)
+
+    # Poll each host once
+    for hostname in sorted(set(hostnames)):
+        # Skip hosts still being polled from a previous call
+        with _POLL_LOCK:
+            if hostname in _POLLING[name]:
+                running = True
+            else:
+                _POLLING[name].add(hostname)
+                running = False
+        if running is True:
+            slow.append(hostname)
+            log_message = (
+                'Agent "%s" is still polling host "%s" from a previous '
+                'cycle. Skipping it.') % (name, hostname)
+            log.log2warn(1083, log_message)
+            continue
+
+        future = workers.submit(
+            _poll_host, name, function, hostname, started)
+        pending[future] = hostname
+
+    # Wait for each host to finish or run out of time
+    while bool(pending) is True:
+        # Wake up when the first running host runs out of time
+        wait_time = None
+        if timeout is not None:
+            deadlines = [
+                started[hostname] + timeout for hostname in pending.values()
+                if hostname in started]
+            if bool(deadlines) is True:
+                wait_time = max(0, min(deadlines) - time.time())
+            else:
+                wait_time = timeout
+        (done, _) = futures.wait(
+            pending, timeout=wait_time, return_when=futures.FIRST_COMPLETED)
+
+        # Report failed hosts
+        for future in done:
+            hostname = pending.pop(future)
+            error = future.exception()
+            if error is not None:
+                log_message = (
+                    'Agent "%s" failed to poll host "%s": %s'
+                    '') % (name, hostname, error)
+                log.log2warn(1074, log_message)
+
+        # Report slow hosts
+        if timeout is None:
+            continue
+        now = time.time()
+        for future, hostname in list(pending.items()):
+            if hostname in started and now - started[hostname] >= timeout:
+                pending.pop(future)
+                slow.append(hostname)
+                log_message = (
+                    'Agent "%s" took more than %s seconds to poll host '
+                    '"%s". Not waiting for it.'
+                    '') % (name, timeout, hostname)
+                log.log2warn(1075, log_message)
+
+    # Return
+    return slow
+
+
+def _poll_pool(name, threads):
+    """Get the pool of threads polling the hosts of an agent.
+
+    Args:
+        name: Name of agent
+        threads: Maximum number of hosts to poll at once
+
+    Returns:
+        workers: pool.Pool object, created the first time it is needed
+
+    """
+    # Create the pool once
+    with _POLL_LOCK:
+        if name not in _POLL_POOLS:
+            _POLL_POOLS[name] = pool.Pool(threads, name=name)
+        workers = _POLL_POOLS[name]
+
+    # Return
+    return workers
+
+
+def _poll_host(name, function, hostname, started):
+    """Poll a host, recording when polling started.
+
+    Args:
+        name: Name of agent
+        function: Function that polls the hostname passed to it
+        hostname: Hostname
+        started: Dict of start times keyed by hostname
+
+    Returns:
+        None
+
+    """
+    # Poll. The host can be polled again when done
+    started[hostname] = time.time()
+    try:
+        function(hostname)
+    finally:
+        with _POLL_LOCK:
+            _POLLING[name].discard(hostname)
+
+
+def _session():
+    """Get the HTTP session of the current thread.
+
+    Args:
+        None
+
+    Returns:
+        session: requests.Session object
+
+    """
+    # Create the session once
+    if hasattr(_SESSIONS, 'session') is False:
+        _SESSIONS.session = requests.Session()
+    return _SESSIONS.session
+
+
 def get_uid(hostname):
     """Create a permanent UID for the agent.
 
@@ -77,6 +77,8 @@ class PollingAgent(object):
     def query(self):
         """Query all remote hosts for data.
 
+        Hosts are polled in parallel.
+
         Args:
             None
 
@@ -86,36 +88,50 @@ class PollingAgent(object):
         """
         # Check each hostname
         hostnames = self.config.agent_snmp_hostnames()
-        for hostname in hostnames:
-            # Get valid SNMP credentials
-            validate = snmp_manager.Validate(
-                hostname, self.snmp_config.snmp_auth())
-            snmp_params = validate.credentials()
-
-            # Log message
-            if snmp_params is None:
-                log_message = (
-                    'No valid SNMP configuration found '
-                    'for host "%s" ') % (hostname)
-                log.log2warn(1022, log_message)
-                continue
+        Agent.poll_hosts(
+            self.agent_name, hostnames, self.poll,
+            threads=self.config.agent_threads(),
+            timeout=self.config.agent_host_timeout())
 
-            # Create Query make sure MIB is supported
-            snmp_object = snmp_manager.Interact(snmp_params)
-            query = mib_if.init_query(snmp_object)
-            query64 = mib_if_64.init_query(snmp_object)
-            if query.supported() is False:
-                log_message = (
-                    'The IF-MIB is not supported by host  "%s"'
-                    '') % (hostname)
-                log.log2warn(1024, log_message)
-                continue
+    def poll(self, hostname):
+        """Query a remote host for data.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            None
+
+        """
+        # Get valid SNMP credentials
+        validate = snmp_manager.Validate(
+            hostname, self.snmp_config.snmp_auth())
+        snmp_params = validate.credentials()
+
+        # Log message
+        if snmp_params is None:
+            log_message = (
+                'No valid SNMP configuration found '
+                'for host "%s" ') % (hostname)
+            log.log2warn(1022, log_message)
+            return
+
+        # Create Query make sure MIB is supported
+        snmp_object = validate.interact()
+        query = mib_if.init_query(snmp_object)
+        query64 = mib_if_64.init_query(snmp_object)
+        if query.supported() is False:
+            log_message = (
+                'The IF-MIB is not supported by host  "%s"'
+                '') % (hostname)
+            log.log2warn(1024, log_message)
+            return
 
-            # Get the UID for the agent after all preliminary checks are OK
-            uid_env = Agent.get_uid(hostname)
+        # Get the UID for the agent after all preliminary checks are OK
+        uid_env = Agent.get_uid(hostname)
 
-            # Post data to the remote server
-            self.upload(uid_env, hostname, query, query64)
+        # Post data to the remote server
+        self.upload(uid_env, hostname, query, query64)
 
     def upload(self, uid, hostname, query, query64):
         """Post system data to the central server.
@@ -76,6 +76,8 @@ class PollingAgent(object):
     def query(self):
         """Query all remote hosts for data.
 
+        Hosts are polled in parallel.
+
         Args:
             None
 
@@ -85,35 +87,49 @@ class PollingAgent(object):
         """
         # Check each hostname
         hostnames = self.config.agent_snmp_hostnames()
-        for hostname in hostnames:
-            # Get valid SNMP credentials
-            validate = snmp_manager.Validate(
-                hostname, self.snmp_config.snmp_auth())
-            snmp_params = validate.credentials()
-
-            # Log message
-            if snmp_params is None:
-                log_message = (
-                    'No valid SNMP configuration found '
-                    'for host "%s" ') % (hostname)
-                log.log2warn(1006, log_message)
-                continue
-
-            # Create Query make sure MIB is supported
-            snmp_object = snmp_manager.Interact(snmp_params)
-            snmp_query = mib_sentry3.init_query(snmp_object)
-            if snmp_query.supported() is False:
-                log_message = (
-                    'The Sentry3 MIB is not supported by host  "%s"'
-                    '') % (hostname)
-                log.log2warn(1001, log_message)
-                continue
-
-            # Get the UID for the agent after all preliminary checks are OK
-            uid_env = agent.get_uid(hostname)
-
-            # Post data to the remote server
-            self.upload(uid_env, hostname, snmp_query)
+        agent.poll_hosts(
+            self.agent_name, hostnames, self.poll,
+            threads=self.config.agent_threads(),
+            timeout=self.config.agent_host_timeout())
+
+    def poll(self, hostname):
+        """Query a remote host for data.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            None
+
+        """
+        # Get valid SNMP credentials
+        validate = snmp_manager.Validate(
+            hostname, self.snmp_config.snmp_auth())
+        snmp_params = validate.credentials()
+
+        # Log message
+        if snmp_params is None:
+            log_message = (
+                'No valid SNMP configuration found '
+                'for host "%s" ') % (hostname)
+            log.log2warn(1006, log_message)
+            return
+
+        # Create Query make sure MIB is supported
+        snmp_object = validate.interact()
+        snmp_query = mib_sentry3.init_query(snmp_object)
+        if snmp_query.supported() is False:
+            log_message = (
+                'The Sentry3 MIB is not supported by host  "%s"'
+                '') % (hostname)
+            log.log2warn(1001, log_message)
+            return
+
+        # Get the UID for the agent after all preliminary checks are OK
+        uid_env = agent.get_uid(hostname)
+
+        # Post data to the remote server
+        self.upload(uid_env, hostname, snmp_query)
 
     def upload(self, uid, hostname, query):
         """Post system data to the central server.
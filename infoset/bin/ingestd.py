@@ -13,7 +13,8 @@ import time
 import argparse
 
 # Infoset libraries
-from infoset.cache import cache
+from infoset.cache import engine
+from infoset.db import db
 from infoset.utils import log
 from infoset.utils import jm_configuration
 from infoset.utils import hidden
@@ -62,11 +63,42 @@ class IngestDaemon(Daemon):
             None
 
         """
+        # Create the database connection pool. This must be done
+        # after the daemon forks
+        pool = db.initialize_pool(self.config)
+
+        # Start ingesting. Files are processed as they arrive
+        ingest = engine.Engine(self.config)
+        ingest.start()
+
         # Do the daemon thing
         while True:
-            cache.process(self.config)
             time.sleep(60)
 
+            # Report connection pool usage
+            stats = pool.stats()
+            log_message = (
+                'Database pool: %s connections of %s, '
+                '%s acquired, %s released, %s waits (%.3fs), '
+                '%s reconnects') % (
+                    stats['created'], stats['size'], stats['acquired'],
+                    stats['released'], stats['waits'],
+                    stats['wait_seconds'], stats['reconnects'])
+            log.log2quiet(1060, log_message)
+
+            # Report how long files wait before being committed
+            stats = ingest.stats()
+            if stats['files'] > 0:
+                average = stats['lag_seconds'] / stats['files']
+            else:
+                average = 0.0
+            log_message = (
+                'Ingest: %s files committed, lag %.3fs average, '
+                '%.3fs maximum, %s files pending') % (
+                    stats['files'], average, stats['max_lag'],
+                    stats['pending'])
+            log.log2quiet(1062, log_message)
+
 
 class IngestCLI(object):
     """Class that manages the agent CLI.
@@ -8,21 +8,18 @@ This could be a modified to be a daemon
 
 # Standard libraries
 import os
-import time
 import shutil
-from collections import defaultdict
-import queue as Queue
 import threading
-import re
 
 # Infoset libraries
 from infoset.db import db
-from infoset.db import db_agent as agent
 from infoset.utils import log
+from infoset.utils import jm_general
+from infoset.utils import codec
 from infoset.cache import drain
 
-# Define a key global variable
-THREAD_QUEUE = Queue.Queue()
+# Maximum number of datapoints updated by a single UPDATE statement
+_UPDATE_ROWS = 1000
 
 
 class FillDB(threading.Thread):
@@ -41,220 +38,296 @@ class FillDB(threading.Thread):
     def run(self):
         """Update the database using threads."""
         while True:
-            # Get the data_dict
+            # Get the data_dict. Stop when there is no more work
             data_dict = self.queue.get()
-            uid = data_dict['uid']
-            metadata = data_dict['metadata']
-            config = data_dict['config']
-            agents = data_dict['agents']
-            datapoints = data_dict['datapoints']
-
-            # Initialize other values
-            max_timestamp = 0
-
-            # Sort metadata by timestamp
-            metadata.sort()
-
-            # Process file for each timestamp
-            for (timestamp, filepath) in metadata:
-                # Read in data
-                ingest = drain.Drain(filepath)
-
-                # Make sure file is OK
-                # Move it to a directory for further analysis
-                # by administrators
-                if ingest.valid() is False:
-                    log_message = (
-                        'Cache ingest file %s is invalid. Moving.'
-                        '') % (filepath)
-                    log.log2warn(1054, log_message)
-                    shutil.move(
-                        filepath, config.ingest_failures_directory())
-                    continue
-
-                # Update agent table if not there
-                if ingest.uid() not in agents:
-                    _insert_agent(
-                        ingest.uid(),
-                        ingest.agent(),
-                        ingest.hostname(),
-                        config
-                        )
-                    # Append the new insertion to the list
-                    agents.append(ingest.uid())
-
-                # Update datapoint metadata if not there
-                for item in ingest.sources():
-                    did = item[1]
-                    if did not in datapoints:
-                        _insert_datapoint(item, config)
-                        # Append the new insertion to the list
-                        datapoints.append(did)
-
-                # Create map of DIDs to database row index values
-                mapping = _datapoints_by_did(config)
-
-                # Update chartable data
-                _update_chartable(mapping, ingest, config)
-                _update_unchartable(mapping, ingest, config)
-
-                # Get the max timestamp
-                max_timestamp = max(timestamp, max_timestamp)
-
-                # Purge source file
-                ingest.purge()
-
-            # Update the last time the agent was contacted
-            _update_agent_last_update(uid, max_timestamp, config)
-
-            # All done!
-            self.queue.task_done()
-
-
-def _update_chartable(mapping, ingest, config):
-    """Insert data into the database "iset_data" table.
+            if data_dict is None:
+                self.queue.task_done()
+                break
+
+            # The batch is done even if processing it fails, so that
+            # nothing waiting on the queue hangs
+            try:
+                _ingest(data_dict)
+            finally:
+                self.queue.task_done()
+
+
+def _ingest(data_dict):
+    """Process the cache files of a UID submitted to a FillDB thread.
 
     Args:
-        mapping: Map of DIDs to database row index values
-        ingest: Drain object
-        config: Config object
+        data_dict: Dict of the UID, its metadata, the config and registry.
+            Optionally a "callback" function to call with the metadata
+            when the files have been processed, and a "failure" function
+            to call with the metadata when they couldn't be
 
     Returns:
         None
 
     """
     # Initialize key variables
-    data = ingest.chartable()
-    data_list = []
-    timestamp_tracker = {}
-
-    # Update data
-    for item in data:
-        # Process each datapoint item found
-        (_, did, tuple_value, timestamp) = item
-        idx_datapoint = int(mapping[did][0])
-        idx_agent = int(mapping[did][1])
-        last_timestamp = int(mapping[did][2])
-        value = float(tuple_value)
-
-        # Only update with data collected after
-        # the most recent update. Don't do anything more
-        if timestamp > last_timestamp:
-            data_list.append(
-                (idx_datapoint, idx_agent, value, timestamp)
-            )
+    uid = data_dict['uid']
+    metadata = data_dict['metadata']
+    config = data_dict['config']
+    registry = data_dict['registry']
+
+    # Sort metadata by timestamp
+    metadata.sort(key=lambda item: item[0])
+
+    # Process files in batches. Each batch is a single transaction.
+    # Batches for the same UID must not be processed concurrently
+    batch_size = config.ingest_batch_size()
+    try:
+        with registry.agent_lock(uid):
+            for pointer in range(0, len(metadata), batch_size):
+                _process_batch(
+                    uid, metadata[pointer:pointer + batch_size],
+                    registry, config)
+    except SystemExit:
+        # Database errors are fatal unless the submitter
+        # can save the data for later
+        if 'failure' not in data_dict:
+            raise
+        data_dict['failure'](metadata)
+    except Exception as exception_error:
+        # Keep the thread alive for the next batch
+        log_message = (
+            'Could not ingest data for UID %s: %s'
+            '') % (uid, exception_error)
+        log.log2warn(1082, log_message)
+        if 'failure' in data_dict:
+            data_dict['failure'](metadata)
+    else:
+        # Tell the submitter that the files have been processed
+        if 'callback' in data_dict:
+            data_dict['callback'](metadata)
 
-            # Update DID's last updated timestamp
-            if idx_datapoint in timestamp_tracker:
-                timestamp_tracker[idx_datapoint] = max(
-                    timestamp, timestamp_tracker[idx_datapoint])
-            else:
-                timestamp_tracker[idx_datapoint] = timestamp
 
-    # Update if there is data
-    if bool(data_list) is True:
-        # Prepare SQL query to read a record from the database.
-        sql_insert = (
-            'REPLACE INTO iset_data '
-            '(idx_datapoint, idx_agent, value, timestamp) VALUES '
-            '(%s, %s, %s, %s)')
+def _process_batch(uid, metadata, registry, config):
+    """Apply a batch of cache files for a single UID in one transaction.
 
-        # Do query and get results
-        database = db.Database(config)
-        database.modify(sql_insert, 1056, data_list=data_list)
+    Args:
+        uid: UID of agent
+        metadata: List of (timestamp, source, landed) tuples
+            sorted by timestamp. "source" is either a cache filepath or
+            the ValidateCache object of data received without a file
+        registry: Registry of known agents and datapoints
+        config: Config object
 
-        # Change the last updated timestamp
-        for idx_datapoint, last_timestamp in timestamp_tracker.items():
-            # Prepare SQL query to read a record from the database.
-            sql_modify = (
-                'UPDATE iset_datapoint SET last_timestamp=%s '
-                'WHERE iset_datapoint.idx=%s'
-                '') % (last_timestamp, idx_datapoint)
-            database.modify(sql_modify, 1057)
+    Returns:
+        None
 
+    """
+    # Initialize key variables
+    index = registry.datapoints
+    did_scheme = config.did_scheme()
+    max_timestamp = 0
+    processed = []
+    sources = {}
+    updates = {'data': [], 'uncharted': {}, 'timestamps': {}}
+
+    # Read each file
+    for (timestamp, source, _) in metadata:
+        # Read in data
+        if isinstance(source, str) is True:
+            ingest = drain.Drain(source, did_scheme=did_scheme)
+        else:
+            ingest = drain.Drain(validator=source, did_scheme=did_scheme)
+
+        # Make sure file is OK
+        # Move it to a directory for further analysis
+        # by administrators
+        if ingest.valid() is False:
+            if isinstance(source, str) is True:
+                log_message = (
+                    'Cache ingest file %s is invalid. Moving.'
+                    '') % (source)
+                log.log2warn(1054, log_message)
+                shutil.move(
+                    source, config.ingest_failures_directory())
+            else:
+                log_message = (
+                    'Cache ingest data for UID %s is invalid. Saving.'
+                    '') % (uid)
+                log.log2warn(1088, log_message)
+                jm_general.atomic_json_dump(
+                    source.information, os.path.join(
+                        config.ingest_failures_directory(),
+                        codec.cache_filename(timestamp, uid)))
+            continue
+
+        # Update agent table if not there
+        if registry.claim_agent(ingest.uid()) is True:
+            _insert_agent(
+                ingest.uid(),
+                ingest.agent(),
+                ingest.hostname(),
+                config
+                )
+
+        # Gather the datapoint metadata of the whole batch
+        for item in ingest.sources():
+            sources[item[1]] = item
+
+        # Get the max timestamp
+        max_timestamp = max(timestamp, max_timestamp)
+        processed.append(ingest)
+
+    # Nothing to do if all files were invalid
+    if bool(processed) is False:
+        return
+
+    # Update datapoint metadata for all new DIDs in the batch at once.
+    # Datapoints may already exist with DIDs from an older scheme
+    inserted = registry.missing(sources.keys())
+    if bool(inserted) is True and did_scheme != 1:
+        inserted = _alias_datapoints(inserted, processed, index, config)
+    if bool(inserted) is True:
+        idx_agent = _agent_idx(uid, registry, config)
+        _insert_datapoints(
+            [sources[did] for did in inserted], idx_agent, config)
+
+        # Add new DIDs to the map of DIDs to database row index values
+        index.load(_datapoints_by_did(config, dids=list(inserted)))
+
+        # DIDs that still aren't indexed belong to disabled datapoints.
+        # Their data is ignored
+        disabled = index.missing(inserted)
+        if bool(disabled) is True:
+            registry.disable(disabled)
+            log_message = (
+                'Ignoring data for %s disabled datapoints of UID %s'
+                '') % (len(disabled), uid)
+            log.log2quiet(1081, log_message)
+
+    # Queue chartable and unchartable data
+    for ingest in processed:
+        _update_chartable(index, ingest, updates)
+        _update_unchartable(index, ingest, updates)
+
+    # Apply all updates
+    _commit(uid, updates, max_timestamp, config)
+
+    # Make the index reflect the committed timestamps
+    for did, (_, _, timestamp) in updates['timestamps'].items():
+        index.advance(did, timestamp)
+
+    # Purge source files only after they have been committed
+    for ingest in processed:
         # Report success
         log_message = (
             'Successful cache drain for UID %s at timestamp %s') % (
                 ingest.uid(), ingest.timestamp())
         log.log2quiet(1058, log_message)
 
+        # Purge source file
+        ingest.purge()
+
 
-def _update_unchartable(mapping, ingest, config):
-    """Update unchartable data into the database "iset_datapoint" table.
+def _update_chartable(index, ingest, updates):
+    """Queue data for the database "iset_data" table.
 
     Args:
-        mapping: Map of DIDs to database row index values
+        index: DatapointIndex of DIDs to database row values
         ingest: Drain object
-        config: Config object
+        updates: Dict of pending updates for the transaction
 
     Returns:
         None
 
     """
     # Initialize key variables
-    data = ingest.other()
-    data_list = []
-    timestamp_tracker = {}
+    timestamp = ingest.timestamp()
+    rows = updates['data']
 
     # Update data
-    for item in data:
-        # Process each datapoint item found
-        (_, did, tuple_value, timestamp) = item
-        idx_datapoint = int(mapping[did][0])
-        last_timestamp = int(mapping[did][2])
+    for (dids, values) in ingest.chartable_columns():
+        for did, value in zip(dids, values):
+            # Process each datapoint item found. Skip disabled datapoints
+            value_tuple = index.get(did)
+            if value_tuple is None:
+                continue
+            (idx_datapoint, idx_agent, last_timestamp) = value_tuple
+
+            # Data older than the most recent update is still stored.
+            # Cache files aren't read in timestamp order, and REPLACE makes
+            # storing the same data twice harmless
+            rows.append((idx_datapoint, idx_agent, value, timestamp))
+
+            # Update DID's last updated timestamp
+            if timestamp > last_timestamp:
+                _track_timestamp(
+                    updates, did, idx_datapoint, idx_agent, timestamp)
+
+
+def _update_unchartable(index, ingest, updates):
+    """Queue unchartable data for the database "iset_datapoint" table.
+
+    Args:
+        index: DatapointIndex of DIDs to database row values
+        ingest: Drain object
+        updates: Dict of pending updates for the transaction
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    timestamp = ingest.timestamp()
+    (dids, values) = ingest.other_columns()
+
+    # Update data
+    for did, tuple_value in zip(dids, values):
+        # Process each datapoint item found. Skip disabled datapoints
+        value_tuple = index.get(did)
+        if value_tuple is None:
+            continue
+        (idx_datapoint, idx_agent, last_timestamp) = value_tuple
         value = ('%s') % (tuple_value)
 
         # Only update with data collected after
         # the most recent update. Don't do anything more
         if timestamp > last_timestamp:
-            data_list.append(
-                (idx_datapoint, value)
-            )
+            # Files are processed in timestamp order,
+            # so the most recent value wins
+            updates['uncharted'][idx_datapoint] = (
+                idx_datapoint, idx_agent, str(value)[0:128])
 
             # Update DID's last updated timestamp
-            if idx_datapoint in timestamp_tracker:
-                timestamp_tracker[idx_datapoint] = max(
-                    timestamp, timestamp_tracker[idx_datapoint])
-            else:
-                timestamp_tracker[idx_datapoint] = timestamp
+            _track_timestamp(
+                updates, did, idx_datapoint, idx_agent, timestamp)
 
-    # Update if there is data
-    if bool(data_list) is True:
-        for item in data_list:
-            (idx_datapoint, value) = item
-            fixed_value = str(value)[0:128]
-
-            # Prepare SQL query to read a record from the database.
-            sql_modify = (
-                'UPDATE iset_datapoint set uncharted_value="%s" WHERE '
-                'idx=%s') % (fixed_value, idx_datapoint)
-
-            # Do query and get results
-            database = db.Database(config)
-            database.modify(sql_modify, 1037)
-
-        # Change the last updated timestamp
-        for idx_datapoint, last_timestamp in timestamp_tracker.items():
-            # Prepare SQL query to read a record from the database.
-            sql_modify = (
-                'UPDATE iset_datapoint SET last_timestamp=%s '
-                'WHERE iset_datapoint.idx=%s'
-                '') % (last_timestamp, idx_datapoint)
-            database.modify(sql_modify, 1044)
 
-        # Report success
-        log_message = (
-            'Successful cache drain (Uncharted Data) '
-            'for UID %s at timestamp %s') % (
-                ingest.uid(), ingest.timestamp())
-        log.log2quiet(1045, log_message)
+def _track_timestamp(updates, did, idx_datapoint, idx_agent, timestamp):
+    """Track the most recent timestamp for a datapoint in the transaction.
 
+    Args:
+        updates: Dict of pending updates for the transaction
+        did: Datapoint ID
+        idx_datapoint: Datapoint index
+        idx_agent: Agent index
+        timestamp: Timestamp of data
 
-def _update_agent_last_update(uid, last_timestamp, config):
-    """Insert new datapoint into database.
+    Returns:
+        None
+
+    """
+    # Update
+    tracker = updates['timestamps']
+    if did in tracker:
+        timestamp = max(timestamp, tracker[did][2])
+    tracker[did] = (idx_datapoint, idx_agent, timestamp)
+
+
+def _commit(uid, updates, last_timestamp, config):
+    """Apply pending updates for an agent in a single transaction.
+
+    Multi-row statements are used so that the number of round trips is
+    constant regardless of the number of datapoints.
 
     Args:
         uid: UID of agent
+        updates: Dict of pending updates for the transaction
         last_timestamp: The last time a DID for the agent was updated
             in the database
         config: Config object
@@ -262,28 +335,155 @@ def _update_agent_last_update(uid, last_timestamp, config):
     Returns:
         None
 
+    """
+    # Initialize key variables
+    database = db.Database(config)
+    transaction = database.transaction()
+
+    # Insert chartable data
+    sql_insert = (
+        'REPLACE INTO iset_data '
+        '(idx_datapoint, idx_agent, value, timestamp) VALUES '
+        '(%s, %s, %s, %s)')
+    transaction.modify(sql_insert, 1056, data_list=updates['data'])
+
+    # Update unchartable data
+    _update_datapoints(
+        transaction, list(updates['uncharted'].values()),
+        'uncharted_value', 'updates.value', 1037)
+
+    # Change the last updated timestamps
+    _update_datapoints(
+        transaction, list(updates['timestamps'].values()),
+        'last_timestamp',
+        'GREATEST(iset_datapoint.last_timestamp, updates.value)', 1057)
+
+    # Update the last time the agent was contacted
+    _update_agent_last_update(uid, last_timestamp, transaction)
+
+    # Apply
+    transaction.commit()
+
+
+def _update_datapoints(transaction, rows, column, value, error_code):
+    """Queue updates of a column of existing datapoints.
+
+    The table is joined to a derived table of the new values, so many
+    datapoints are updated by each statement. Unlike an INSERT ... ON
+    DUPLICATE KEY UPDATE, this never creates rows for datapoints deleted
+    since the index was loaded.
+
+    Args:
+        transaction: Database Transaction object
+        rows: List of (idx, idx_agent, value) tuples
+        column: Column of the "iset_datapoint" table to update
+        value: SQL expression of the new value of the column. The value
+            from rows is "updates.value"
+        error_code: Error number to use if one occurs
+
+    Returns:
+        None
+
+    """
+    # Process rows in chunks to limit the size of statements
+    for pointer in range(0, len(rows), _UPDATE_ROWS):
+        chunk = rows[pointer:pointer + _UPDATE_ROWS]
+        selects = ['SELECT %s AS idx, %s AS idx_agent, %s AS value']
+        selects.extend(['SELECT %s, %s, %s'] * (len(chunk) - 1))
+        sql_modify = (
+            'UPDATE iset_datapoint JOIN (%s) AS updates '
+            'ON iset_datapoint.idx=updates.idx '
+            'AND iset_datapoint.idx_agent=updates.idx_agent '
+            'SET iset_datapoint.%s=%s') % (
+                ' UNION ALL '.join(selects), column, value)
+        data = tuple(item for row in chunk for item in row)
+        transaction.modify(sql_modify, error_code, data_list=[data])
+
+
+def _update_agent_last_update(uid, last_timestamp, transaction):
+    """Queue an update of the agent's last contact time.
+
+    Args:
+        uid: UID of agent
+        last_timestamp: The last time a DID for the agent was updated
+            in the database
+        transaction: Database Transaction object
+
+    Returns:
+        None
+
     """
     # Initialize key variables
     sql_modify = (
         'UPDATE iset_agent SET iset_agent.last_timestamp=%s '
         'WHERE iset_agent.id="%s"'
         '') % (last_timestamp, uid)
-    database = db.Database(config)
-    database.modify(sql_modify, 1055)
+    transaction.modify(sql_modify, 1055)
 
 
-def _insert_datapoint(metadata, config):
-    """Insert new datapoint into database.
+def _alias_datapoints(dids, processed, index, config):
+    """Link new scheme DIDs to datapoints created with scheme 1 DIDs.
+
+    The new DID is saved in the "id_fast" column of the datapoint, which
+    migrates it to the new scheme.
 
     Args:
-        metadata: Tuple of datapoint metadata.
-            (uid, did, label, source, description)
+        dids: Set of DIDs not found in the index
+        processed: List of Drain objects the DIDs were found in
+        index: DatapointIndex of known datapoints
+        config: Configuration object
+
+    Returns:
+        remaining: Set of DIDs of datapoints that don't exist yet
+
+    """
+    # Initialize key variables
+    legacy = {}
+    data_list = []
+    remaining = set(dids)
+
+    # Get the scheme 1 DIDs
+    for ingest in processed:
+        legacy.update(ingest.legacy_dids(dids))
+    if bool(legacy) is False:
+        return remaining
+    known = _datapoints_by_did(config, dids=list(legacy.values()))
+
+    # Alias known datapoints
+    for did, old_did in legacy.items():
+        value = known.get(old_did, known.get(did))
+        if value is None:
+            continue
+        (idx_datapoint, idx_agent, last_timestamp) = value
+        data_list.append((int(did, 16), idx_datapoint))
+        index.update(did, idx_datapoint, idx_agent, last_timestamp)
+        remaining.discard(did)
+
+    # Save aliases
+    if bool(data_list) is True:
+        sql_modify = (
+            'UPDATE iset_datapoint SET iset_datapoint.id_fast=%s '
+            'WHERE iset_datapoint.idx=%s')
+        database = db.Database(config)
+        database.modify(sql_modify, 1064, data_list=data_list)
+
+    # Return
+    return remaining
+
+
+def _insert_datapoints(metadata, idx_agent, config):
+    """Insert new datapoints into database with a single statement.
+
+    Args:
+        metadata: List of tuples of datapoint metadata.
+            (uid, did, label, source, description, base_type)
             uid: Agent UID
             did: Datapoint ID
             label: Datapoint label created by agent
             source: Source of the data (subsystem being tracked)
             description: Description provided by agent config file (unused)
             base_type = SNMP base type (Counter32, Counter64, Gauge etc.)
+        idx_agent: Index of the agent that all the datapoints belong to
         config: Configuration object
 
     Returns:
@@ -291,22 +491,32 @@ def _insert_datapoint(metadata, config):
 
     """
     # Initialize key variables
-    (uid, did, label, source, _, base_type) = metadata
+    data_list = []
 
-    # Get agent index value
-    agent_object = agent.Get(uid, config)
-    idx_agent = agent_object.idx()
+    # Create rows
+    if config.did_scheme() == 1:
+        for (_, did, label, source, _, base_type) in metadata:
+            data_list.append((did, idx_agent, label, source, base_type))
 
-    # Prepare SQL query to read a record from the database.
-    sql_query = (
-        'INSERT INTO iset_datapoint '
-        '(id, idx_agent, agent_label, agent_source, base_type ) VALUES '
-        '("%s", %d, "%s", "%s", %d)'
-        '') % (did, idx_agent, label, source, base_type)
+        # Prepare SQL query to read a record from the database.
+        sql_query = (
+            'INSERT IGNORE INTO iset_datapoint '
+            '(id, idx_agent, agent_label, agent_source, base_type) VALUES '
+            '(%s, %s, %s, %s, %s)')
+    else:
+        for (_, did, label, source, _, base_type) in metadata:
+            data_list.append(
+                (did, int(did, 16), idx_agent, label, source, base_type))
+
+        # Prepare SQL query to read a record from the database.
+        sql_query = (
+            'INSERT IGNORE INTO iset_datapoint '
+            '(id, id_fast, idx_agent, agent_label, agent_source, base_type) '
+            'VALUES (%s, %s, %s, %s, %s, %s)')
 
     # Do query and get results
     database = db.Database(config)
-    database.modify(sql_query, 1032)
+    database.modify(sql_query, 1032, data_list=data_list)
 
 
 def _insert_agent(uid, name, hostname, config):
@@ -324,50 +534,59 @@ def _insert_agent(uid, name, hostname, config):
     """
     # Prepare SQL query to read a record from the database.
     sql_query = (
-        'INSERT INTO iset_agent (id, name, hostname) '
-        'VALUES ("%s", "%s", "%s")'
-        '') % (uid, name, hostname)
+        'INSERT IGNORE INTO iset_agent (id, name, hostname) '
+        'VALUES (%s, %s, %s)')
 
     # Do query and get results
     database = db.Database(config)
-    database.modify(sql_query, 1033)
+    database.modify(sql_query, 1033, data_list=[(uid, name, hostname)])
 
 
-def _datapoints(config):
-    """Create list of enabled datapoints.
+def _agent_idx(uid, registry, config):
+    """Get the index of an agent, querying the database only once per UID.
 
     Args:
+        uid: Agent uid
+        registry: Registry of known agents and datapoints
         config: Configuration object
 
     Returns:
-        data: List of active datapoints
+        idx_agent: Agent index
 
     """
-    # Initialize key variables
-    data = []
+    # Use the registry if possible
+    idx_agent = registry.agent_idx(uid)
+    if idx_agent is not None:
+        return idx_agent
 
     # Prepare SQL query to read a record from the database.
     sql_query = (
-        'SELECT iset_datapoint.id '
-        'FROM iset_datapoint WHERE (iset_datapoint.enabled=1)')
+        'SELECT iset_agent.idx FROM iset_agent '
+        'WHERE (iset_agent.id=%s) LIMIT 1')
 
     # Do query and get results
     database = db.Database(config)
-    query_results = database.query(sql_query, 1034)
-
-    # Massage data
+    query_results = database.query(sql_query, 1087, data=(uid,))
     for row in query_results:
-        data.append(row[0])
+        idx_agent = int(row[0])
 
-    # Return
-    return data
+    # Die if not found
+    if idx_agent is None:
+        log_message = ('uid %s not found.') % (uid)
+        log.log2die(1040, log_message)
+
+    # Update registry and return
+    registry.update_agent(uid, idx_agent)
+    return idx_agent
 
 
-def _datapoints_by_did(config):
+def _datapoints_by_did(config, dids=None):
     """Create dict of enabled datapoints and their corresponding indices.
 
     Args:
         config: Configuration object
+        dids: List of datapoint IDs to limit the results to.
+            All enabled datapoints are returned if None
 
     Returns:
         data: Dict keyed by datapoint ID,
@@ -375,24 +594,36 @@ def _datapoints_by_did(config):
             idx: Datapoint index
             idx_agent: Agent index
             last_timestamp: The last time the timestamp was updated
+            Datapoints migrated to DID scheme 2 are keyed by their
+            scheme 2 DID when the scheme is in use
 
     """
     # Initialize key variables
     data = {}
+    did_scheme = config.did_scheme()
 
     # Prepare SQL query to read a record from the database.
+    if did_scheme == 1:
+        columns = 'iset_datapoint.id'
+    else:
+        columns = 'IFNULL(LPAD(HEX(iset_datapoint.id_fast), 16, "0"), '
+        columns = ('%s iset_datapoint.id)') % (columns)
     sql_query = (
-        'SELECT iset_datapoint.id, iset_datapoint.idx, '
+        'SELECT %s, iset_datapoint.idx, '
         'iset_datapoint.idx_agent, iset_datapoint.last_timestamp '
-        'FROM iset_datapoint WHERE (iset_datapoint.enabled=1)')
+        'FROM iset_datapoint WHERE (iset_datapoint.enabled=1)') % (columns)
+    if dids is not None:
+        sql_query = ('%s AND iset_datapoint.id IN (%s)') % (
+            sql_query, ', '.join(['%s'] * len(dids)))
+        dids = tuple(dids)
 
     # Do query and get results
     database = db.Database(config)
-    query_results = database.query(sql_query, 1035)
+    query_results = database.query(sql_query, 1035, data=dids)
 
     # Massage data
     for row in query_results:
-        did = row[0]
+        did = row[0].lower()
         idx = row[1]
         idx_agent = row[2]
         last_timestamp = row[3]
@@ -403,21 +634,21 @@ def _datapoints_by_did(config):
 
 
 def _agents(config):
-    """Create list of active agent UIDs.
+    """Create dict of active agent UIDs.
 
     Args:
         config: Configuration object
 
     Returns:
-        data: List of active agents
+        data: Dict of agent indexes keyed by agent UID
 
     """
     # Initialize key variables
-    data = []
+    data = {}
 
     # Prepare SQL query to read a record from the database.
     sql_query = (
-        'SELECT iset_agent.id '
+        'SELECT iset_agent.id, iset_agent.idx '
         'FROM iset_agent WHERE (iset_agent.enabled=1)')
 
     # Do query and get results
@@ -426,97 +657,69 @@ def _agents(config):
 
     # Massage data
     for row in query_results:
-        data.append(row[0])
+        data[row[0]] = int(row[1])
 
     # Return
     return data
 
 
-def process(config):
-    """Method initializing the class.
+def _scan(cache_dir, batch_size, max_files, skip=None):
+    """Stream batches of agent cache files found in the cache directory.
+
+    The directory is read incrementally. Batches of files for a UID are
+    yielded as soon as they are large enough, the rest when the scan ends.
 
     Args:
-        config: Configuration object
+        cache_dir: Cache directory
+        batch_size: Number of files per UID that make a full batch
+        max_files: Maximum number of files to return per scan
+        skip: Container of filepaths to ignore
 
     Returns:
-        None
+        (uid, metadata): Tuple of an agent UID and a list of
+            (timestamp, filepath, landed) tuples. "landed" is the
+            modification time of the file
 
     """
     # Initialize key variables
-    threads_in_pool = config.ingest_threads()
-    uid_metadata = defaultdict(lambda: defaultdict(dict))
-    cache_dir = config.ingest_cache_directory()
-
-    # Filenames must start with a numeric timestamp and #
-    # end with a hex string. This will be tested later
-    regex = re.compile(r'^\d+_[0-9a-f]+.json')
-
-    # Get a list of active agents and datapoints
-    agents = _agents(config)
-    datapoints = _datapoints(config)
-
-    # Spawn a pool of threads, and pass them queue instance
-    for _ in range(threads_in_pool):
-        update_thread = FillDB(THREAD_QUEUE)
-        update_thread.daemon = True
-        update_thread.start()
-
-    # Add files in cache directory to list
-    all_filenames = [filename for filename in os.listdir(
-        cache_dir) if os.path.isfile(
-            os.path.join(cache_dir, filename))]
-
-    ######################################################################
-    # Create threads
-    ######################################################################
-
-    # Process only valid agent filenames
-    for filename in all_filenames:
+    uid_metadata = {}
+    count = 0
+    if skip is None:
+        skip = set()
+
+    # Process only valid agent filenames. os.scandir() is only a
+    # context manager from Python 3.6, so just iterate over it
+    for entry in os.scandir(cache_dir):
         # Add valid data to lists
-        if bool(regex.match(filename)) is True:
-            # Create a complete filepath
-            filepath = os.path.join(cache_dir, filename)
-
-            # Only read files that are 15 seconds or older
-            # to prevent corruption caused by reading a file that could be
-            # updating simultaneously
-            if time.time() - os.path.getmtime(filepath) < 15:
-                continue
-
-            # Create a dict of UIDs, timestamps and filepaths
-            (name, _) = filename.split('.')
-            (tstamp, uid) = name.split('_')
-            timestamp = int(tstamp)
-            if uid in uid_metadata:
-                uid_metadata[uid].append(
-                    (timestamp, filepath))
-            else:
-                uid_metadata[uid] = [(timestamp, filepath)]
-
-    # Read each cache file
-    for uid in uid_metadata.keys():
-
-        ####################################################################
-        #
-        # Define variables that will be required for the threading
-        # We have to initialize the dict during every loop to prevent
-        # data corruption
-        #
-        ####################################################################
-        data_dict = {}
-        data_dict['uid'] = uid
-        data_dict['metadata'] = uid_metadata[uid]
-        data_dict['config'] = config
-        data_dict['agents'] = agents
-        data_dict['datapoints'] = datapoints
-        THREAD_QUEUE.put(data_dict)
-
-    # Wait on the queue until everything has been processed
-    THREAD_QUEUE.join()
-
-    # PYTHON BUG. Join can occur while threads are still shutting down.
-    # This can create spurious "Exception in thread (most likely raised
-    # during interpreter shutdown)" errors.
-    # The "time.sleep(1)" adds a delay to make sure things really terminate
-    # properly. This seems to be an issue on virtual machines in Dev only
-    time.sleep(1)
+        match = codec.CACHE_FILENAME.match(entry.name)
+        if bool(match) is False:
+            continue
+        if entry.is_file() is False:
+            continue
+        if entry.path in skip:
+            continue
+
+        # Files are renamed into place when complete, so they can be
+        # read immediately. Note the arrival time for lag statistics
+        landed = entry.stat().st_mtime
+
+        # Create a dict of UIDs, timestamps and filepaths
+        timestamp = int(match.group(1))
+        uid = match.group(2)
+        if uid in uid_metadata:
+            uid_metadata[uid].append((timestamp, entry.path, landed))
+        else:
+            uid_metadata[uid] = [(timestamp, entry.path, landed)]
+
+        # Hand over full batches immediately
+        if len(uid_metadata[uid]) >= batch_size:
+            yield (uid, uid_metadata.pop(uid))
+
+        # Stop when enough files have been found for this cycle
+        count += 1
+        if count >= max_files:
+            break
+
+    # Hand over the remainder
+    for uid, metadata in uid_metadata.items():
+        yield (uid, metadata)
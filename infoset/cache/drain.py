@@ -8,8 +8,11 @@ This could be a modified to be a daemon
 
 # Standard libraries
 import os
+import sys
 import hashlib
-from collections import defaultdict
+import binascii
+import functools
+from array import array
 
 # Infoset libraries
 from infoset.utils import log
@@ -19,6 +22,9 @@ from infoset.cache import validate
 class Drain(object):
     """Infoset class that ingests agent data.
 
+    Data is stored in columns. Every datapoint in a file shares the same
+    UID and timestamp, so they are only stored once.
+
     Args:
         None
 
@@ -31,11 +37,14 @@ class Drain(object):
         post:
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename=None, validator=None, did_scheme=1):
         """Method initializing the class.
 
         Args:
             filename: Cache filename
+            validator: ValidateCache object of data received without
+                a cache file. Used when filename is None
+            did_scheme: Version of the DID scheme to use
 
         Returns:
             None
@@ -43,65 +52,82 @@ class Drain(object):
         """
         # Initialize key variables
         self.filename = filename
-        self.data = defaultdict(lambda: defaultdict(dict))
-        self.metadata = []
         self.validated = False
         self.agent_meta = {}
-        data_types = ['chartable', 'other']
+        self.keys = {}
         agent_meta_keys = ['timestamp', 'uid', 'agent', 'hostname']
 
+        # Chartable data keyed by base_type. Values are (dids, values)
+        self._chartable = {}
+
+        # Other data
+        self._other = ([], [])
+
+        # Datapoint metadata. Rows of each group are a slice of
+        # self._dids and self._sources
+        self._dids = []
+        self._sources = []
+        self._groups = []
+
         # Ingest data
-        validator = validate.ValidateCache(filename)
-        information = validator.getinfo()
+        if validator is None:
+            validator = validate.ValidateCache(filename)
 
-        # Log if data is bad
-        if information is False:
-            log_message = (
-                'Cache ingest file %s is invalid.') % (filename)
-            log.log2warn(1051, log_message)
-            return
-        else:
-            self.validated = True
+        # Check metadata. The data is checked as it is read
+        if validator.validated is True and validator.check_meta() is True:
+            information = validator.information
 
-        if self.validated is True:
             # Get universal parameters from file
             for key in agent_meta_keys:
                 self.agent_meta[key] = information[key]
-            timestamp = int(information['timestamp'])
             uid = information['uid']
 
-            # Process chartable data
-            for data_type in data_types:
-                # Skip if data type isn't in the data
-                if data_type not in information:
-                    continue
-
-                # Process the data type
-                for label, group in sorted(information[data_type].items()):
-                    # Get universal parameters for group
-                    base_type = _base_type(group['base_type'])
-                    description = group['description']
-
-                    # Initialize base type
-                    if base_type not in self.data[data_type]:
-                        self.data[data_type][base_type] = []
-
-                    # Process data
-                    for datapoint in group['data']:
-                        index = datapoint[0]
-                        value = datapoint[1]
-                        source = datapoint[2]
-                        did = _did(uid, label, index)
-
-                        # Update data
-                        self.data[data_type][base_type].append(
-                            (uid, did, value, timestamp)
-                        )
-
-                        # Update sources
-                        self.metadata.append(
-                            (uid, did, label, source, description, base_type)
-                        )
+            # Process data
+            for (data_type, label, description,
+                 base_type, rows) in validator.datapoints():
+                # Get universal parameters for group
+                base_type = _base_type(base_type)
+                start = len(self._dids)
+
+                # Initialize base type
+                if data_type == 'chartable':
+                    if base_type not in self._chartable:
+                        self._chartable[base_type] = ([], array('d'))
+                    (dids, values) = self._chartable[base_type]
+                else:
+                    (dids, values) = self._other
+
+                # Process data
+                for (index, value, source) in rows:
+                    did = sys.intern(_did(uid, label, index, did_scheme))
+
+                    # Update data
+                    values.append(value)
+                    dids.append(did)
+
+                    # Update sources
+                    self._dids.append(did)
+                    self._sources.append(source)
+
+                    # Keep what is needed to find the datapoint's
+                    # DID in older schemes
+                    if did_scheme != 1:
+                        self.keys[did] = (label, index)
+
+                # Update groups of metadata
+                self._groups.append(
+                    (label, description, base_type, start, len(self._dids)))
+
+        # Log if data is bad. Don't keep any of it
+        self.validated = validator.valid()
+        if self.validated is False:
+            if filename is None:
+                log_message = 'Cache ingest data is invalid.'
+            else:
+                log_message = (
+                    'Cache ingest file %s is invalid.') % (filename)
+            log.log2warn(1051, log_message)
+            self._reset()
 
     def valid(self):
         """Determine whether data is valid.
@@ -183,6 +209,40 @@ class Drain(object):
         # Return
         return data
 
+    def chartable_columns(self):
+        """Return all chartable data as columns.
+
+        Args:
+            None
+
+        Returns:
+            data: List of (dids, values) tuples, one per base type
+                dids = List of datapoint IDs
+                values = array of float values, in the same order
+
+        """
+        # Return (Data with other base types isn't charted)
+        data = [
+            self._chartable[base_type] for base_type in [1, 32, 64]
+            if base_type in self._chartable]
+        return data
+
+    def other_columns(self):
+        """Return all other non-chartable data as columns.
+
+        Args:
+            None
+
+        Returns:
+            data: Tuple of (dids, values)
+                dids = List of datapoint IDs
+                values = List of values, in the same order
+
+        """
+        # Return
+        data = self._other
+        return data
+
     def counter32(self):
         """Return counter32 chartable data from file.
 
@@ -190,22 +250,15 @@ class Drain(object):
             None
 
         Returns:
-            data: List of tuples (uid, did, value, timestamp)
+            data: Iterator of tuples (uid, did, value, timestamp)
                 uid = UID of device providing data
                 did = Datapoint ID
                 value = Value of datapoint
                 timestamp = Timestamp when data was collected by the agent
 
         """
-        # Initialize key variables
-        data = []
-
-        # Get data
-        if 'chartable' in self.data:
-            if 32 in self.data['chartable']:
-                data = self.data['chartable'][32]
-
         # Return
+        data = self._rows(self._chartable.get(32, ([], [])))
         return data
 
     def counter64(self):
@@ -215,22 +268,15 @@ class Drain(object):
             None
 
         Returns:
-            data: List of tuples (uid, did, value, timestamp)
+            data: Iterator of tuples (uid, did, value, timestamp)
                 uid = UID of device providing data
                 did = Datapoint ID
                 value = Value of datapoint
                 timestamp = Timestamp when data was collected by the agent
 
         """
-        # Initialize key variables
-        data = []
-
-        # Get data
-        if 'chartable' in self.data:
-            if 64 in self.data['chartable']:
-                data = self.data['chartable'][64]
-
         # Return
+        data = self._rows(self._chartable.get(64, ([], [])))
         return data
 
     def floating(self):
@@ -240,22 +286,15 @@ class Drain(object):
             None
 
         Returns:
-            data: List of tuples (uid, did, value, timestamp)
+            data: Iterator of tuples (uid, did, value, timestamp)
                 uid = UID of device providing data
                 did = Datapoint ID
                 value = Value of datapoint
                 timestamp = Timestamp when data was collected by the agent
 
         """
-        # Initialize key variables
-        data = []
-
-        # Get data
-        if 'chartable' in self.data:
-            if 1 in self.data['chartable']:
-                data = self.data['chartable'][1]
-
         # Return
+        data = self._rows(self._chartable.get(1, ([], [])))
         return data
 
     def chartable(self):
@@ -265,23 +304,16 @@ class Drain(object):
             None
 
         Returns:
-            data: List of tuples (uid, did, value, timestamp)
+            data: Iterator of tuples (uid, did, value, timestamp)
                 uid = UID of device providing data
                 did = Datapoint ID
                 value = Value of datapoint
                 timestamp = Timestamp when data was collected by the agent
 
         """
-        # Initialize key variables
-        data = []
-
-        # Initialize key variables
-        data.extend(self.floating())
-        data.extend(self.counter32())
-        data.extend(self.counter64())
-
         # Return
-        return data
+        for columns in self.chartable_columns():
+            yield from self._rows(columns)
 
     def other(self):
         """Return other non-chartable data from file.
@@ -290,20 +322,15 @@ class Drain(object):
             None
 
         Returns:
-            data: List of tuples (uid, did, value, timestamp)
+            data: Iterator of tuples (uid, did, value, timestamp)
                 uid = UID of device providing data
                 did = Datapoint ID
                 value = Value of datapoint
                 timestamp = Timestamp when data was collected by the agent
 
         """
-        # Initialize key variables
-        data = []
-
         # Return (Ignore whether floating or counter)
-        if 'other' in self.data:
-            for _, value in self.data['other'].items():
-                data.extend(value)
+        data = self._rows(self._other)
         return data
 
     def sources(self):
@@ -313,7 +340,7 @@ class Drain(object):
             None
 
         Returns:
-            data: List of tuples (uid, did, label, source, description)
+            data: Iterator of tuples (uid, did, label, source, description)
                 uid = UID of device providing data
                 did = Datapoint ID
                 label = Label that the agent gave the category of datapoint
@@ -321,9 +348,35 @@ class Drain(object):
                 description = Description of the label
                 base_type = SNMP base type code (Counter32, Gauge etc.)
 
+        """
+        # Return
+        for (label, description, base_type, start, stop) in self._groups:
+            uid = self.agent_meta['uid']
+            for pointer in range(start, stop):
+                yield (
+                    uid, self._dids[pointer], label,
+                    self._sources[pointer], description, base_type)
+
+    def legacy_dids(self, dids):
+        """Get the scheme 1 DIDs of DIDs created with a newer scheme.
+
+        Args:
+            dids: Iterable of datapoint IDs
+
+        Returns:
+            data: Dict of scheme 1 DIDs keyed by DID. Only DIDs found
+                in the data are included
+
         """
         # Initialize key variables
-        data = self.metadata
+        data = {}
+        uid = self.agent_meta['uid']
+
+        # Process data
+        for did in dids:
+            if did in self.keys:
+                (label, index) = self.keys[did]
+                data[did] = _did(uid, label, index)
 
         # Return
         return data
@@ -341,6 +394,10 @@ class Drain(object):
         # Initialize key variables
         success = True
 
+        # Nothing to do if data wasn't read from a file
+        if self.filename is None:
+            return success
+
         try:
             os.remove(self.filename)
         except:
@@ -359,14 +416,69 @@ class Drain(object):
         # Return
         return success
 
+    def _rows(self, columns):
+        """Create rows of data from columns.
+
+        Args:
+            columns: Tuple of (dids, values)
+
+        Returns:
+            data: Iterator of tuples (uid, did, value, timestamp)
+
+        """
+        # Initialize key variables
+        (dids, values) = columns
+        if bool(dids) is False:
+            return
+        uid = self.agent_meta['uid']
+        timestamp = self.timestamp()
+
+        # Return
+        for did, value in zip(dids, values):
+            yield (uid, did, value, timestamp)
+
+    def _reset(self):
+        """Discard all data.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.agent_meta = {}
+        self.keys = {}
+        self._chartable = {}
+        self._other = ([], [])
+        self._dids = []
+        self._sources = []
+        self._groups = []
+
 
-def _did(uid, label, index):
+@functools.lru_cache(maxsize=131072)
+def _did(uid, label, index, scheme=1):
     """Create a unique DID from ingested data.
 
+    The same DIDs are created every time an agent reports, so results
+    are cached.
+
+    Scheme 1 DIDs are 64 character SHA-256 hex digests. Scheme 2 DIDs are
+    SHA-1[:8], the first 8 bytes of the SHA-1 digest as 16 hex characters.
+    SHA-1 is used instead of a non-cryptographic hash because it is in
+    hashlib on every supported Python version. Scheme 2 is frozen, as
+    changing it would change every stored DID.
+
+    Scheme 2 DIDs are stored in the BIGINT "id_fast" column of the
+    iset_datapoint table as the integer int(did, 16), and are read back
+    with LPAD(HEX(id_fast), 16, "0").
+
     Args:
         uid: UID of device that created the cache data file
         label: Label of the data
         index: Index of the data
+        scheme: Version of the DID scheme to use
 
     Returns:
         did: Datapoint ID
@@ -374,9 +486,13 @@ def _did(uid, label, index):
     """
     # Initialize key variables
     prehash = ('%s%s%s') % (uid, label, index)
-    hasher = hashlib.sha256()
-    hasher.update(bytes(prehash.encode()))
-    did = hasher.hexdigest()
+    if scheme == 2:
+        digest = hashlib.sha1(bytes(prehash.encode())).digest()
+        did = binascii.hexlify(digest[:8]).decode()
+    else:
+        hasher = hashlib.sha256()
+        hasher.update(bytes(prehash.encode()))
+        did = hasher.hexdigest()
 
     # Return
     return did
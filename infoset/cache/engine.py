@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+
+"""Long running engine that ingests agent cache files continuously."""
+
+# Standard libraries
+import os
+import time
+import queue as Queue
+import threading
+
+# Infoset libraries
+from infoset.utils import log
+from infoset.utils import jm_general
+from infoset.utils import codec
+from infoset.cache import cache
+from infoset.cache import index as dp_index
+
+# pyinotify is optional. The cache directory is polled without it
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+
+class Engine(object):
+    """Ingest cache files using a fixed pool of database threads.
+
+    New files are detected with inotify when pyinotify is installed.
+    The cache directory is also scanned every ingest_poll_interval
+    seconds, which is the only detection method without pyinotify.
+
+    Data can also be submitted directly, without a cache file. It is
+    written to the cache directory instead if it can't be committed.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        start: Start the threads
+        stop: Stop the threads
+        sweep: Scan the cache directory once
+        submit: Submit data received without a cache file
+        stats: Get file ingest lag statistics
+
+    """
+
+    def __init__(self, config, queue_size=None):
+        """Method initializing the class.
+
+        Args:
+            config: ConfigServer Object
+            queue_size: Number of batches that can wait for a thread.
+                Defaults to the number of threads
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.config = config
+        self.registry = None
+        self._threads = []
+        self._scanner = None
+        self._notifier = None
+        self._running = False
+        self._retry_after = 0
+
+        # Limit the number of UID batches waiting for a thread
+        if queue_size is None:
+            queue_size = config.ingest_threads()
+        self._queue = Queue.Queue(maxsize=queue_size)
+
+        # Set when the cache directory has to be scanned
+        self._wakeup = threading.Event()
+
+        # Files submitted to threads, but not yet processed
+        self._pending = set()
+
+        # Lag statistics
+        self._lock = threading.Lock()
+        self._stats = _empty_stats()
+
+    def start(self, scan=True):
+        """Load the registry and start the threads.
+
+        Args:
+            scan: Process files in the cache directory if True
+
+        Returns:
+            None
+
+        """
+        # Load active agents and datapoints once for the engine's lifetime
+        self.registry = dp_index.Registry()
+        self.registry.load(
+            cache._agents(self.config), cache._datapoints_by_did(self.config))
+        self._running = True
+
+        # Spawn a pool of threads, and pass them queue instance
+        for _ in range(self.config.ingest_threads()):
+            update_thread = cache.FillDB(self._queue)
+            update_thread.daemon = True
+            update_thread.start()
+            self._threads.append(update_thread)
+
+        # Only process submitted data if required
+        if scan is False:
+            return
+
+        # Watch the cache directory
+        self._notifier = _notifier(
+            self.config.ingest_cache_directory(), self._wakeup)
+
+        # Scan the cache directory whenever woken up
+        self._scanner = threading.Thread(target=self._scan_loop)
+        self._scanner.daemon = True
+        self._scanner.start()
+
+    def stop(self):
+        """Stop the threads after all submitted files have been processed.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Stop scanning
+        self._running = False
+        self._wakeup.set()
+        if self._scanner is not None:
+            self._scanner.join()
+        if self._notifier is not None:
+            self._notifier.stop()
+
+        # Stop the database threads
+        for _ in self._threads:
+            self._queue.put(None)
+        for update_thread in self._threads:
+            update_thread.join()
+        self._threads = []
+
+    def sweep(self):
+        """Submit unprocessed files in the cache directory to the threads.
+
+        Args:
+            None
+
+        Returns:
+            count: Number of files submitted
+
+        """
+        # Initialize key variables
+        count = 0
+        with self._lock:
+            skip = set(self._pending)
+
+        # Feed work to the threads as files are found
+        for (uid, metadata) in cache._scan(
+                self.config.ingest_cache_directory(),
+                self.config.ingest_batch_size(),
+                self.config.ingest_max_files(),
+                skip=skip):
+            with self._lock:
+                self._pending.update(
+                    [filepath for (_, filepath, _) in metadata])
+
+            # Create a new dict for every batch
+            data_dict = {}
+            data_dict['uid'] = uid
+            data_dict['metadata'] = metadata
+            data_dict['config'] = self.config
+            data_dict['registry'] = self.registry
+            data_dict['callback'] = self._processed
+            data_dict['failure'] = self._spill
+            self._queue.put(data_dict)
+            count += len(metadata)
+
+        # Return
+        return count
+
+    def submit(self, validators):
+        """Submit valid agent data received without a cache file.
+
+        Args:
+            validators: List of ValidateCache objects of data from the
+                same agent. They are committed in a single transaction
+
+        Returns:
+            accepted: False if the data must be written to the cache
+                directory instead. This happens when the queue is full,
+                or the database was recently unavailable
+
+        """
+        # Initialize key variables
+        now = time.time()
+
+        # Give the database time to recover
+        if now < self._retry_after:
+            return False
+
+        # Create a new dict for every submission
+        metadata = []
+        for validator in validators:
+            information = validator.getinfo()
+            metadata.append((int(information['timestamp']), validator, now))
+        metadata.sort(key=lambda item: item[0])
+        data_dict = {}
+        data_dict['uid'] = information['uid']
+        data_dict['metadata'] = metadata
+        data_dict['config'] = self.config
+        data_dict['registry'] = self.registry
+        data_dict['callback'] = self._processed
+        data_dict['failure'] = self._spill
+
+        # Submit without waiting
+        try:
+            self._queue.put_nowait(data_dict)
+            accepted = True
+        except Queue.Full:
+            accepted = False
+
+        # Return
+        return accepted
+
+    def stats(self):
+        """Get file ingest lag statistics since the previous call.
+
+        Lag is the time between a file landing in the cache directory
+        and its data being committed to the database.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of statistics
+
+        """
+        # Get and reset
+        with self._lock:
+            result = self._stats
+            result['pending'] = len(self._pending)
+            self._stats = _empty_stats()
+        return result
+
+    def _scan_loop(self):
+        """Scan the cache directory until stopped.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        interval = self.config.ingest_poll_interval()
+
+        # Do the scanning
+        while self._running is True:
+            self._wakeup.clear()
+            self.sweep()
+            self._wakeup.wait(interval)
+
+    def _processed(self, metadata):
+        """Update statistics after files have been processed.
+
+        Args:
+            metadata: List of (timestamp, filepath, landed) tuples
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        now = time.time()
+
+        # Update
+        with self._lock:
+            for (_, source, landed) in metadata:
+                if isinstance(source, str) is True:
+                    self._pending.discard(source)
+                lag = max(0, now - landed)
+                self._stats['files'] += 1
+                self._stats['lag_seconds'] += lag
+                self._stats['max_lag'] = max(self._stats['max_lag'], lag)
+
+    def _spill(self, metadata):
+        """Handle data that couldn't be committed.
+
+        Submitted data is written to cache files. Cache files are left in
+        the cache directory, and are submitted again by the next sweep.
+
+        Args:
+            metadata: List of (timestamp, source, landed) tuples
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        cache_dir = self.config.ingest_cache_directory()
+
+        # Stop accepting submissions for a while
+        self._retry_after = time.time() + 60
+
+        # Save data. Files are left for ingestd
+        for (timestamp, source, _) in metadata:
+            if isinstance(source, str) is True:
+                with self._lock:
+                    self._pending.discard(source)
+                continue
+            filepath = os.path.join(
+                cache_dir, codec.cache_filename(
+                    timestamp, source.information['uid']))
+            jm_general.atomic_json_dump(source.information, filepath)
+
+            # Log
+            log_message = (
+                'Could not commit data for UID %s. Saved to %s'
+                '') % (source.information['uid'], filepath)
+            log.log2warn(1063, log_message)
+
+
+def _empty_stats():
+    """Create a dict of zeroed lag statistics.
+
+    Args:
+        None
+
+    Returns:
+        result: Dict of statistics
+
+    """
+    # Return
+    result = {'files': 0, 'lag_seconds': 0.0, 'max_lag': 0.0}
+    return result
+
+
+def _notifier(directory, wakeup):
+    """Start watching a directory for new files.
+
+    Args:
+        directory: Directory to watch
+        wakeup: threading.Event to set when a file is added
+
+    Returns:
+        notifier: pyinotify.ThreadedNotifier, None if unavailable
+
+    """
+    # Use polling only if pyinotify isn't installed
+    if pyinotify is None:
+        log_message = (
+            'pyinotify is not installed. Polling ingest cache directory %s'
+            '') % (directory)
+        log.log2quiet(1061, log_message)
+        return None
+
+    # Files written in place are closed, atomic hand-offs are moved
+    mask = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO
+    manager = pyinotify.WatchManager()
+    notifier = pyinotify.ThreadedNotifier(
+        manager, default_proc_fun=lambda _: wakeup.set())
+    notifier.daemon = True
+    notifier.start()
+    manager.add_watch(directory, mask)
+
+    # Return
+    return notifier
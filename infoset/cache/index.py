@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+
+"""In-memory indexes of agents and datapoints shared by ingest threads."""
+
+# Standard libraries
+import threading
+
+
+class DatapointIndex(object):
+    """Thread-safe map of DIDs to database row values.
+
+    The map is split into stripes, each with its own lock, so that
+    ingest threads working on different agents rarely wait on each other.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        load: Load DIDs from the database
+        missing: Get the DIDs that are not in the index
+        get: Get the row values for a DID
+        update: Add or replace a DID
+        advance: Advance the last_timestamp of a DID
+
+    """
+
+    def __init__(self, stripes=64):
+        """Method initializing the class.
+
+        Args:
+            stripes: Number of independently locked partitions
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._stripes = [{} for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def load(self, data):
+        """Load DIDs into the index.
+
+        Args:
+            data: Dict keyed by datapoint ID,
+                with a tuple as its value (idx, idx_agent, last_timestamp)
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        stripes = [[] for _ in self._stripes]
+
+        # Group by stripe so that each lock is only acquired once
+        for did, value in data.items():
+            stripes[self._pointer(did)].append((did, value))
+
+        # Process data
+        for pointer, items in enumerate(stripes):
+            if bool(items) is False:
+                continue
+            with self._locks[pointer]:
+                stripe = self._stripes[pointer]
+                for did, (idx, idx_agent, last_timestamp) in items:
+                    stripe[did] = (
+                        int(idx), int(idx_agent), int(last_timestamp))
+
+    def missing(self, dids):
+        """Get the DIDs that are not in the index.
+
+        Args:
+            dids: Iterable of datapoint IDs
+
+        Returns:
+            result: Set of DIDs not found
+
+        """
+        # Initialize key variables
+        result = set()
+        stripes = [[] for _ in self._stripes]
+
+        # Group by stripe so that each lock is only acquired once
+        for did in dids:
+            stripes[self._pointer(did)].append(did)
+
+        # Process data
+        for pointer, items in enumerate(stripes):
+            if bool(items) is False:
+                continue
+            with self._locks[pointer]:
+                stripe = self._stripes[pointer]
+                for did in items:
+                    if did not in stripe:
+                        result.add(did)
+
+        # Return
+        return result
+
+    def get(self, did):
+        """Get the database row values for a DID.
+
+        Args:
+            did: Datapoint ID
+
+        Returns:
+            value: Tuple (idx, idx_agent, last_timestamp), None if unknown
+
+        """
+        # Initialize key variables
+        pointer = self._pointer(did)
+
+        # Return
+        with self._locks[pointer]:
+            value = self._stripes[pointer].get(did)
+        return value
+
+    def update(self, did, idx, idx_agent, last_timestamp):
+        """Add or replace a DID.
+
+        Args:
+            did: Datapoint ID
+            idx: Datapoint index
+            idx_agent: Agent index
+            last_timestamp: The last time the timestamp was updated
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        pointer = self._pointer(did)
+
+        # Update
+        with self._locks[pointer]:
+            self._stripes[pointer][did] = (
+                int(idx), int(idx_agent), int(last_timestamp))
+
+    def advance(self, did, timestamp):
+        """Advance the last_timestamp of a DID. Never go backwards.
+
+        Args:
+            did: Datapoint ID
+            timestamp: Timestamp of the most recent data committed
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        pointer = self._pointer(did)
+
+        # Update
+        with self._locks[pointer]:
+            stripe = self._stripes[pointer]
+            if did in stripe:
+                (idx, idx_agent, last_timestamp) = stripe[did]
+                if timestamp > last_timestamp:
+                    stripe[did] = (idx, idx_agent, int(timestamp))
+
+    def __contains__(self, did):
+        """Determine whether a DID is in the index.
+
+        Args:
+            did: Datapoint ID
+
+        Returns:
+            found: True if found
+
+        """
+        # Initialize key variables
+        pointer = self._pointer(did)
+
+        # Return
+        with self._locks[pointer]:
+            found = did in self._stripes[pointer]
+        return found
+
+    def __len__(self):
+        """Get the number of DIDs in the index.
+
+        Args:
+            None
+
+        Returns:
+            count: Number of DIDs
+
+        """
+        # Return
+        count = sum(len(stripe) for stripe in self._stripes)
+        return count
+
+    def _pointer(self, did):
+        """Get the stripe that a DID belongs to.
+
+        Args:
+            did: Datapoint ID
+
+        Returns:
+            pointer: Index of stripe
+
+        """
+        # Return
+        pointer = hash(did) % len(self._stripes)
+        return pointer
+
+
+class Registry(object):
+    """Thread-safe registry of the agents and datapoints known to ingest.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        load: Load agents and datapoints from the database
+        claim_agent: Register a newly discovered agent
+        agent_idx: Get the database index of an agent
+        update_agent: Set the database index of an agent
+        agent_lock: Get the lock serializing the processing of an agent
+        disable: Register DIDs of disabled datapoints
+        missing: Get newly discovered DIDs
+
+    """
+
+    def __init__(self, stripes=64):
+        """Method initializing the class.
+
+        Args:
+            stripes: Number of independently locked datapoint partitions
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.datapoints = DatapointIndex(stripes=stripes)
+        self._agents = {}
+        self._agent_locks = {}
+        self._disabled = set()
+        self._lock = threading.Lock()
+
+    def load(self, agents, datapoints):
+        """Load agents and datapoints.
+
+        Args:
+            agents: Dict of agent indexes keyed by agent UID
+            datapoints: Dict keyed by datapoint ID,
+                with a tuple as its value (idx, idx_agent, last_timestamp)
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self._agents.update(agents)
+        self.datapoints.load(datapoints)
+
+    def claim_agent(self, uid):
+        """Register an agent UID if it isn't already known.
+
+        Args:
+            uid: Agent UID
+
+        Returns:
+            claimed: True if the agent was unknown, and the caller must
+                add it to the database
+
+        """
+        # Initialize key variables
+        claimed = False
+
+        # Update
+        with self._lock:
+            if uid not in self._agents:
+                self._agents[uid] = None
+                claimed = True
+
+        # Return
+        return claimed
+
+    def agent_idx(self, uid):
+        """Get the database index of an agent.
+
+        Args:
+            uid: Agent UID
+
+        Returns:
+            idx_agent: Agent index, None if unknown
+
+        """
+        # Return
+        with self._lock:
+            idx_agent = self._agents.get(uid)
+        return idx_agent
+
+    def update_agent(self, uid, idx_agent):
+        """Set the database index of an agent.
+
+        Args:
+            uid: Agent UID
+            idx_agent: Agent index
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self._agents[uid] = idx_agent
+
+    def agent_lock(self, uid):
+        """Get the lock serializing the processing of an agent's data.
+
+        Args:
+            uid: Agent UID
+
+        Returns:
+            lock: threading.Lock object for the UID
+
+        """
+        # Create the lock if required
+        with self._lock:
+            if uid not in self._agent_locks:
+                self._agent_locks[uid] = threading.Lock()
+            lock = self._agent_locks[uid]
+
+        # Return
+        return lock
+
+    def disable(self, dids):
+        """Register the DIDs of disabled datapoints.
+
+        Disabled datapoints aren't in the datapoint index, and must not be
+        reported as newly discovered each time their data is received.
+
+        Args:
+            dids: Iterable of datapoint IDs
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self._disabled.update(dids)
+
+    def missing(self, dids):
+        """Get the DIDs that are not yet known.
+
+        Args:
+            dids: Iterable of datapoint IDs
+
+        Returns:
+            result: Set of DIDs not found, excluding disabled datapoints
+
+        """
+        # Initialize key variables
+        result = self.datapoints.missing(dids)
+
+        # Return
+        with self._lock:
+            result.difference_update(self._disabled)
+        return result
@@ -8,12 +8,11 @@ This could be a modified to be a daemon
 
 # Standard libraries
 import os
-import re
-import json
 
 # Infoset libraries
 from infoset.utils import log
 from infoset.utils import jm_general
+from infoset.utils import codec
 
 
 class ValidateCache(object):
@@ -45,31 +44,35 @@ class ValidateCache(object):
         # Initialize key variables
         self.validated = True
         self.information = {}
+        self.errors = []
+        self._valid = None
+        self._meta_valid = None
+        self._data_checked = False
         self.filename = None
         self.filepath = filepath
-
-        # Filenames must start with a numeric timestamp and #
-        # end with a hex string. This will be tested later
-        regex = re.compile(r'^\d+_[0-9a-f]+.json')
+        self._match = None
 
         if filepath is not None:
             # Try reading file if filename format is OK
             self.filename = os.path.basename(filepath)
-            if bool(regex.match(self.filename)) is True:
+            self._match = codec.CACHE_FILENAME.match(self.filename)
+            if bool(self._match) is True:
                 # Ingest data
                 try:
-                    with open(filepath, 'r') as f_handle:
-                        self.information = json.load(f_handle)
+                    self.information = codec.load(filepath)
                 except:
                     self.information = {}
                     self.validated = False
+                    self._error('File could not be read as JSON.')
             else:
                 self.validated = False
+                self._error('Filename is invalid.')
         else:
             if isinstance(data, dict) is True:
                 self.information = data
             else:
                 self.validated = False
+                self._error('Data is not a dict.')
 
     def getinfo(self):
         """Provide validated information when valid.
@@ -92,6 +95,8 @@ class ValidateCache(object):
     def valid(self):
         """Master method that defines whether data is OK.
 
+        The data is only checked once. Later calls return the same result.
+
         Args:
             None
 
@@ -99,12 +104,18 @@ class ValidateCache(object):
             all_ok:
 
         """
+        # Return the previous result if already checked
+        if self._valid is not None:
+            return self._valid
+
         # Initialize key variables
         validity = [self.validated]
 
         # Append results of tests
-        validity.append(self.check_meta())
-        validity.append(self.check_data_types())
+        if False not in validity:
+            validity.append(self.check_meta())
+        if False not in validity:
+            validity.append(self.check_data_types())
 
         # Do final check
         if False in validity:
@@ -112,14 +123,16 @@ class ValidateCache(object):
             # Error message
             if self.filepath is not None:
                 log_message = (
-                    'Cache file %s is invalid'
-                    '') % (self.filepath)
+                    'Cache file %s is invalid. %s'
+                    '') % (self.filepath, ' '.join(self.errors))
                 log.log2warn(1021, log_message)
             else:
-                log_message = ('Cache data is invalid')
+                log_message = (
+                    'Cache data is invalid. %s') % (' '.join(self.errors))
                 log.log2warn(1059, log_message)
         else:
             all_ok = True
+        self._valid = all_ok
         return all_ok
 
     def check_meta(self):
@@ -132,13 +145,22 @@ class ValidateCache(object):
             valid: True if valid
 
         """
+        # Return the previous result if already checked
+        if self._meta_valid is not None:
+            return self._meta_valid
+
         # Initialize key variables
         valid = True
         agent_meta_keys = ['timestamp', 'uid', 'agent', 'hostname']
 
         # Verify universal parameters from file
+        if isinstance(self.information, dict) is False:
+            self._error('Data is not a dict.')
+            self._meta_valid = False
+            return False
         for key in agent_meta_keys:
             if key not in self.information:
+                self._error(('Key "%s" not found.') % (key))
                 valid = False
 
         # Get agent name for future reporting
@@ -147,13 +169,13 @@ class ValidateCache(object):
             try:
                 int(self.information['timestamp'])
             except:
+                self._error('Timestamp is not an integer.')
                 valid = False
 
             # Parse filename for information
             if self.filename is not None:
-                (name, _) = self.filename.split('.')
-                (tstamp, uid) = name.split('_')
-                timestamp = int(tstamp)
+                timestamp = int(self._match.group(1))
+                uid = self._match.group(2)
 
                 # Double check that the UID and timestamp in the
                 # filename matches that in the file.
@@ -161,13 +183,17 @@ class ValidateCache(object):
                 # Don't try to delete. They could be owned by some
                 # one else and the daemon could crash
                 if uid != self.information['uid']:
+                    self._error('UID does not match filename.')
                     valid = False
                 if timestamp != self.information['timestamp']:
+                    self._error('Timestamp does not match filename.')
                     valid = False
                 if jm_general.validate_timestamp(timestamp) is False:
+                    self._error('Timestamp is not normalized.')
                     valid = False
 
         # Return
+        self._meta_valid = valid
         return valid
 
     def check_data_types(self):
@@ -179,9 +205,35 @@ class ValidateCache(object):
         Returns:
             valid: True if valid
 
+        """
+        # Check all the data unless already done while reading it
+        if self._data_checked is False and bool(self.errors) is False:
+            for (_, _, _, _, rows) in self.datapoints():
+                for _ in rows:
+                    pass
+
+        # Return
+        valid = bool(self.errors) is False
+        return valid
+
+    def datapoints(self):
+        """Check the data, and provide it, in a single pass.
+
+        Reading stops at the first error found. Errors are listed in
+        self.errors. The data must not be used if there are any.
+
+        Args:
+            None
+
+        Returns:
+            (data_type, label, description, base_type, rows): Tuple for
+                each group of data, sorted by data_type and label.
+                "rows" is an iterator of (index, value, source) tuples.
+                Chartable values are floats. It must be read before
+                getting the next group
+
         """
         # Initialize key variables
-        valid = True
         data_types = ['chartable', 'other']
 
         # Process chartable data
@@ -189,26 +241,80 @@ class ValidateCache(object):
             # Skip if data type isn't in the data
             if data_type not in self.information:
                 continue
+            if isinstance(self.information[data_type], dict) is False:
+                self._error(('"%s" is not a dict.') % (data_type))
+                return
 
             # Process the data type
-            for category, group in sorted(
+            for label, group in sorted(
                     self.information[data_type].items()):
                 # Process keys
+                if isinstance(group, dict) is False:
+                    self._error(
+                        ('Data for label %s is not a dict.') % (label))
+                    return
                 for key in ['base_type', 'description', 'data']:
                     if key not in group:
-                        valid = False
-
-                # Process data
-                for datapoint in group['data']:
-                    if len(datapoint) != 3:
-                        valid = False
-
-                    # Check to make sure value is numeric
-                    if category == 'chartable':
-                        value = datapoint[1]
-                        try:
-                            float(value)
-                        except:
-                            valid = False
-        # Return
-        return valid
+                        self._error(
+                            ('Key "%s" not found for label %s.'
+                             '') % (key, label))
+                        return
+
+                # Provide data
+                yield (
+                    data_type, label, group['description'],
+                    group['base_type'],
+                    self._rows(label, group['data'], data_type))
+
+                # Stop if the rows were bad
+                if bool(self.errors) is True:
+                    return
+
+        # All data has been checked
+        self._data_checked = True
+
+    def _rows(self, label, data, data_type):
+        """Check and provide the rows of a group of data.
+
+        Args:
+            label: Label of the group
+            data: List of [index, value, source] lists
+            data_type: "chartable" or "other"
+
+        Returns:
+            (index, value, source): Tuple for each row
+
+        """
+        # Process data
+        for datapoint in data:
+            if isinstance(datapoint, list) is False or (
+                    len(datapoint) != 3):
+                self._error(
+                    ('Datapoint for label %s does not have 3 values.'
+                     '') % (label))
+                return
+            (index, value, source) = datapoint
+
+            # Check to make sure value is numeric
+            if data_type == 'chartable':
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    self._error(
+                        ('Chartable value "%s" for label %s is not numeric.'
+                         '') % (value, label))
+                    return
+            yield (index, value, source)
+
+    def _error(self, message):
+        """Record an error found in the data.
+
+        Args:
+            message: Description of error
+
+        Returns:
+            None
+
+        """
+        # Update
+        self.errors.append(message)
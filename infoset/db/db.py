@@ -2,12 +2,258 @@
 
 """Class to process connection."""
 
+# Standard libraries
+import time
+import threading
+import queue as Queue
+
 # pip3 libraries
 import pymysql
 
 # Infoset libraries
 from infoset.utils import log
 
+# Define a key global variable. The process-wide connection pool
+# created by initialize_pool()
+_POOL = None
+
+# MySQL client error codes that mean the server connection was lost
+_GONE_AWAY = [2006, 2013]
+
+
+class Pool(object):
+    """Thread-safe pool of persistent database connections.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        acquire: Get a healthy connection from the pool
+        release: Return a connection to the pool
+        stats: Acquire / release counters
+        close: Close all idle connections
+
+    """
+
+    def __init__(self, config, size=None, idle_check=5):
+        """Function for intializing the class.
+
+        Args:
+            config: Config object
+            size: Maximum number of connections. Defaults to the
+                number of ingest threads
+            idle_check: Connections idle for longer than this number of
+                seconds are pinged before being reused
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.config = config
+        if size is None:
+            size = config.ingest_threads()
+        self.size = max(1, int(size))
+        self.idle_check = idle_check
+
+        # Idle connections are stored as (connection, release_time) tuples.
+        # LIFO ordering keeps the most recently used connections busy.
+        # Threads waiting for a connection are notified through _lock
+        # whenever a connection is released or a slot is freed
+        self._idle = Queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Condition()
+        self._created = 0
+        self._counters = {
+            'acquired': 0,
+            'released': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'reconnects': 0,
+            'discarded': 0}
+
+    def acquire(self):
+        """Get a healthy connection from the pool.
+
+        Waits for a connection to be released, or discarded, if the pool
+        is exhausted.
+
+        Args:
+            None
+
+        Returns:
+            connection: Database connection
+
+        """
+        # Initialize key variables
+        connection = None
+        released = None
+        start = None
+
+        # Reuse an idle connection if possible. Otherwise create a new
+        # connection if the pool isn't full yet, or wait for another
+        # thread to release a connection or free a slot
+        with self._lock:
+            while True:
+                try:
+                    (connection, released) = self._idle.get_nowait()
+                    break
+                except Queue.Empty:
+                    pass
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                if start is None:
+                    start = time.time()
+                self._lock.wait()
+
+        # Update counters
+        if start is not None:
+            self._count('waits')
+            self._count('wait_seconds', time.time() - start)
+
+        # Create a new connection
+        if connection is None:
+            try:
+                connection = _connect(self.config)
+            except:
+                self._free_slot()
+                raise
+
+        # Make sure connections that have been idle for a while
+        # are still alive. MySQL drops them after "wait_timeout"
+        if released is not None:
+            if time.time() - released > self.idle_check:
+                connection = self._healthy(connection)
+
+        # Return
+        self._count('acquired')
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool.
+
+        Args:
+            connection: Database connection obtained from acquire()
+            discard: Close the connection instead of reusing it. Use this
+                when the connection is known to be broken.
+
+        Returns:
+            None
+
+        """
+        # Drop broken connections, freeing a slot for a new one
+        if discard is True:
+            _close(connection)
+            self._free_slot()
+            self._count('discarded')
+        else:
+            with self._lock:
+                self._idle.put((connection, time.time()))
+                self._lock.notify()
+
+        # Update counters
+        self._count('released')
+
+    def stats(self):
+        """Get pool statistics.
+
+        Args:
+            None
+
+        Returns:
+            data: Dict of acquire / release counters and pool sizes
+
+        """
+        # Initialize key variables
+        with self._lock:
+            data = dict(self._counters)
+            data['created'] = self._created
+        data['size'] = self.size
+        data['idle'] = self._idle.qsize()
+
+        # Return
+        return data
+
+    def close(self):
+        """Close all idle connections.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Process idle connections
+        while True:
+            try:
+                (connection, _) = self._idle.get_nowait()
+            except Queue.Empty:
+                break
+            _close(connection)
+            self._free_slot()
+
+    def _healthy(self, connection):
+        """Ping a connection, reconnecting if MySQL has gone away.
+
+        Args:
+            connection: Database connection
+
+        Returns:
+            connection: Working database connection
+
+        """
+        # Ping
+        try:
+            connection.ping(reconnect=False)
+        except:
+            _close(connection)
+            try:
+                connection = _connect(self.config)
+            except:
+                # Free the slot of the connection that was closed
+                self._free_slot()
+                raise
+            self._count('reconnects')
+
+        # Return
+        return connection
+
+    def _free_slot(self):
+        """Free the slot of a closed connection.
+
+        A thread waiting for a connection can then create a new one.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self._created -= 1
+            self._lock.notify()
+
+    def _count(self, key, increment=1):
+        """Update a pool counter.
+
+        Args:
+            key: Counter to update
+            increment: Value to add to counter
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self._counters[key] += increment
+
 
 class Database(object):
     """Class interacts with the connection.
@@ -35,12 +281,14 @@ class Database(object):
         # Intialize key variables
         self.config = config
 
-    def query(self, sql_statement, error_code):
+    def query(self, sql_statement, error_code, data=None):
         """Do a database query.
 
         Args:
             sql_statement: SQL statement
             error_code: Error number to use if one occurs
+            data: If not None, a tuple of parameters to be escaped and
+                substituted into the %s placeholders of the SQL statement
 
         Returns:
             query_results: Query results
@@ -53,32 +301,46 @@ class Database(object):
                            'SQL statement %s') % (sql_statement)
             log.log2die(error_code, log_message)
 
-        # Open database connection. Prepare cursor
-        connection = pymysql.connect(
-            host=self.config.db_hostname(),
-            user=self.config.db_username(),
-            passwd=self.config.db_password(),
-            db=self.config.db_name())
-        cursor = connection.cursor()
-
-        try:
-            # Execute the SQL command
-            cursor.execute(sql_statement)
-            query_results = cursor.fetchall()
-
-        except Exception as exception_error:
-            log_message = (
-                'Unable to fetch data from connection. '
-                'SQL statement: \"%s\" Error: \"%s\"') % (
-                    sql_statement, exception_error)
-            log.log2die(error_code, log_message)
-        except:
-            log_message = ('Unexpected exception. SQL statement: \"%s\"') % (
-                sql_statement)
-            log.log2die(error_code, log_message)
+        # Open database connection. Retry once if MySQL has gone away
+        for attempt in range(2):
+            connection = self._acquire()
+            cursor = connection.cursor()
 
-        # Disconnect from server
-        connection.close()
+            try:
+                # Execute the SQL command
+                cursor.execute(sql_statement, data)
+                query_results = cursor.fetchall()
+
+                # End the implicit transaction so that reused
+                # connections don't read from a stale snapshot
+                connection.commit()
+
+            except pymysql.err.OperationalError as exception_error:
+                self._release(connection, discard=True)
+                if _gone_away(exception_error) is True and attempt == 0:
+                    continue
+                log_message = (
+                    'Unable to fetch data from connection. '
+                    'SQL statement: \"%s\" Error: \"%s\"') % (
+                        sql_statement, exception_error)
+                log.log2die(error_code, log_message)
+            except Exception as exception_error:
+                self._release(connection, discard=True)
+                log_message = (
+                    'Unable to fetch data from connection. '
+                    'SQL statement: \"%s\" Error: \"%s\"') % (
+                        sql_statement, exception_error)
+                log.log2die(error_code, log_message)
+            except:
+                self._release(connection, discard=True)
+                log_message = (
+                    'Unexpected exception. SQL statement: \"%s\"') % (
+                        sql_statement)
+                log.log2die(error_code, log_message)
+
+            # Disconnect from server
+            self._release(connection)
+            break
 
         return query_results
 
@@ -97,49 +359,356 @@ class Database(object):
 
         """
         # Make sure this is a UPDATE, INSERT or REPLACE statement
-        first_word = sql_statement.split()[0]
-        if ((first_word.lower() != 'update') and
-                (first_word.lower() != 'delete') and
-                (first_word.lower() != 'insert') and
-                (first_word.lower() != 'replace')):
+        _check_modify(sql_statement, error_code)
+
+        # Open database connection. Retry once if MySQL has gone away
+        for attempt in range(2):
+            connection = self._acquire()
+            cursor = connection.cursor()
+
+            try:
+                # If a list is provided, then do an executemany
+                if data_list:
+                    # Execute the SQL command
+                    cursor.executemany(sql_statement, data_list)
+                else:
+                    # Execute the SQL command
+                    cursor.execute(sql_statement)
+
+                # Commit  change
+                connection.commit()
+
+            except pymysql.err.OperationalError as exception_error:
+                self._release(connection, discard=True)
+                if _gone_away(exception_error) is True and attempt == 0:
+                    continue
+                log_message = (
+                    'Unable to modify connection. '
+                    'SQL statement: \"%s\" Error: \"%s\"') % (
+                        sql_statement, exception_error)
+                log.log2die(error_code, log_message)
+            except Exception as exception_error:
+                _rollback(connection)
+                self._release(connection, discard=True)
+                log_message = (
+                    'Unable to modify connection. '
+                    'SQL statement: \"%s\" Error: \"%s\"') % (
+                        sql_statement, exception_error)
+                log.log2die(error_code, log_message)
+            except:
+                _rollback(connection)
+                self._release(connection, discard=True)
+                log_message = (
+                    'Unexpected exception. SQL statement: \"%s\"') % (
+                        sql_statement)
+                log.log2die(error_code, log_message)
+
+            # disconnect from server
+            self._release(connection)
+            break
+
+    def transaction(self):
+        """Create a unit of work that commits many statements at once.
 
-            log_message = ('db_modify function can only do '
-                           'INSERT, UPDATE, DELETE or REPLACE: '
-                           'SQL statement %s') % (sql_statement)
-            log.log2die(error_code, log_message)
+        Args:
+            None
 
-        # Open database connection. Prepare cursor
-        connection = pymysql.connect(
-            host=self.config.db_hostname(),
-            user=self.config.db_username(),
-            passwd=self.config.db_password(),
-            db=self.config.db_name())
-        cursor = connection.cursor()
+        Returns:
+            value: Transaction object
 
-        try:
-            # If a list is provided, then do an executemany
-            if data_list:
-                # Execute the SQL command
-                cursor.executemany(sql_statement, data_list)
-            else:
-                # Execute the SQL command
-                cursor.execute(sql_statement)
+        """
+        # Return
+        value = Transaction(self)
+        return value
 
-            # Commit  change
-            connection.commit()
+    def _acquire(self):
+        """Get a connection, from the pool if one has been initialized.
 
-        except Exception as exception_error:
-            connection.rollback()
-            log_message = (
-                'Unable to modify connection. '
-                'SQL statement: \"%s\" Error: \"%s\"') % (
-                    sql_statement, exception_error)
-            log.log2die(error_code, log_message)
-        except:
-            connection.rollback()
-            log_message = ('Unexpected exception. SQL statement: \"%s\"') % (
-                sql_statement)
-            log.log2die(error_code, log_message)
+        Args:
+            None
+
+        Returns:
+            connection: Database connection
+
+        """
+        # Return
+        if _POOL is None:
+            connection = _connect(self.config)
+        else:
+            connection = _POOL.acquire()
+        return connection
+
+    def _release(self, connection, discard=False):
+        """Release a connection obtained by _acquire().
+
+        Args:
+            connection: Database connection
+            discard: Close the connection instead of reusing it
 
-        # disconnect from server
+        Returns:
+            None
+
+        """
+        # Return to the pool if there is one, otherwise close
+        if _POOL is None:
+            _close(connection)
+        else:
+            _POOL.release(connection, discard=discard)
+
+
+class Transaction(object):
+    """Unit of work that applies several modifications in one transaction.
+
+    Statements are queued with modify() and only sent to the database
+    by commit(), which uses a single connection and a single COMMIT.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        modify: Queue a modification
+        commit: Apply all queued modifications
+
+    """
+
+    def __init__(self, database):
+        """Function for intializing the class.
+
+        Args:
+            database: Database object
+
+        Returns:
+            None
+
+        """
+        # Intialize key variables
+        self.database = database
+        self.statements = []
+
+    def modify(self, sql_statement, error_code, data_list=False):
+        """Queue a database modification.
+
+        Args:
+            sql_statement: SQL statement
+            error_code: Error number to use if one occurs
+            data_list: If not False, then the SQL statement is referring
+                to a bulk update using a list of tuples contained in
+                data_list. Multi-row INSERT and REPLACE statements are
+                sent to the server as a single statement.
+
+        Returns:
+            None
+
+        """
+        # Make sure this is a UPDATE, INSERT or REPLACE statement
+        _check_modify(sql_statement, error_code)
+
+        # Skip bulk updates with no data
+        if data_list is not False and bool(data_list) is False:
+            return
+
+        # Queue
+        self.statements.append((sql_statement, error_code, data_list))
+
+    def commit(self):
+        """Apply all queued modifications in a single transaction.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Do nothing if there is nothing to do
+        if bool(self.statements) is False:
+            return
+
+        # Open database connection. Retry once if MySQL has gone away
+        for attempt in range(2):
+            connection = self.database._acquire()
+            cursor = connection.cursor()
+            sql_statement = None
+            error_code = None
+
+            try:
+                for (sql_statement, error_code, data_list) in self.statements:
+                    # If a list is provided, then do an executemany
+                    if data_list:
+                        cursor.executemany(sql_statement, data_list)
+                    else:
+                        cursor.execute(sql_statement)
+
+                # Commit all changes
+                connection.commit()
+
+            except pymysql.err.OperationalError as exception_error:
+                self.database._release(connection, discard=True)
+                if _gone_away(exception_error) is True and attempt == 0:
+                    continue
+                log_message = (
+                    'Unable to commit transaction. '
+                    'SQL statement: \"%s\" Error: \"%s\"') % (
+                        sql_statement, exception_error)
+                log.log2die(error_code, log_message)
+            except Exception as exception_error:
+                _rollback(connection)
+                self.database._release(connection, discard=True)
+                log_message = (
+                    'Unable to commit transaction. '
+                    'SQL statement: \"%s\" Error: \"%s\"') % (
+                        sql_statement, exception_error)
+                log.log2die(error_code, log_message)
+            except:
+                _rollback(connection)
+                self.database._release(connection, discard=True)
+                log_message = (
+                    'Unexpected exception. SQL statement: \"%s\"') % (
+                        sql_statement)
+                log.log2die(error_code, log_message)
+
+            # Disconnect from server
+            self.database._release(connection)
+            break
+
+        # Start afresh
+        self.statements = []
+
+
+def initialize_pool(config, size=None):
+    """Create the process-wide connection pool.
+
+    Must be called after daemons fork, as connections can't be shared
+    between processes. All subsequent Database objects use the pool.
+
+    Args:
+        config: Config object
+        size: Maximum number of connections. Defaults to the
+            number of ingest threads
+
+    Returns:
+        _POOL: Pool object
+
+    """
+    # Initialize key variables
+    global _POOL
+
+    # Close any previous pool
+    if _POOL is not None:
+        _POOL.close()
+
+    # Create pool
+    _POOL = Pool(config, size=size)
+    return _POOL
+
+
+def pool():
+    """Get the process-wide connection pool.
+
+    Args:
+        None
+
+    Returns:
+        _POOL: Pool object, None if initialize_pool() hasn't been called
+
+    """
+    # Return
+    return _POOL
+
+
+def _check_modify(sql_statement, error_code):
+    """Make sure a statement is an INSERT, UPDATE, DELETE or REPLACE.
+
+    Args:
+        sql_statement: SQL statement
+        error_code: Error number to use if the statement is not allowed
+
+    Returns:
+        None
+
+    """
+    # Check the first word
+    first_word = sql_statement.split()[0]
+    if ((first_word.lower() != 'update') and
+            (first_word.lower() != 'delete') and
+            (first_word.lower() != 'insert') and
+            (first_word.lower() != 'replace')):
+
+        log_message = ('db_modify function can only do '
+                       'INSERT, UPDATE, DELETE or REPLACE: '
+                       'SQL statement %s') % (sql_statement)
+        log.log2die(error_code, log_message)
+
+
+def _connect(config):
+    """Open a new database connection.
+
+    Args:
+        config: Config object
+
+    Returns:
+        connection: Database connection
+
+    """
+    # Open database connection
+    connection = pymysql.connect(
+        host=config.db_hostname(),
+        user=config.db_username(),
+        passwd=config.db_password(),
+        db=config.db_name())
+    return connection
+
+
+def _close(connection):
+    """Close a database connection, ignoring errors.
+
+    Args:
+        connection: Database connection
+
+    Returns:
+        None
+
+    """
+    # Close
+    try:
         connection.close()
+    except:
+        pass
+
+
+def _rollback(connection):
+    """Rollback a transaction, ignoring errors on broken connections.
+
+    Args:
+        connection: Database connection
+
+    Returns:
+        None
+
+    """
+    # Rollback
+    try:
+        connection.rollback()
+    except:
+        pass
+
+
+def _gone_away(exception_error):
+    """Determine whether an error means the server connection was lost.
+
+    Args:
+        exception_error: pymysql.err.OperationalError exception
+
+    Returns:
+        result: True if MySQL has gone away
+
+    """
+    # Return
+    result = False
+    if bool(exception_error.args) is True:
+        if exception_error.args[0] in _GONE_AWAY:
+            result = True
+    return result
@@ -42,6 +42,7 @@ CREATE TABLE iset_datapoint (
   idx BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
   idx_agent BIGINT UNSIGNED NOT NULL DEFAULT 1,
   id VARCHAR(64),
+  id_fast BIGINT UNSIGNED DEFAULT NULL,
   agent_label VARCHAR(64) DEFAULT NULL,
   agent_source VARCHAR(128) DEFAULT NULL,
   enabled INTEGER UNSIGNED DEFAULT 1,
@@ -51,6 +52,7 @@ CREATE TABLE iset_datapoint (
   ts_modified TIMESTAMP NULL ON UPDATE CURRENT_TIMESTAMP,
   ts_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   UNIQUE KEY (id),
+  UNIQUE KEY (id_fast),
   UNIQUE KEY (idx, idx_agent),
   PRIMARY KEY (idx)
 ) ENGINE=InnoDB COMMENT='Data Point Table' AUTO_INCREMENT=1 ;
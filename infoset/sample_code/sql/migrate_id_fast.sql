@@ -0,0 +1,18 @@
+# Add the "id_fast" column to an existing database
+#
+# Required before setting "did_scheme: 2" in the configuration of
+# databases created with an infoset.sql that doesn't have the column.
+# Existing datapoints keep their scheme 1 DIDs in the "id" column. Their
+# scheme 2 DIDs are saved in "id_fast" by ingest the next time they are
+# seen.
+#
+# Scheme 2 DIDs are SHA-1[:8], the first 8 bytes of the SHA-1 digest of
+# the data's agent UID, label and index. The scheme is frozen. "id_fast"
+# stores the 16 hex character DID as an integer, not as a string.
+USE infoset;
+
+# ----------------------------------------------------------------------
+
+ALTER TABLE iset_datapoint
+  ADD COLUMN id_fast BIGINT UNSIGNED DEFAULT NULL AFTER id,
+  ADD UNIQUE KEY (id_fast);
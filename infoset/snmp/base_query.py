@@ -1,5 +1,7 @@
 """Base Query Class for interacting with devices."""
 
+from collections import defaultdict
+
 
 class Query(object):
     """Base snmp query object.
@@ -19,10 +21,17 @@ class Query(object):
         layer1: Returns all needed layer 1 MIB information from the device.
             Keyed by OID's MIB name (primary key), ifIndex (secondary key)
 
+        walk_columns: Returns the values of several columns in self.columns
+            read in a single pass over their table.
+
     """
 
     tags = []
 
+    # Table columns used by the class, keyed by name. Values are tuples of
+    # (OID, function converting values or None)
+    columns = {}
+
     def __init__(self, snmp_object, test_oid, tags):
         """Function for intializing the class.
 
@@ -62,3 +71,77 @@ class Query(object):
 
         # Return
         return validity
+
+    def walk_column(self, name, safe=False):
+        """Get the values of a table column defined in self.columns.
+
+        Args:
+            name: Name of the column
+            safe: Do a failsafe walk if True
+
+        Returns:
+            data_dict: Dict of values using the oid's last node as key
+
+        """
+        # Initialize key variables
+        (oid, convert) = self.columns[name]
+
+        # Process OID
+        if safe is False:
+            results = self.snmp_object.walk(oid, normalized=True)
+        else:
+            results = self.snmp_object.swalk(oid, normalized=True)
+
+        # Return
+        data_dict = _column(results, convert)
+        return data_dict
+
+    def walk_columns(self, names):
+        """Get the values of table columns defined in self.columns.
+
+        The columns are walked together, so a table is read in a single
+        pass instead of once per column.
+
+        Args:
+            names: List of column names
+
+        Returns:
+            final: Dict of walk_column() results keyed by column name
+
+        """
+        # Initialize key variables
+        final = {}
+        oids = [self.columns[name][0] for name in names]
+
+        # Process OIDs
+        results = self.snmp_object.walk_columns(oids, normalized=True)
+        for (name, oid) in zip(names, oids):
+            final[name] = _column(results[oid], self.columns[name][1])
+
+        # Return
+        return final
+
+
+def _column(results, convert):
+    """Key the normalized walk results of a column by integer index.
+
+    Args:
+        results: Normalized walk results
+        convert: Function converting values, None if not required
+
+    Returns:
+        data_dict: Dict of values using the oid's last node as key
+
+    """
+    # Initialize key variables
+    data_dict = defaultdict(dict)
+
+    # Process values
+    for key, value in results.items():
+        if convert is None:
+            data_dict[int(key)] = value
+        else:
+            data_dict[int(key)] = convert(value)
+
+    # Return
+    return data_dict
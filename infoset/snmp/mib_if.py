@@ -18,6 +18,36 @@ def init_query(snmp_object):
     return IfQuery(snmp_object)
 
 
+def _string(value):
+    """Convert an OctetString value to a string.
+
+    Args:
+        value: Value
+
+    Returns:
+        result: String
+
+    """
+    # Return
+    result = str(bytes(value), encoding='utf-8')
+    return result
+
+
+def _macaddress(value):
+    """Convert an OctetString MAC address to a hex string.
+
+    Args:
+        value: Value
+
+    Returns:
+        result: Lower case hex string
+
+    """
+    # Return
+    result = binascii.hexlify(value).decode('utf-8').lower()
+    return result
+
+
 class IfQuery(Query):
     """Class interacts with devices supporting IfMIB.
 
@@ -38,6 +68,26 @@ class IfQuery(Query):
 
     """
 
+    # Columns of ifTable and ifXTable
+    columns = {
+        'ifIndex': ('.1.3.6.1.2.1.2.2.1.1', None),
+        'ifDescr': ('.1.3.6.1.2.1.2.2.1.2', _string),
+        'ifType': ('.1.3.6.1.2.1.2.2.1.3', None),
+        'ifSpeed': ('.1.3.6.1.2.1.2.2.1.5', None),
+        'ifPhysAddress': ('.1.3.6.1.2.1.2.2.1.6', _macaddress),
+        'ifAdminStatus': ('.1.3.6.1.2.1.2.2.1.7', None),
+        'ifOperStatus': ('.1.3.6.1.2.1.2.2.1.8', None),
+        'ifLastChange': ('.1.3.6.1.2.1.2.2.1.9', None),
+        'ifInOctets': ('.1.3.6.1.2.1.2.2.1.10', None),
+        'ifOutOctets': ('.1.3.6.1.2.1.2.2.1.16', None),
+        'ifName': ('.1.3.6.1.2.1.31.1.1.1.1', _string),
+        'ifInMulticastPkts': ('.1.3.6.1.2.1.31.1.1.1.2', None),
+        'ifInBroadcastPkts': ('.1.3.6.1.2.1.31.1.1.1.3', None),
+        'ifOutMulticastPkts': ('.1.3.6.1.2.1.31.1.1.1.4', None),
+        'ifOutBroadcastPkts': ('.1.3.6.1.2.1.31.1.1.1.5', None),
+        'ifAlias': ('.1.3.6.1.2.1.31.1.1.1.18', _string)
+    }
+
     def __init__(self, snmp_object):
         """Function for intializing the class.
 
@@ -86,53 +136,11 @@ class IfQuery(Query):
         # Initialize key variables
         final = defaultdict(lambda: defaultdict(dict))
 
-        # Get interface ifDescr data
-        _get_data('ifDescr', self.ifdescr, final)
-
-        # Get interface ifAlias data
-        _get_data('ifAlias', self.ifalias, final)
-
-        # Get interface ifSpeed data
-        _get_data('ifSpeed', self.ifspeed, final)
-
-        # Get interface ifOperStatus data
-        _get_data('ifOperStatus', self.ifoperstatus, final)
-
-        # Get interface ifAdminStatus data
-        _get_data('ifAdminStatus', self.ifadminstatus, final)
-
-        # Get interface ifType data
-        _get_data('ifType', self.iftype, final)
-
-        # Get interface ifName data
-        _get_data('ifName', self.ifname, final)
-
-        # Get interface ifIndex data
-        _get_data('ifIndex', self.ifindex, final)
-
-        # Get interface ifPhysAddress data
-        _get_data('ifPhysAddress', self.ifphysaddress, final)
-
-        # Get interface ifInOctets data
-        _get_data('ifInOctets', self.ifinoctets, final)
-
-        # Get interface ifOutOctets data
-        _get_data('ifOutOctets', self.ifoutoctets, final)
-
-        # Get interface ifInBroadcastPkts data
-        _get_data('ifInBroadcastPkts', self.ifinbroadcastpkts, final)
-
-        # Get interface ifOutBroadcastPkts data
-        _get_data('ifOutBroadcastPkts', self.ifoutbroadcastpkts, final)
-
-        # Get interface ifInMulticastPkts data
-        _get_data('ifInMulticastPkts', self.ifinmulticastpkts, final)
-
-        # Get interface ifOutMulticastPkts data
-        _get_data('ifOutMulticastPkts', self.ifoutmulticastpkts, final)
-
-        # Get interface ifLastChange data
-        _get_data('ifLastChange', self.iflastchange, final)
+        # Get interface data in a single pass over ifTable and ifXTable
+        values = self.walk_columns(list(self.columns))
+        for title, data_dict in values.items():
+            for key, value in data_dict.items():
+                final[key][title] = value
 
         # Return
         return final
@@ -147,17 +155,8 @@ class IfQuery(Query):
             data_dict: Dict of ifLastChange using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.9'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifLastChange')
         return data_dict
 
     def ifinoctets(self, safe=False):
@@ -170,20 +169,8 @@ class IfQuery(Query):
             data_dict: Dict of ifInOctets using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.10'
-        if safe is False:
-            results = self.snmp_object.walk(oid, normalized=True)
-        else:
-            results = self.snmp_object.swalk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifInOctets', safe=safe)
         return data_dict
 
     def ifoutoctets(self, safe=False):
@@ -196,20 +183,8 @@ class IfQuery(Query):
             data_dict: Dict of ifOutOctets using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.16'
-        if safe is False:
-            results = self.snmp_object.walk(oid, normalized=True)
-        else:
-            results = self.snmp_object.swalk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifOutOctets', safe=safe)
         return data_dict
 
     def ifdescr(self, safe=False):
@@ -222,20 +197,8 @@ class IfQuery(Query):
             data_dict: Dict of ifDescr using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.2'
-        if safe is False:
-            results = self.snmp_object.walk(oid, normalized=True)
-        else:
-            results = self.snmp_object.swalk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = str(bytes(value), encoding='utf-8')
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifDescr', safe=safe)
         return data_dict
 
     def iftype(self):
@@ -248,17 +211,8 @@ class IfQuery(Query):
             data_dict: Dict of ifType using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.3'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifType')
         return data_dict
 
     def ifspeed(self):
@@ -271,17 +225,8 @@ class IfQuery(Query):
             data_dict: Dict of ifSpeed using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.5'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifSpeed')
         return data_dict
 
     def ifadminstatus(self):
@@ -294,17 +239,8 @@ class IfQuery(Query):
             data_dict: Dict of ifAdminStatus using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.7'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifAdminStatus')
         return data_dict
 
     def ifoperstatus(self):
@@ -317,17 +253,8 @@ class IfQuery(Query):
             data_dict: Dict of ifOperStatus using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.8'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifOperStatus')
         return data_dict
 
     def ifalias(self):
@@ -340,17 +267,8 @@ class IfQuery(Query):
             data_dict: Dict of ifAlias using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.18'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = str(bytes(value), encoding='utf-8')
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifAlias')
         return data_dict
 
     def ifname(self):
@@ -363,17 +281,8 @@ class IfQuery(Query):
             data_dict: Dict of ifName using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.1'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = str(bytes(value), encoding='utf-8')
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifName')
         return data_dict
 
     def ifindex(self):
@@ -386,17 +295,8 @@ class IfQuery(Query):
             data_dict: Dict of ifindex using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.1'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifIndex')
         return data_dict
 
     def ifphysaddress(self):
@@ -409,18 +309,8 @@ class IfQuery(Query):
             data_dict: Dict of ifPhysAddress using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.2.2.1.6'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            macaddress = binascii.hexlify(value).decode('utf-8').lower()
-            data_dict[int(key)] = macaddress
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifPhysAddress')
         return data_dict
 
     def ifinmulticastpkts(self):
@@ -433,17 +323,8 @@ class IfQuery(Query):
             data_dict: Dict of ifInMulticastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.2'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifInMulticastPkts')
         return data_dict
 
     def ifoutmulticastpkts(self):
@@ -456,17 +337,8 @@ class IfQuery(Query):
             data_dict: Dict of ifOutMulticastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.4'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifOutMulticastPkts')
         return data_dict
 
     def ifinbroadcastpkts(self):
@@ -479,17 +351,8 @@ class IfQuery(Query):
             data_dict: Dict of ifInBroadcastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.3'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifInBroadcastPkts')
         return data_dict
 
     def ifoutbroadcastpkts(self):
@@ -502,17 +365,8 @@ class IfQuery(Query):
             data_dict: Dict of ifOutBroadcastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.5'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifOutBroadcastPkts')
         return data_dict
 
     def ifstackstatus(self):
@@ -597,23 +451,3 @@ class IfQuery(Query):
 
         # Return the interface descriptions
         return final
-
-
-def _get_data(title, func, dest):
-    """Populate dest with data from the given function.
-
-    Args:
-        title: The name of the data
-        func: The function which will return the data
-        dest: a dict which will store the data
-
-    Returns:
-        dest: The modified destination dict
-
-    """
-    # Get interface ifDescr data
-    values = func()
-    for key, value in values.items():
-        dest[key][title] = value
-
-    return dest
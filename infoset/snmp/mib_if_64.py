@@ -37,6 +37,19 @@ class If64Query(Query):
 
     """
 
+    # Columns of ifXTable
+    columns = {
+        'ifHCInOctets': ('.1.3.6.1.2.1.31.1.1.1.6', None),
+        'ifHCInUcastPkts': ('.1.3.6.1.2.1.31.1.1.1.7', None),
+        'ifHCInMulticastPkts': ('.1.3.6.1.2.1.31.1.1.1.8', None),
+        'ifHCInBroadcastPkts': ('.1.3.6.1.2.1.31.1.1.1.9', None),
+        'ifHCOutOctets': ('.1.3.6.1.2.1.31.1.1.1.10', None),
+        'ifHCOutUcastPkts': ('.1.3.6.1.2.1.31.1.1.1.11', None),
+        'ifHCOutMulticastPkts': ('.1.3.6.1.2.1.31.1.1.1.12', None),
+        'ifHCOutBroadcastPkts': ('.1.3.6.1.2.1.31.1.1.1.13', None),
+        'ifHighSpeed': ('.1.3.6.1.2.1.31.1.1.1.15', None)
+    }
+
     def __init__(self, snmp_object):
         """Function for intializing the class.
 
@@ -87,32 +100,11 @@ class If64Query(Query):
         # Initialize key variables
         final = defaultdict(lambda: defaultdict(dict))
 
-        # Get interface ifHCOutBroadcastPkts data
-        _get_data('ifHCOutBroadcastPkts', self.ifhcoutbroadcastpkts, final)
-
-        # Get interface ifHCOutMulticastPkts data
-        _get_data('ifHCOutMulticastPkts', self.ifhcoutmulticastpkts, final)
-
-        # Get interface ifHCOutUcastPkts data
-        _get_data('ifHCOutUcastPkts', self.ifhcoutucastpkts, final)
-
-        # Get interface ifHCOutOctets data
-        _get_data('ifHCOutOctets', self.ifhcoutoctets, final)
-
-        # Get interface ifHCInBroadcastPkts data
-        _get_data('ifHCInBroadcastPkts', self.ifhcinbroadcastpkts, final)
-
-        # Get interface ifHCInMulticastPkts data
-        _get_data('ifHCInMulticastPkts', self.ifhcinmulticastpkts, final)
-
-        # Get interface ifHCInUcastPkts data
-        _get_data('ifHCInUcastPkts', self.ifhcinucastpkts, final)
-
-        # Get interface ifHCInOctets data
-        _get_data('ifHCInOctets', self.ifhcinoctets, final)
-
-        # Get interface ifHighSpeed data
-        _get_data('ifHighSpeed', self.ifhighspeed, final)
+        # Get interface data in a single pass over ifXTable
+        values = self.walk_columns(list(self.columns))
+        for title, data_dict in values.items():
+            for key, value in data_dict.items():
+                final[key][title] = value
 
         # Return
         return final
@@ -127,17 +119,8 @@ class If64Query(Query):
             data_dict: Dict of ifHighSpeed using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.15'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
-        # Return the interface descriptions
+        # Return
+        data_dict = self.walk_column('ifHighSpeed')
         return data_dict
 
     def ifhcinucastpkts(self):
@@ -150,17 +133,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCInUcastPkts using the oid's last node as key
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.7'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCInUcastPkts')
         return data_dict
 
     def ifhcoutucastpkts(self):
@@ -173,17 +147,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCOutUcastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.11'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCOutUcastPkts')
         return data_dict
 
     def ifhcinmulticastpkts(self):
@@ -196,17 +161,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCInMulticastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.8'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCInMulticastPkts')
         return data_dict
 
     def ifhcoutmulticastpkts(self):
@@ -219,17 +175,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCOutMulticastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.12'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCOutMulticastPkts')
         return data_dict
 
     def ifhcinbroadcastpkts(self):
@@ -242,17 +189,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCInBroadcastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.9'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCInBroadcastPkts')
         return data_dict
 
     def ifhcoutbroadcastpkts(self):
@@ -265,17 +203,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCOutBroadcastPkts. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.13'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCOutBroadcastPkts')
         return data_dict
 
     def ifhcinoctets(self, safe=False):
@@ -288,20 +217,8 @@ class If64Query(Query):
             data_dict: Dict of ifHCInOctets. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.6'
-        if safe is False:
-            results = self.snmp_object.walk(oid, normalized=True)
-        else:
-            results = self.snmp_object.swalk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCInOctets', safe=safe)
         return data_dict
 
     def ifhcoutoctets(self, safe=False):
@@ -314,38 +231,6 @@ class If64Query(Query):
             data_dict: Dict of ifHCOutOctets. Key = OID's last node.
 
         """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
-
-        # Process OID
-        oid = '.1.3.6.1.2.1.31.1.1.1.10'
-        if safe is False:
-            results = self.snmp_object.walk(oid, normalized=True)
-        else:
-            results = self.snmp_object.swalk(oid, normalized=True)
-        for key, value in results.items():
-            # Process OID
-            data_dict[int(key)] = value
-
         # Return
+        data_dict = self.walk_column('ifHCOutOctets', safe=safe)
         return data_dict
-
-
-def _get_data(title, func, dest):
-    """Populate dest with data from the given function.
-
-    Args:
-        title: The name of the data
-        func: The function which will return the data
-        dest: a dict which will store the data
-
-    Returns:
-        dest: The modified destination dict
-
-    """
-    # Process data
-    values = func()
-    for key, value in values.items():
-        dest[key][title] = value
-
-    return dest
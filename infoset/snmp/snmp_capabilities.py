@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Cache of the MIBs supported by each device.
+
+Finding out whether a device supports a MIB takes one or more SNMP
+requests per MIB query class. The results are saved in a SQLite database,
+so they are only found out again when they could have changed:
+
+    1) When the cached results are older than the time to live
+    2) When the sysObjectID of the device changes
+    3) When the sysUpTime of the device goes backwards. The device was
+        restarted, possibly with new software
+
+"""
+
+import json
+import time
+
+# Infoset libraries
+from infoset.utils import log
+from infoset.utils import hidden
+from infoset.utils import jm_general
+
+# Default number of seconds for which cached results are valid
+TTL = 86400
+
+
+class Cache(object):
+    """Cache of the MIB query classes supported by devices.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        get: Get the cached results of a device
+        set: Save the results of a device
+        invalidate: Delete the cached results of a device
+
+    """
+
+    def __init__(self, filename=None, ttl=TTL):
+        """Method initializing the class.
+
+        Args:
+            filename: Name of database file. A hidden file is used if None
+            ttl: Number of seconds for which cached results are valid
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if filename is None:
+            filename = hidden.File().snmp_capabilities()
+        self.filename = filename
+        self.ttl = ttl
+
+        # Create the table
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS capabilities ('
+                'hostname TEXT PRIMARY KEY, '
+                'sysobjectid TEXT, '
+                'sysuptime INTEGER, '
+                'updated REAL, '
+                'supported TEXT)')
+
+    def get(self, hostname, sysobjectid, sysuptime):
+        """Get the cached results of a device.
+
+        Args:
+            hostname: Hostname of the device
+            sysobjectid: Current sysObjectID of the device
+            sysuptime: Current sysUpTime of the device
+
+        Returns:
+            supported: Dict of whether each MIB query class is supported,
+                keyed by class name. Empty if there are no valid results
+
+        """
+        # Initialize key variables
+        supported = {}
+        now = time.time()
+
+        # Read
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            row = connection.execute(
+                'SELECT sysobjectid, sysuptime, updated, supported '
+                'FROM capabilities WHERE hostname = ?',
+                (hostname,)).fetchone()
+        if row is None:
+            return supported
+
+        # Use results only if the device hasn't changed
+        (cached_sysobjectid, cached_sysuptime, updated, data) = row
+        if cached_sysobjectid != sysobjectid:
+            return supported
+        if sysuptime is None or cached_sysuptime is None or (
+                sysuptime < cached_sysuptime):
+            return supported
+        if now - updated > self.ttl or updated > now:
+            return supported
+
+        # Return
+        try:
+            supported = json.loads(data)
+        except ValueError:
+            log_message = (
+                'Invalid MIB capabilities cached for host %s in %s'
+                '') % (hostname, self.filename)
+            log.log2warn(1077, log_message)
+        return supported
+
+    def set(self, hostname, sysobjectid, sysuptime, supported, updated=None):
+        """Save the results of a device.
+
+        Args:
+            hostname: Hostname of the device
+            sysobjectid: sysObjectID of the device
+            sysuptime: sysUpTime of the device
+            supported: Dict of whether each MIB query class is supported,
+                keyed by class name
+            updated: Time the results were found. Now if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if updated is None:
+            updated = time.time()
+
+        # Write
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO capabilities '
+                '(hostname, sysobjectid, sysuptime, updated, supported) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (hostname, sysobjectid, sysuptime, updated,
+                 json.dumps(supported, sort_keys=True)))
+
+    def invalidate(self, hostname):
+        """Delete the cached results of a device.
+
+        Args:
+            hostname: Hostname of the device
+
+        Returns:
+            None
+
+        """
+        # Delete
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            connection.execute(
+                'DELETE FROM capabilities WHERE hostname = ?', (hostname,))
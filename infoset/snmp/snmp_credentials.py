@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Cache of the SNMP credentials that work for each device.
+
+The SNMP group that last worked for each device is saved in a SQLite
+database. Devices for which no group worked are saved too, so they aren't
+probed again until a backoff period has passed. Backoff starts after a
+number of consecutive failures, so a single timeout doesn't make a device
+unreachable. The backoff period then doubles with every failure.
+
+"""
+
+import time
+import threading
+
+# Infoset libraries
+from infoset.utils import hidden
+from infoset.utils import jm_general
+
+# Number of consecutive failures before devices are backed off
+FAILURES = 3
+
+# Backoff periods in seconds
+BACKOFF = 60
+MAX_BACKOFF = 3600
+
+# Database files whose schema this process has created
+_CREATED = set()
+_CREATED_LOCK = threading.Lock()
+
+
+class Cache(object):
+    """Cache of the SNMP credentials of devices.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        get: Get the cached credentials of a device
+        success: Save the group that worked for a device
+        failure: Save that no group worked for a device
+
+    """
+
+    def __init__(self, filename=None):
+        """Method initializing the class.
+
+        Args:
+            filename: Name of database file. A hidden file is used if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if filename is None:
+            filename = hidden.File().snmp_credentials()
+        self.filename = filename
+
+        # Create the table once per file per process
+        with _CREATED_LOCK:
+            if self.filename not in _CREATED:
+                with jm_general.sqlite_transaction(
+                        self.filename) as connection:
+                    connection.execute(
+                        'CREATE TABLE IF NOT EXISTS credentials ('
+                        'hostname TEXT PRIMARY KEY, '
+                        'group_name TEXT, '
+                        'failures INTEGER, '
+                        'retry_after REAL, '
+                        'updated REAL)')
+                _CREATED.add(self.filename)
+
+    def get(self, hostname):
+        """Get the cached credentials of a device.
+
+        Args:
+            hostname: Hostname of the device
+
+        Returns:
+            (group_name, retry_after): Name of the group that last worked,
+                None if unknown. Time before which the device mustn't be
+                probed again, 0 if it can be probed
+
+        """
+        # Read
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            row = connection.execute(
+                'SELECT group_name, retry_after '
+                'FROM credentials WHERE hostname = ?',
+                (hostname,)).fetchone()
+
+        # Return
+        if row is None:
+            return (None, 0)
+        return (row[0], row[1])
+
+    def success(self, hostname, group_name):
+        """Save the group that worked for a device.
+
+        Args:
+            hostname: Hostname of the device
+            group_name: Name of SNMP group
+
+        Returns:
+            None
+
+        """
+        # Write
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO credentials '
+                '(hostname, group_name, failures, retry_after, updated) '
+                'VALUES (?, ?, 0, 0, ?)',
+                (hostname, group_name, time.time()))
+
+    def failure(self, hostname):
+        """Save that no group worked for a device.
+
+        The group that last worked is kept, so it is tried first after
+        the backoff period. The failure count is incremented in SQL, so
+        concurrent failures of the same device are all counted.
+
+        Args:
+            hostname: Hostname of the device
+
+        Returns:
+            backoff: Number of seconds before the device is probed again.
+                0 until the device has failed FAILURES times in a row
+
+        """
+        # Initialize key variables
+        now = time.time()
+
+        # Count consecutive failures. The first statement writes, so the
+        # row stays locked until the transaction ends
+        with jm_general.sqlite_transaction(self.filename) as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO credentials '
+                '(hostname, group_name, failures, retry_after, updated) '
+                'VALUES (?, NULL, 0, 0, ?)',
+                (hostname, now))
+            connection.execute(
+                'UPDATE credentials SET failures = failures + 1 '
+                'WHERE hostname = ?',
+                (hostname,))
+            (failures,) = connection.execute(
+                'SELECT failures FROM credentials WHERE hostname = ?',
+                (hostname,)).fetchone()
+            backoff = _backoff(failures)
+            connection.execute(
+                'UPDATE credentials SET retry_after = ?, updated = ? '
+                'WHERE hostname = ?',
+                (now + backoff if backoff else 0, now, hostname))
+
+        # Return
+        return backoff
+
+
+def _backoff(failures):
+    """Get the backoff period of a device.
+
+    Args:
+        failures: Number of consecutive failures of the device
+
+    Returns:
+        backoff: Number of seconds before the device is probed again
+
+    """
+    # Don't back off after the first few failures
+    if failures < FAILURES:
+        return 0
+
+    # Double the period with every further failure
+    exponent = min(failures - FAILURES, 16)
+    backoff = min(BACKOFF * (2 ** exponent), MAX_BACKOFF)
+    return backoff
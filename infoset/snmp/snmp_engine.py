@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Shared asyncio SNMP engine.
+
+All SNMP requests of a process are sent by a single pysnmp SNMP engine
+running on a single asyncio event loop in a background thread. Requests
+to many devices can be outstanding at the same time without creating a
+new SNMP engine, transport or dispatcher for each of them.
+
+Synchronous code, such as snmp_manager.Interact, waits for the result of
+each request with Engine.run().
+
+"""
+
+import os
+import asyncio
+import threading
+from concurrent import futures
+
+from pysnmp.proto import rfc1905
+
+# pysnmp's asyncio API is optional. It needs asyncio.coroutine, which
+# newer versions of Python don't have
+try:
+    from pysnmp.hlapi import asyncio as snmp_asyncio
+except (ImportError, AttributeError):
+    snmp_asyncio = None
+
+# The engine of the process
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+# Error indication of requests that time out. The same as pysnmp's
+TIMEOUT_ERROR = 'No SNMP response received before timeout'
+
+# Seconds to wait for a request after pysnmp should have timed it out
+_TIMEOUT_MARGIN = 5
+
+
+class Engine(object):
+    """SNMP engine running on an asyncio event loop.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        run: Wait for the result of a coroutine
+        target: Get the transport target of a device
+        timeout: Get the number of seconds a request to a device can take
+        get: Coroutine that does an SNMP GET
+        walk: Coroutine that walks one or more OIDs with GETBULK or
+            GETNEXT
+
+    """
+
+    def __init__(self):
+        """Method initializing the class.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._snmp_engine = None
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._context = snmp_asyncio.ContextData()
+
+        # Run the event loop in the background
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the event loop and wait for its result.
+
+        Args:
+            coroutine: Coroutine to run
+            timeout: Number of seconds to wait. Waits until the coroutine
+                finishes if None
+
+        Returns:
+            result: Result of the coroutine. Exceptions raised by the
+                coroutine are raised again. concurrent.futures.TimeoutError
+                is raised, and the coroutine cancelled, if it doesn't
+                finish in time
+
+        """
+        # Return
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            result = future.result(timeout)
+        except futures.TimeoutError:
+            future.cancel()
+            raise
+        return result
+
+    def target(self, hostname, port):
+        """Get the transport target of a device.
+
+        Targets are reused, so hostnames are only resolved once.
+
+        Args:
+            hostname: Hostname of the device
+            port: SNMP port of the device
+
+        Returns:
+            target: UdpTransportTarget object
+
+        """
+        # Initialize key variables
+        key = (hostname, port)
+
+        # Create the target outside of the event loop. Creating it
+        # resolves the hostname, which blocks
+        with self._lock:
+            target = self._targets.get(key)
+        if target is None:
+            target = snmp_asyncio.UdpTransportTarget((hostname, port))
+            with self._lock:
+                target = self._targets.setdefault(key, target)
+
+        # Return
+        return target
+
+    def timeout(self, target):
+        """Get the number of seconds a request to a device can take.
+
+        pysnmp waits for the timeout of the transport target before each
+        retry, and after the last one.
+
+        Args:
+            target: Transport target of the device
+
+        Returns:
+            result: Number of seconds, with a margin for slow event loops
+
+        """
+        # Return
+        result = target.timeout * (target.retries + 1) + _TIMEOUT_MARGIN
+        return result
+
+    async def get(self, authentication, target, oid_to_get):
+        """Do an SNMP GET.
+
+        Args:
+            authentication: Authentication object for the device
+            target: Transport target of the device
+            oid_to_get: OID to get
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds):
+                var_binds is a list of (OID, value) tuples
+
+        """
+        # Return
+        result = await self._wait(snmp_asyncio.getCmd(
+            self._engine(), authentication, target, self._context,
+            _object_type(oid_to_get), lookupMib=False), target, [])
+        return result
+
+    async def walk(
+            self, authentication, target, oids, max_repetitions=0):
+        """Do an SNMP walk of the OIDs under each of a list of OIDs.
+
+        The OIDs are walked together, so the columns of a table can be
+        read in a single pass over it. Each request only asks for the
+        next rows of the columns that haven't been completely read, and
+        can't take longer than timeout() seconds.
+
+        Args:
+            authentication: Authentication object for the device
+            target: Transport target of the device
+            oids: List of OIDs to walk
+            max_repetitions: Number of rows to get with each GETBULK.
+                GETNEXT is used to get one row at a time if 0
+
+        Returns:
+            (error_indication, error_status, error_index, tables):
+                tables is a list of var_binds for each OID in oids.
+                var_binds is a list of rows. Each row is a list of
+                (OID, value) tuples
+
+        """
+        # Initialize key variables
+        tables = [[] for _ in oids]
+        prefixes = [('%s.') % (oid.lstrip('.')) for oid in oids]
+        next_oids = list(oids)
+        previous = [None for _ in oids]
+        active = list(range(len(oids)))
+
+        # Get rows until leaving the subtree of every OID
+        while bool(active) is True:
+            object_types = [_object_type(next_oids[item]) for item in active]
+            if max_repetitions > 0:
+                request = snmp_asyncio.bulkCmd(
+                    self._engine(), authentication, target, self._context,
+                    0, max_repetitions, *object_types, lookupMib=False)
+            else:
+                request = snmp_asyncio.nextCmd(
+                    self._engine(), authentication, target, self._context,
+                    *object_types, lookupMib=False)
+            (error_indication, error_status, error_index,
+             var_bind_table) = await self._wait(request, target, [])
+
+            # Return errors. Ask for fewer rows if the response was too
+            # big. Version 1 agents report the end of the walk as a
+            # noSuchName error
+            if error_indication:
+                return (error_indication, error_status, error_index, tables)
+            if error_status:
+                if int(error_status) == 1 and max_repetitions > 1:
+                    max_repetitions = max_repetitions // 2
+                    continue
+                if int(error_status) == 2:
+                    break
+                return (error_indication, error_status, error_index, tables)
+            if bool(var_bind_table) is False:
+                break
+
+            # Stop walking an OID at the end of its subtree or the MIB, or
+            # if the device returns OIDs out of order. The position of a
+            # value in a row is the position of its OID in the request
+            done = set()
+            for row in var_bind_table:
+                for (position, item) in enumerate(active):
+                    if item in done or position >= len(row):
+                        continue
+                    (oid, value) = row[position]
+                    if isinstance(value, rfc1905.EndOfMibView) is True or (
+                            str(oid).startswith(prefixes[item]) is False) or (
+                                previous[item] is not None and (
+                                    tuple(oid) <= previous[item])):
+                        done.add(item)
+                        continue
+                    tables[item].append([(oid, value)])
+                    previous[item] = tuple(oid)
+                    next_oids[item] = ('.%s') % (str(oid))
+            active = [item for item in active if item not in done]
+
+        # Return
+        return (None, 0, 0, tables)
+
+    async def _wait(self, request, target, var_binds):
+        """Wait for the result of a pysnmp request to a device.
+
+        Args:
+            request: pysnmp request coroutine
+            target: Transport target of the device
+            var_binds: var_binds to return if the request times out
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds):
+                Result of the request. A timeout error if pysnmp doesn't
+                time the request out itself
+
+        """
+        # Return
+        try:
+            result = await asyncio.wait_for(request, self.timeout(target))
+        except asyncio.TimeoutError:
+            result = (TIMEOUT_ERROR, 0, 0, var_binds)
+        return result
+
+    def _engine(self):
+        """Get the pysnmp SNMP engine, creating it on the event loop.
+
+        Args:
+            None
+
+        Returns:
+            snmp_engine: SnmpEngine object
+
+        """
+        # Return
+        if self._snmp_engine is None:
+            self._snmp_engine = snmp_asyncio.SnmpEngine()
+        return self._snmp_engine
+
+    def _run(self):
+        """Run the event loop forever.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Run
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+
+def available():
+    """Determine whether the shared engine can be used.
+
+    Args:
+        None
+
+    Returns:
+        result: True if pysnmp's asyncio API is installed
+
+    """
+    # Return
+    result = snmp_asyncio is not None
+    return result
+
+
+def engine():
+    """Get the engine of the process, creating it if required.
+
+    A new engine is created in processes forked after it was created.
+
+    Args:
+        None
+
+    Returns:
+        result: Engine object
+
+    """
+    # Initialize key variables
+    global _ENGINE
+
+    # Create the engine once per process
+    with _ENGINE_LOCK:
+        if _ENGINE is None or _ENGINE[0] != os.getpid():
+            _ENGINE = (os.getpid(), Engine())
+        result = _ENGINE[1]
+    return result
+
+
+def _object_type(oid):
+    """Create the pysnmp object of an OID to request.
+
+    Args:
+        oid: OID string
+
+    Returns:
+        result: ObjectType object
+
+    """
+    # Return
+    result = snmp_asyncio.ObjectType(snmp_asyncio.ObjectIdentity(oid))
+    return result
@@ -5,6 +5,7 @@ import time
 from collections import defaultdict
 
 from infoset.snmp import jm_iana_enterprise
+from infoset.snmp import snmp_capabilities
 from infoset.snmp import get_queries
 
 
@@ -21,11 +22,13 @@ class Query(object):
 
     """
 
-    def __init__(self, snmp_object):
+    def __init__(self, snmp_object, cache=None):
         """Function for intializing the class.
 
         Args:
             snmp_object: SNMP Interact class object from snmp_manager.py
+            cache: snmp_capabilities.Cache object of the MIBs supported
+                by devices. The default cache is used if None
 
         Returns:
             None
@@ -34,6 +37,11 @@ class Query(object):
         # Define query object
         self.snmp_object = snmp_object
 
+        # MIBs supported by the device
+        self.cache = cache
+        self._device = None
+        self._supported = None
+
     def everything(self):
         """Get all information from device.
 
@@ -96,13 +104,9 @@ class Query(object):
 
         # Get system information from SNMPv2-MIB, ENTITY-MIB, IF-MIB
         # Instantiate a query object for each system query
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('system')]:
-
-            if item.supported():
-                processed = True
-                data = _add_system(item, data)
+        for item in self._queries('system'):
+            processed = True
+            data = _add_system(item, data)
 
         # Return
         if processed is True:
@@ -126,12 +130,9 @@ class Query(object):
 
         # Get information layer1 queries
 
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('layer1')]:
-            if item.supported():
-                processed = True
-                data = _add_layer1(item, data)
+        for item in self._queries('layer1'):
+            processed = True
+            data = _add_layer1(item, data)
 
         # Return
         if processed is True:
@@ -153,12 +154,9 @@ class Query(object):
         data = defaultdict(lambda: defaultdict(dict))
         processed = False
 
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('layer2')]:
-            if item.supported():
-                processed = True
-                data = _add_layer2(item, data)
+        for item in self._queries('layer2'):
+            processed = True
+            data = _add_layer2(item, data)
 
         # Return
         if processed is True:
@@ -180,12 +178,9 @@ class Query(object):
         data = defaultdict(lambda: defaultdict(dict))
         processed = False
 
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('layer3')]:
-            if item.supported():
-                processed = True
-                data = _add_layer3(item, data)
+        for item in self._queries('layer3'):
+            processed = True
+            data = _add_layer3(item, data)
 
         # Return
         if processed is True:
@@ -193,6 +188,51 @@ class Query(object):
         else:
             return None
 
+    def _queries(self, layer):
+        """Get query objects of the MIBs the device supports for a layer.
+
+        Whether the device supports each MIB is read from the cache. Only
+        MIBs missing from the cache are probed, then the cache is updated.
+
+        Args:
+            layer: Layer of queries needed
+
+        Returns:
+            queries: List of query objects
+
+        """
+        # Initialize key variables
+        queries = []
+        probed = False
+
+        # Read the cache once per poll
+        if self._supported is None:
+            if self.cache is None:
+                self.cache = snmp_capabilities.Cache()
+            self._device = (
+                self.snmp_object.hostname(),
+                self.snmp_object.sysobjectid(),
+                self.snmp_object.sysuptime())
+            self._supported = self.cache.get(*self._device)
+
+        # Probe MIBs that aren't cached
+        for query_class in get_queries(layer):
+            item = query_class(self.snmp_object)
+            name = query_class.__name__
+            if name not in self._supported:
+                self._supported[name] = item.supported()
+                probed = True
+            if self._supported[name] is True:
+                queries.append(item)
+
+        # Update the cache. Results can't be validated later without
+        # the sysObjectID and sysUpTime of the device
+        if probed is True and None not in self._device:
+            self.cache.set(*self._device, self._supported)
+
+        # Return
+        return queries
+
 
 def _add_data(source, target):
     """Add data from source to target dict. Both dicts must have two keys.
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """SNMP manager class."""
 
-import os
+import time
+from concurrent import futures
 
 from pysnmp.entity.rfc3413.oneliner import cmdgen
 from pysnmp.proto import rfc1905
@@ -10,8 +11,16 @@ from pysnmp.smi import rfc1902 as smi
 
 # Import project libraries
 from infoset.utils import log
-from infoset.utils import hidden
 from infoset.snmp import jm_iana_enterprise
+from infoset.snmp import snmp_engine
+from infoset.snmp import snmp_credentials
+
+# Whether walks of each device use GETBULK, keyed by (hostname, port)
+_BULK = {}
+
+# Number of seconds to wait for any SNMP group to work during credential
+# discovery
+_TIMEOUT = 15
 
 
 class Validate(object):
@@ -25,68 +34,64 @@ class Validate(object):
 
     Functions:
         __init__:
-        oid_exists:
-        walk:
-        get:
-        query:
+        credentials:
+        interact:
     """
 
-    def __init__(self, hostname, snmp_config):
-        """Function for intializing the class."""
+    def __init__(self, hostname, snmp_config, timeout=_TIMEOUT):
+        """Function for intializing the class.
+
+        Args:
+            hostname: Hostname of the device
+            snmp_config: List of dicts of SNMP parameters of each group
+            timeout: Number of seconds to wait for any group to work
+
+        Returns:
+            None
+
+        """
         # Initialize key variables
         self.snmp_config = snmp_config
         self.hostname = hostname
+        self.timeout = timeout
+        self._interact = None
 
-    def credentials(self):
+    def credentials(self, backoff=True):
         """Determine the valid SNMP credentials for a host.
 
         Args:
-            None
+            backoff: Don't probe hosts that recently failed if True.
+                Interactive callers use False to probe the host anyway
 
         Returns:
             credentials: Dict of snmp_credentials to use
 
         """
         # Initialize key variables
-        cache_exists = False
-        group_key = 'group_name'
-
-        # Determine whether cached value exists
-        filez = hidden.File()
-        dirz = hidden.Directory()
-        snmp_dir = dirz.snmp_cache()
-        filename = filez.snmp_cache(self.hostname)
-
-        # Create UID directory / file if not yet created
-        if os.path.exists(snmp_dir) is False:
-            os.makedirs(snmp_dir)
-        if os.path.exists(filename) is True:
-            cache_exists = True
-
-        if cache_exists is False:
-            # Get credentials
-            credentials = self._credentials()
-
-            # Save credentials if successful
-            if credentials is not None:
-                _update_cache(filename, credentials[group_key])
+        credentials = None
+        cache = snmp_credentials.Cache()
+        self._interact = None
 
-        else:
-            # Read credentials from cache
-            if os.path.isfile(filename):
-                with open(filename) as f_handle:
-                    group_name = f_handle.readline()
+        # Don't probe devices that recently failed
+        (group_name, retry_after) = cache.get(self.hostname)
+        if backoff is True and time.time() < retry_after:
+            return None
 
-            # Get credentials
+        # Try the cached group first, then the rest
+        if group_name is not None:
             credentials = self._credentials(group_name)
+        if credentials is None:
+            credentials = self._credentials()
 
-            # Try the rest if these credentials fail
-            if credentials is None:
-                credentials = self._credentials()
-
-            # Update cache if found
-            if credentials is not None:
-                _update_cache(filename, credentials[group_key])
+        # Update cache
+        if credentials is None:
+            seconds = cache.failure(self.hostname)
+            log_message = (
+                'No SNMP credentials work for host %s. Trying again in %s '
+                'seconds') % (self.hostname, seconds)
+            log.log2quiet(1078, log_message)
+        else:
+            cache.success(self.hostname, credentials['group_name'])
 
         # Return
         return credentials
@@ -94,8 +99,11 @@ class Validate(object):
     def _credentials(self, group=None):
         """Determine the valid SNMP credentials for a host.
 
+        All groups are probed at the same time. Groups that don't answer
+        before the timeout are ignored.
+
         Args:
-            group: SNMP group name to try
+            group: SNMP group name to try. All groups are tried if None
 
         Returns:
             credentials: Dict of snmp_credentials to use
@@ -103,27 +111,71 @@ class Validate(object):
         """
         # Initialize key variables
         credentials = None
+        deadline = time.time() + self.timeout
+        candidates = []
 
-        # Probe device with all SNMP options
+        # Create the parameters of each group. Copies are used, so the
+        # configuration can be shared by threads polling other devices
         for params_dict in self.snmp_config:
-            # Update credentials
-            params_dict['snmp_hostname'] = self.hostname
-
-            # Try successive groups
-            if group is None:
-                # Verify connectivity
-                if _contactable(params_dict) is True:
-                    credentials = params_dict
+            if group is None or params_dict['group_name'] == group:
+                candidate = dict(params_dict)
+                candidate['snmp_hostname'] = self.hostname
+                candidates.append(candidate)
+        if bool(candidates) is False:
+            return None
+
+        # Probe device with all SNMP options
+        executor = futures.ThreadPoolExecutor(max_workers=len(candidates))
+        pending = [
+            executor.submit(_contactable, candidate)
+            for candidate in candidates]
+        try:
+            while bool(pending) is True and credentials is None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
                     break
-            else:
-                if params_dict['group_name'] == group:
-                    # Verify connectivity
-                    if _contactable(params_dict) is True:
-                        credentials = params_dict
+                (done, _) = futures.wait(
+                    pending, timeout=remaining,
+                    return_when=futures.FIRST_COMPLETED)
+
+                # Keep the first group that works, in configuration order
+                # if several finished together
+                for (future, candidate) in zip(pending, candidates):
+                    if future not in done or future.exception() is not None:
+                        continue
+                    if future.result() is not None:
+                        credentials = candidate
+                        self._interact = future.result()
+                        break
+                candidates = [
+                    candidate for (future, candidate) in zip(
+                        pending, candidates) if future not in done]
+                pending = [future for future in pending if future not in done]
+        finally:
+            # Don't wait for groups still being probed
+            executor.shutdown(wait=False)
 
         # Return
         return credentials
 
+    def interact(self):
+        """Get the Interact object of the credentials found.
+
+        It already holds the results of the SNMP requests made to verify
+        the credentials, so they aren't made again during the poll.
+
+        Args:
+            None
+
+        Returns:
+            query: Interact object. None if credentials() found no valid
+                credentials
+
+        """
+        # Return
+        query = self._interact
+        return query
+
 
 class Interact(object):
     """Class Gets SNMP data.
@@ -138,6 +190,7 @@ class Interact(object):
         __init__:
         oid_exists:
         walk:
+        walk_columns:
         get:
         query:
     """
@@ -146,6 +199,12 @@ class Interact(object):
         """Function for intializing the class."""
         # Initialize key variables
         self.snmp_params = {}
+        self._authentication = None
+
+        # Results fetched during the poll, keyed by (OID, get). Interact
+        # objects only live for a single poll of a device, so no OID is
+        # fetched twice
+        self._results = {}
 
         # Assign variables
         self.snmp_params = snmp_parameters
@@ -257,6 +316,29 @@ class Interact(object):
         # Return
         return object_id
 
+    def sysuptime(self):
+        """Get the sysUpTime of the device.
+
+        Args:
+            None
+
+        Returns:
+            uptime: sysUpTime value in hundredths of a second. None if
+                the device didn't return it
+
+        """
+        # Initialize key variables
+        oid = '.1.3.6.1.2.1.1.3.0'
+        uptime = None
+
+        # Get sysUpTime
+        results = self.get(oid, connectivity_check=True)
+        if bool(results) is True and isinstance(results.get(oid), int):
+            uptime = results[oid]
+
+        # Return
+        return uptime
+
     def oid_exists(self, oid_to_get):
         """Determine existence of OID on device.
 
@@ -404,6 +486,98 @@ class Interact(object):
             oid_to_get, get=True,
             connectivity_check=connectivity_check, normalized=normalized)
 
+    def walk_columns(
+            self, oids, normalized=False, connectivity_check=False):
+        """Walk several OIDs together.
+
+        The OIDs are usually the columns of the same table. They are read
+        in a single pass over the table, so each request gets values for
+        all of them.
+
+        Args:
+            oids: List of OIDs to walk
+            normalized: If True, then return results as a dict keyed by
+                only the last node of an OID, otherwise return results
+                keyed by the entire OID string
+            connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+
+        Returns:
+            results: Dict of walk() results keyed by OID
+
+        """
+        # Initialize variables
+        results = {}
+        snmp_params = self.snmp_params
+        missing = []
+
+        # Check if OIDs are valid
+        for oid_to_get in oids:
+            valid_format = oid_valid_format(oid_to_get)
+            if valid_format is False:
+                log_message = ('OID %s has an invalid format') % (oid_to_get)
+                log.log2die(1084, log_message)
+
+        # Only walk OIDs not already walked during the poll
+        for oid_to_get in oids:
+            if (oid_to_get, False) in self._results:
+                results[oid_to_get] = self._result(
+                    oid_to_get, False, normalized)
+            elif oid_to_get not in missing:
+                missing.append(oid_to_get)
+        if bool(missing) is False:
+            return results
+
+        # Fill the results object by getting OID data
+        try:
+            (session_error_string, session_error_status,
+             session_error_index, tables) = self._walk(
+                 self._auth_object(), missing)
+
+        # Do something here
+        except Exception as exception_error:
+            # Check for errors and print out results
+            log_message = (
+                'Error occurred during SNMPwalk on host '
+                'OIDs %s from %s: (%s)') % (', '.join(missing),
+                                            snmp_params['snmp_hostname'],
+                                            exception_error)
+            log.log2die(1085, log_message)
+        except:
+            log_message = ('Unexpected error')
+            log.log2die(1086, log_message)
+
+        # Crash on error, return blank results if doing certain types of
+        # connectivity checks
+        if session_error_string:
+            log_message = (
+                'Error occurred for OIDs %s on host %s: '
+                '(%s) ErrorNum: %s, ErrorInd: '
+                '%s') % (', '.join(missing),
+                         snmp_params['snmp_hostname'],
+                         session_error_string,
+                         session_error_status, session_error_index)
+
+            blank = _process_error(
+                connectivity_check=connectivity_check,
+                session_error_status=session_error_status,
+                session_error_index=session_error_index,
+                get=False,
+                log_message=log_message)
+            for oid_to_get in missing:
+                results[oid_to_get] = dict(blank)
+            return results
+
+        # Format results, and keep them for the rest of the poll
+        for (oid_to_get, var_binds) in zip(missing, tables):
+            self._results[(oid_to_get, False)] = _format_results(
+                get=False, var_binds=var_binds)
+            results[oid_to_get] = self._result(oid_to_get, False, normalized)
+
+        # Return
+        return results
+
     def query(
             self, oid_to_get, get=False, connectivity_check=False,
             normalized=False):
@@ -426,6 +600,13 @@ class Interact(object):
             Dictionary of tuples (OID, value)
 
         """
+        # Walks are done by walking a single column
+        if get is False:
+            results = self.walk_columns(
+                [oid_to_get], normalized=normalized,
+                connectivity_check=connectivity_check)
+            return results[oid_to_get]
+
         # Initialize variables
         return_results = {}
         snmp_params = self.snmp_params
@@ -436,29 +617,16 @@ class Interact(object):
             log_message = ('OID %s has an invalid format') % (oid_to_get)
             log.log2die(1020, log_message)
 
-        # Create the object
-        snmp_object = cmdgen.CommandGenerator()
-
-        # Setup Transport object
-        transport_object = cmdgen.UdpTransportTarget(
-            (snmp_params['snmp_hostname'], snmp_params['snmp_port']))
-
-        # Create the auth object
-        authentication_object = _get_auth_object(snmp_params)
+        # Only get OIDs not already fetched during the poll
+        if (oid_to_get, True) in self._results:
+            return self._result(oid_to_get, True, normalized)
 
         # Fill the results object by getting OID data
         try:
             # Get the data
-            if get is True:
-                (session_error_string, session_error_status,
-                 session_error_index, var_binds) = \
-                    snmp_object.getCmd(
-                        authentication_object, transport_object, oid_to_get)
-            else:
-                (session_error_string, session_error_status,
-                 session_error_index, var_binds) = \
-                    snmp_object.nextCmd(
-                        authentication_object, transport_object, oid_to_get)
+            (session_error_string, session_error_status,
+             session_error_index, var_binds) = self._request(
+                 self._auth_object(), oid_to_get, get=True)
 
         # Do something here
         except Exception as exception_error:
@@ -491,13 +659,233 @@ class Interact(object):
                 get=get,
                 log_message=log_message)
 
-        # Format results
-        return_results = _format_results(
-            normalized=normalized, get=get, var_binds=var_binds)
+        # Format results, and keep them for the rest of the poll
+        self._results[(oid_to_get, True)] = _format_results(
+            get=True, var_binds=var_binds)
+        return_results = self._result(oid_to_get, True, normalized)
 
         # Return
         return return_results
 
+    def _result(self, oid_to_get, get, normalized):
+        """Get results already fetched during the poll.
+
+        Args:
+            oid_to_get: OID fetched
+            get: True if the OID was fetched with a GET, False if walked
+            normalized: If True, then return results as a dict keyed by
+                only the last node of an OID
+
+        Returns:
+            result: Copy of the results
+
+        """
+        # Return
+        result = dict(self._results[(oid_to_get, get)])
+        if normalized is True:
+            result = _normalized_walk(result)
+        return result
+
+    def _auth_object(self):
+        """Get the authentication object of the device, creating it once.
+
+        Args:
+            None
+
+        Returns:
+            result: Auth object for queries
+
+        """
+        # Return
+        if self._authentication is None:
+            self._authentication = _get_auth_object(self.snmp_params)
+        result = self._authentication
+        return result
+
+    def _walk(self, authentication_object, oids):
+        """Walk OIDs using GETBULK if the device supports it.
+
+        GETNEXT is used for SNMPv1 devices, and devices that fail to
+        answer GETBULK requests. The choice is remembered for each device.
+
+        Args:
+            authentication_object: Auth object for query
+            oids: List of OIDs to walk
+
+        Returns:
+            (session_error_string, session_error_status,
+                session_error_index, tables): Results of the walk. tables
+                is a list of var_binds for each OID
+
+        """
+        # Initialize key variables
+        snmp_params = self.snmp_params
+        key = (snmp_params['snmp_hostname'], snmp_params['snmp_port'])
+        max_repetitions = snmp_params.get('snmp_max_repetitions', 25)
+        bulk = _BULK.get(key)
+        if snmp_params['snmp_version'] == 1 or max_repetitions < 1:
+            bulk = False
+
+        # Walk using the method known to work
+        if bulk is False:
+            return self._request(authentication_object, oids)
+        result = self._request(
+            authentication_object, oids, max_repetitions=max_repetitions)
+        if bulk is True:
+            return result
+
+        # Otherwise find out whether GETBULK works. Try GETNEXT if
+        # GETBULK fails or finds nothing
+        if bool(result[0]) is False and bool(result[1]) is False:
+            if any(result[3]) is True:
+                _BULK[key] = True
+                return result
+        fallback = self._request(authentication_object, oids)
+        if bool(fallback[0]) is False and bool(fallback[1]) is False:
+            if any(fallback[3]) is True:
+                _BULK[key] = False
+                log_message = (
+                    'Host %s does not answer SNMP GETBULK requests. '
+                    'Using GETNEXT.') % (snmp_params['snmp_hostname'])
+                log.log2quiet(1076, log_message)
+
+        # Return
+        return fallback
+
+    def _request(
+            self, authentication_object, oid_to_get, get=False,
+            max_repetitions=0):
+        """Send an SNMP GET, or walk OIDs.
+
+        The shared engine of the process is used if possible. Otherwise
+        an engine is created for the request.
+
+        Args:
+            authentication_object: Auth object for query
+            oid_to_get: OID to get, or list of OIDs to walk
+            get: Flag determining whether to do a GET or WALK
+            max_repetitions: Number of rows to get with each GETBULK
+                request during walks. GETNEXT is used if 0
+
+        Returns:
+            (session_error_string, session_error_status,
+                session_error_index, var_binds): Results of the query.
+                var_binds is a list of var_binds for each OID of walks
+
+        """
+        # Initialize key variables
+        snmp_params = self.snmp_params
+
+        # Use the shared engine
+        if snmp_engine.available() is True:
+            engine = snmp_engine.engine()
+            transport_object = engine.target(
+                snmp_params['snmp_hostname'], snmp_params['snmp_port'])
+            # Each request of a walk has its own timeout, but the number
+            # of requests isn't known in advance
+            if get is True:
+                coroutine = engine.get(
+                    authentication_object, transport_object, oid_to_get)
+                timeout = engine.timeout(transport_object)
+            else:
+                coroutine = engine.walk(
+                    authentication_object, transport_object, oid_to_get,
+                    max_repetitions=max_repetitions)
+                timeout = None
+            try:
+                result = engine.run(coroutine, timeout=timeout)
+            except futures.TimeoutError:
+                result = (snmp_engine.TIMEOUT_ERROR, 0, 0, [])
+            return result
+
+        # Return
+        result = _query(
+            authentication_object, snmp_params, oid_to_get, get,
+            max_repetitions=max_repetitions)
+        return result
+
+
+def _query(
+        authentication_object, snmp_params, oid_to_get, get,
+        max_repetitions=0):
+    """Do an SNMP query with a new SNMP engine.
+
+    Args:
+        authentication_object: Auth object for query
+        snmp_params: Dict of SNMP parameters
+        oid_to_get: OID to get, or list of OIDs to walk
+        get: Flag determining whether to do a GET or WALK
+        max_repetitions: Number of rows to get with each GETBULK
+            request during walks. GETNEXT is used if 0
+
+    Returns:
+        (session_error_string, session_error_status, session_error_index,
+            var_binds): Results of the query. var_binds is a list of
+            var_binds for each OID of walks
+
+    """
+    # Create the object
+    snmp_object = cmdgen.CommandGenerator()
+
+    # Setup Transport object
+    transport_object = cmdgen.UdpTransportTarget(
+        (snmp_params['snmp_hostname'], snmp_params['snmp_port']))
+
+    # Get the data
+    if get is True:
+        result = snmp_object.getCmd(
+            authentication_object, transport_object, oid_to_get)
+        return result
+    if max_repetitions > 0:
+        (error_indication, error_status, error_index,
+         var_bind_table) = snmp_object.bulkCmd(
+             authentication_object, transport_object,
+             0, max_repetitions, *oid_to_get)
+    else:
+        (error_indication, error_status, error_index,
+         var_bind_table) = snmp_object.nextCmd(
+             authentication_object, transport_object, *oid_to_get)
+
+    # Return
+    result = (
+        error_indication, error_status, error_index,
+        _columns(oid_to_get, var_bind_table))
+    return result
+
+
+def _columns(oids, var_bind_table):
+    """Split the rows of a walk of several OIDs into a table per OID.
+
+    Rows keep values for every OID until the walk of the last OID ends.
+    Values outside the subtree of their OID, or past the end of the MIB,
+    are dropped.
+
+    Args:
+        oids: List of OIDs walked
+        var_bind_table: List of rows of (OID, value) tuples
+
+    Returns:
+        tables: List of var_binds for each OID
+
+    """
+    # Initialize key variables
+    tables = [[] for _ in oids]
+    prefixes = [('%s.') % (oid.lstrip('.')) for oid in oids]
+
+    # Process rows
+    for row in var_bind_table:
+        for (position, (oid, value)) in enumerate(row[:len(oids)]):
+            if isinstance(value, (
+                    rfc1905.EndOfMibView, rfc1905.NoSuchObject,
+                    rfc1905.NoSuchInstance)) is True:
+                continue
+            if str(oid).startswith(prefixes[position]) is False:
+                continue
+            tables[position].append([(oid, value)])
+
+    # Return
+    return tables
+
 
 def _process_error(
         connectivity_check=False, session_error_status=None,
@@ -798,22 +1186,6 @@ def oid_valid_format(oid):
     return True
 
 
-def _update_cache(filename, snmp_group):
-    """Update the SNMP credentials cache file with successful snmp_group.
-
-    Args:
-        filename: Cache filename
-        group: SNMP group that successfully authenticated
-
-    Returns:
-        None
-
-    """
-    # Do update
-    with open(filename, 'w+') as env:
-        env.write(snmp_group)
-
-
 def _contactable(params_dict):
     """Determine whether host is contactable.
 
@@ -821,16 +1193,13 @@ def _contactable(params_dict):
         params_dict: Dict of SNMP parameters to try
 
     Returns:
-        alive: True if contactable
+        query: Interact object if contactable, None if not
 
     """
-    # Initialize key variables
-    alive = False
-
     # Verify connectivity
     query = Interact(params_dict)
-    if query.contactable() is True:
-        alive = True
+    if query.contactable() is False:
+        query = None
 
     # Return
-    return alive
+    return query
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Test the cache module."""
+
+import unittest
+from mock import Mock, patch
+
+from infoset.cache import cache as testimport
+from infoset.cache import index
+
+
+class Drain(object):
+    """Class for drain.Drain mock."""
+
+    def timestamp(self):
+        """Get timestamp of data."""
+        pass
+
+    def chartable_columns(self):
+        """Get chartable data as columns."""
+        pass
+
+    def other_columns(self):
+        """Get unchartable data as columns."""
+        pass
+
+
+class Transaction(object):
+    """Class for db.Transaction mock."""
+
+    def modify(self):
+        """Queue a database modification."""
+        pass
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # ---------------------------------------------------------------------- #
+    # General object setup
+    # ---------------------------------------------------------------------- #
+
+    # Required
+    maxDiff = None
+
+    def setUp(self):
+        # Initializing key variables. "did_disabled" belongs to a
+        # disabled datapoint, so it isn't indexed
+        self.index = index.DatapointIndex(stripes=4)
+        self.index.load({'did_enabled': (1, 10, 100)})
+        self.updates = {'data': [], 'uncharted': {}, 'timestamps': {}}
+        self.ingest = Mock(spec=Drain)
+        mock_spec = {
+            'timestamp.return_value': 200,
+            'chartable_columns.return_value': [
+                (['did_enabled', 'did_disabled'], [5, 6])],
+            'other_columns.return_value': (
+                ['did_disabled', 'did_enabled'], ['down', 'up'])}
+        self.ingest.configure_mock(**mock_spec)
+
+    def test_update_chartable(self):
+        """Testing method / function _update_chartable."""
+        # Data for disabled datapoints is skipped
+        testimport._update_chartable(self.index, self.ingest, self.updates)
+        self.assertEqual(self.updates['data'], [(1, 10, 5, 200)])
+        self.assertEqual(
+            self.updates['timestamps'], {'did_enabled': (1, 10, 200)})
+
+    def test_update_unchartable(self):
+        """Testing method / function _update_unchartable."""
+        # Data for disabled datapoints is skipped
+        testimport._update_unchartable(self.index, self.ingest, self.updates)
+        self.assertEqual(self.updates['uncharted'], {1: (1, 10, 'up')})
+        self.assertEqual(
+            self.updates['timestamps'], {'did_enabled': (1, 10, 200)})
+
+
+    def test_update_datapoints(self):
+        """Testing method / function _update_datapoints."""
+        # Initializing key variables
+        transaction = Mock(spec=Transaction)
+        rows = [(1, 10, 'up'), (2, 10, 'down'), (3, 11, 'up')]
+
+        # Rows are only updated, in chunks
+        with patch.object(testimport, '_UPDATE_ROWS', 2):
+            testimport._update_datapoints(
+                transaction, rows, 'uncharted_value', 'updates.value', 1037)
+        self.assertEqual(transaction.modify.call_count, 2)
+        (sql_modify, error_code) = transaction.modify.call_args_list[0][0]
+        self.assertEqual(error_code, 1037)
+        self.assertEqual(sql_modify.startswith('UPDATE iset_datapoint'), True)
+        self.assertEqual(sql_modify.count('%s'), 6)
+        self.assertEqual(
+            transaction.modify.call_args_list[0][1],
+            {'data_list': [(1, 10, 'up', 2, 10, 'down')]})
+        self.assertEqual(
+            transaction.modify.call_args_list[1][1],
+            {'data_list': [(3, 11, 'up')]})
+
+        # Nothing to do without rows
+        transaction = Mock(spec=Transaction)
+        testimport._update_datapoints(
+            transaction, [], 'uncharted_value', 'updates.value', 1037)
+        self.assertEqual(transaction.modify.call_count, 0)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
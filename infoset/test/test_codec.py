@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Test the codec module."""
+
+import unittest
+import os
+import tempfile
+
+from infoset.utils import codec as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    data = {
+        'timestamp': 1468857600,
+        'uid': 'e92af7f044246b7976c1f3274b8f6228',
+        'chartable': {'_ifInOctets': {
+            'base_type': 'counter32',
+            'description': None,
+            'data': [[0, 19729125944, 'FastEthernet0/1']]}}
+    }
+
+    def test_content_type(self):
+        """Testing function content_type."""
+        # Parameters and aliases are handled
+        self.assertEqual(testimport.content_type(None), testimport.JSON)
+        self.assertEqual(
+            testimport.content_type('Application/JSON; charset=utf-8'),
+            testimport.JSON)
+        self.assertEqual(
+            testimport.content_type('application/x-msgpack'),
+            testimport.MSGPACK)
+
+    def test_dumps(self):
+        """Testing functions dumps and loads."""
+        # Data must be the same after encoding and decoding
+        payload = testimport.dumps(self.data)
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(testimport.loads(payload), self.data)
+
+        # Test MessagePack if installed
+        if testimport.supported(testimport.MSGPACK) is True:
+            payload = testimport.dumps(self.data, testimport.MSGPACK)
+            self.assertEqual(
+                testimport.loads(payload, testimport.MSGPACK), self.data)
+
+        # Bad data
+        with self.assertRaises(ValueError):
+            testimport.loads(b'{"bad"')
+        with self.assertRaises(ValueError):
+            testimport.loads(b'{}', 'text/plain')
+
+    def test_compress(self):
+        """Testing functions compress and decompress."""
+        # Data must be the same after compressing and decompressing
+        payload = testimport.dumps(self.data)
+        for encoding in [
+                testimport.IDENTITY, testimport.GZIP, testimport.ZSTD]:
+            if testimport.encoding_supported(encoding) is False:
+                continue
+            result = testimport.decompress(
+                testimport.compress(payload, encoding), encoding)
+            self.assertEqual(result, payload)
+
+        # Bad data
+        with self.assertRaises(ValueError):
+            testimport.decompress(payload, testimport.GZIP)
+
+        # Corrupt data with a valid gzip header
+        compressed = testimport.compress(payload, testimport.GZIP)
+        corrupt = compressed[:10] + b'\xff' * (len(compressed) - 10)
+        with self.assertRaises(ValueError):
+            testimport.decompress(corrupt, testimport.GZIP)
+
+    def test_cache_filename(self):
+        """Testing function cache_filename."""
+        # New cache filenames must be valid
+        result = testimport.cache_filename(1468857600, 'e92af7f0')
+        match = testimport.CACHE_FILENAME.match(result)
+        self.assertEqual(match.group(1), '1468857600')
+        self.assertEqual(match.group(2), 'e92af7f0')
+
+        # Older uncompressed filenames are valid
+        match = testimport.CACHE_FILENAME.match('1468857600_e92af7f0.json')
+        self.assertEqual(bool(match), True)
+        match = testimport.CACHE_FILENAME.match('1468857600_e92af7f0.jsonx')
+        self.assertEqual(bool(match), False)
+
+    def test_load(self):
+        """Testing functions dump and load."""
+        # Test compressed and uncompressed files
+        for suffix in ['.json', '.json.gz']:
+            (handle, filepath) = tempfile.mkstemp(suffix=suffix)
+            with os.fdopen(handle, 'wb') as f_handle:
+                f_handle.write(testimport.dump(self.data, filepath))
+
+            # Test
+            self.assertEqual(testimport.load(filepath), self.data)
+            os.remove(filepath)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
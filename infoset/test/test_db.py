@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Test the db module."""
+
+import unittest
+import threading
+from mock import Mock, patch
+
+from infoset.db import db as testimport
+
+
+class Config(object):
+    """Class for configuration.ConfigServer mock."""
+
+    def ingest_threads(self):
+        """Get number of ingest threads."""
+        pass
+
+
+class Connection(object):
+    """Class for pymysql.connections.Connection mock."""
+
+    def ping(self):
+        """Check the connection."""
+        pass
+
+    def close(self):
+        """Close the connection."""
+        pass
+
+
+class TestPool(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # ---------------------------------------------------------------------- #
+    # General object setup
+    # ---------------------------------------------------------------------- #
+
+    # Required
+    maxDiff = None
+
+    def setUp(self):
+        # Initializing key variables
+        self.config = Mock(spec=Config)
+        self.config.configure_mock(**{'ingest_threads.return_value': 2})
+        self.testobj = testimport.Pool(self.config, idle_check=0)
+
+    def test_acquire(self):
+        """Testing method / function acquire."""
+        # Connections are created up to the size of the pool
+        connections = [Mock(spec=Connection), Mock(spec=Connection)]
+        with patch.object(
+                testimport, '_connect', side_effect=connections) as connect:
+            first = self.testobj.acquire()
+            second = self.testobj.acquire()
+        self.assertEqual([first, second], connections)
+        self.assertEqual(connect.call_count, 2)
+        self.assertEqual(self.testobj.stats()['created'], 2)
+
+        # Released connections are reused, most recent first
+        self.testobj.release(first)
+        self.testobj.release(second)
+        with patch.object(testimport, '_connect') as connect:
+            self.assertEqual(self.testobj.acquire(), second)
+        self.assertEqual(connect.call_count, 0)
+        second.ping.assert_called_once_with(reconnect=False)
+
+        # Test counters
+        stats = self.testobj.stats()
+        self.assertEqual(stats['acquired'], 3)
+        self.assertEqual(stats['released'], 2)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['created'], 2)
+
+    def test_acquire_connect_error(self):
+        """Testing method / function acquire when connecting fails."""
+        # The slot is freed
+        with patch.object(
+                testimport, '_connect', side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, self.testobj.acquire)
+        self.assertEqual(self.testobj.stats()['created'], 0)
+
+    def test_acquire_gone_away(self):
+        """Testing method / function acquire when MySQL has gone away."""
+        # Create an idle connection that fails the ping
+        stale = Mock(spec=Connection)
+        stale.configure_mock(**{'ping.side_effect': RuntimeError})
+        fresh = Mock(spec=Connection)
+        with patch.object(testimport, '_connect', return_value=stale):
+            self.testobj.release(self.testobj.acquire())
+
+        # The stale connection is replaced in the same slot
+        with patch.object(testimport, '_connect', return_value=fresh):
+            self.assertEqual(self.testobj.acquire(), fresh)
+        stale.close.assert_called_once_with()
+        stats = self.testobj.stats()
+        self.assertEqual(stats['reconnects'], 1)
+        self.assertEqual(stats['created'], 1)
+
+    def test_acquire_reconnect_error(self):
+        """Testing method / function acquire when reconnecting fails."""
+        # Create an idle connection that fails the ping
+        stale = Mock(spec=Connection)
+        stale.configure_mock(**{'ping.side_effect': RuntimeError})
+        with patch.object(testimport, '_connect', return_value=stale):
+            self.testobj.release(self.testobj.acquire())
+
+        # The slot is freed when the reconnect fails
+        with patch.object(
+                testimport, '_connect', side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, self.testobj.acquire)
+        stats = self.testobj.stats()
+        self.assertEqual(stats['created'], 0)
+        self.assertEqual(stats['reconnects'], 0)
+
+        # New connections can still be created
+        with patch.object(
+                testimport, '_connect',
+                side_effect=[Mock(spec=Connection), Mock(spec=Connection)]):
+            self.testobj.acquire()
+            self.testobj.acquire()
+        self.assertEqual(self.testobj.stats()['created'], 2)
+
+    def test_release(self):
+        """Testing method / function release."""
+        # Discarded connections are closed, freeing their slot
+        connection = Mock(spec=Connection)
+        with patch.object(testimport, '_connect', return_value=connection):
+            self.testobj.release(self.testobj.acquire(), discard=True)
+        connection.close.assert_called_once_with()
+        stats = self.testobj.stats()
+        self.assertEqual(stats['created'], 0)
+        self.assertEqual(stats['discarded'], 1)
+        self.assertEqual(stats['idle'], 0)
+
+    def test_acquire_wait_discard(self):
+        """Testing method / function acquire when holders discard."""
+        # Exhaust the pool
+        with patch.object(
+                testimport, '_connect',
+                side_effect=[Mock(spec=Connection), Mock(spec=Connection)]):
+            holders = [self.testobj.acquire(), self.testobj.acquire()]
+
+        # Wait for a connection in another thread
+        fresh = Mock(spec=Connection)
+        result = []
+        with patch.object(testimport, '_connect', return_value=fresh):
+            waiter = threading.Thread(
+                target=lambda: result.append(self.testobj.acquire()))
+            waiter.daemon = True
+            waiter.start()
+            waiter.join(0.2)
+            self.assertEqual(waiter.is_alive(), True)
+
+            # Discarding broken connections frees slots for the waiter
+            for connection in holders:
+                self.testobj.release(connection, discard=True)
+            waiter.join(5)
+        self.assertEqual(waiter.is_alive(), False)
+        self.assertEqual(result, [fresh])
+        stats = self.testobj.stats()
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['waits'], 1)
+
+    def test_close(self):
+        """Testing method / function close."""
+        # Idle connections are closed
+        connection = Mock(spec=Connection)
+        with patch.object(testimport, '_connect', return_value=connection):
+            self.testobj.release(self.testobj.acquire())
+        self.testobj.close()
+        connection.close.assert_called_once_with()
+        self.assertEqual(self.testobj.stats()['created'], 0)
+        self.assertEqual(self.testobj.stats()['idle'], 0)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Test the index module."""
+
+import unittest
+import threading
+from infoset.cache import index as test_class
+
+
+class TestDatapointIndex(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # ---------------------------------------------------------------------- #
+    # General object setup
+    # ---------------------------------------------------------------------- #
+
+    # Required
+    maxDiff = None
+
+    def setUp(self):
+        # Initializing key variables
+        self.testobj = test_class.DatapointIndex(stripes=4)
+        self.testobj.load({
+            'did_one': (1, 10, 1468857600),
+            'did_two': (2, 10, 0)})
+
+    def test_get(self):
+        """Testing method / function get."""
+        # Known and unknown DIDs
+        self.assertEqual(
+            self.testobj.get('did_one'), (1, 10, 1468857600))
+        self.assertEqual(self.testobj.get('did_three'), None)
+
+    def test_update(self):
+        """Testing method / function update."""
+        # Add a DID
+        self.testobj.update('did_three', 3, 11, 0)
+        self.assertEqual(self.testobj.get('did_three'), (3, 11, 0))
+        self.assertEqual(len(self.testobj), 3)
+
+    def test_advance(self):
+        """Testing method / function advance."""
+        # Timestamps only move forward
+        self.testobj.advance('did_one', 1468857900)
+        self.assertEqual(
+            self.testobj.get('did_one'), (1, 10, 1468857900))
+        self.testobj.advance('did_one', 1468857600)
+        self.assertEqual(
+            self.testobj.get('did_one'), (1, 10, 1468857900))
+
+        # Unknown DIDs are ignored
+        self.testobj.advance('did_three', 1468857900)
+        self.assertEqual('did_three' in self.testobj, False)
+
+    def test_threads(self):
+        """Testing concurrent updates."""
+        # Initializing key variables
+        def worker(prefix):
+            for count in range(500):
+                did = ('%s_%s') % (prefix, count)
+                self.testobj.update(did, count, 1, 0)
+                self.testobj.advance(did, count)
+
+        threads = [
+            threading.Thread(target=worker, args=(prefix,))
+            for prefix in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Test
+        self.assertEqual(len(self.testobj), 4002)
+        self.assertEqual(self.testobj.get('7_499'), (499, 1, 499))
+
+
+class TestRegistry(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # ---------------------------------------------------------------------- #
+    # General object setup
+    # ---------------------------------------------------------------------- #
+
+    # Required
+    maxDiff = None
+
+    def setUp(self):
+        # Initializing key variables
+        self.testobj = test_class.Registry(stripes=4)
+        self.testobj.load({'uid_one': 10}, {'did_one': (1, 10, 0)})
+
+    def test_claim_agent(self):
+        """Testing method / function claim_agent."""
+        # Known agents can't be claimed. New ones only once
+        self.assertEqual(self.testobj.claim_agent('uid_one'), False)
+        self.assertEqual(self.testobj.claim_agent('uid_two'), True)
+        self.assertEqual(self.testobj.claim_agent('uid_two'), False)
+
+    def test_agent_idx(self):
+        """Testing method / function agent_idx."""
+        # Claimed agents have no index until it is set
+        self.assertEqual(self.testobj.agent_idx('uid_one'), 10)
+        self.testobj.claim_agent('uid_two')
+        self.assertEqual(self.testobj.agent_idx('uid_two'), None)
+        self.testobj.update_agent('uid_two', 11)
+        self.assertEqual(self.testobj.agent_idx('uid_two'), 11)
+
+    def test_agent_lock(self):
+        """Testing method / function agent_lock."""
+        # Each agent gets its own lock
+        lock = self.testobj.agent_lock('uid_one')
+        self.assertIs(self.testobj.agent_lock('uid_one'), lock)
+        self.assertIsNot(self.testobj.agent_lock('uid_two'), lock)
+
+    def test_missing(self):
+        """Testing method / function missing."""
+        # Test
+        result = self.testobj.missing(['did_one', 'did_two', 'did_three'])
+        self.assertEqual(result, set(['did_two', 'did_three']))
+
+    def test_disable(self):
+        """Testing method / function disable."""
+        # Disabled datapoints aren't reported as missing
+        self.testobj.disable(['did_two'])
+        result = self.testobj.missing(['did_one', 'did_two', 'did_three'])
+        self.assertEqual(result, set(['did_three']))
+        self.assertEqual(self.testobj.datapoints.get('did_two'), None)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
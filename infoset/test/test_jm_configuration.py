@@ -164,6 +164,13 @@ class TestConfigServer(unittest.TestCase):
         expected = self.configuration_dict['db_hostname']
         self.assertEqual(result, expected)
 
+    def test_poller_threads(self):
+        """Testing for poller_threads."""
+        # Initializing key variables
+        result = self.testobj.poller_threads()
+        expected = self.configuration_dict['poller_threads']
+        self.assertEqual(result, expected)
+
     def test_ingest_threads(self):
         """Testing for ingest_threads."""
         # Initializing key variables
@@ -171,6 +178,48 @@ class TestConfigServer(unittest.TestCase):
         expected = self.configuration_dict['ingest_threads']
         self.assertEqual(result, expected)
 
+    def test_ingest_batch_size(self):
+        """Testing for ingest_batch_size."""
+        # Initializing key variables
+        result = self.testobj.ingest_batch_size()
+        expected = 100
+        self.assertEqual(result, expected)
+
+    def test_ingest_max_files(self):
+        """Testing for ingest_max_files."""
+        # Initializing key variables
+        result = self.testobj.ingest_max_files()
+        expected = 50000
+        self.assertEqual(result, expected)
+
+    def test_ingest_poll_interval(self):
+        """Testing for ingest_poll_interval."""
+        # Initializing key variables
+        result = self.testobj.ingest_poll_interval()
+        expected = 1
+        self.assertEqual(result, expected)
+
+    def test_ingest_direct(self):
+        """Testing for ingest_direct."""
+        # Initializing key variables
+        result = self.testobj.ingest_direct()
+        expected = False
+        self.assertEqual(result, expected)
+
+    def test_ingest_queue_size(self):
+        """Testing for ingest_queue_size."""
+        # Initializing key variables
+        result = self.testobj.ingest_queue_size()
+        expected = 1000
+        self.assertEqual(result, expected)
+
+    def test_did_scheme(self):
+        """Testing for did_scheme."""
+        # Initializing key variables
+        result = self.testobj.did_scheme()
+        expected = 1
+        self.assertEqual(result, expected)
+
     def test_log_file(self):
         """Testing for log_file."""
         # Initializing key variables
@@ -277,6 +326,69 @@ class TestConfigAgent(unittest.TestCase):
         expected = self.configuration_dict['server_https']
         self.assertEqual(result, expected)
 
+    def test_server_content_type(self):
+        """Testing for server_content_type."""
+        # Initializing key variables
+        result = self.testobj.server_content_type()
+        expected = 'application/json'
+        self.assertEqual(result, expected)
+
+    def test_server_content_encoding(self):
+        """Testing for server_content_encoding."""
+        # Initializing key variables
+        result = self.testobj.server_content_encoding()
+        expected = 'identity'
+        self.assertEqual(result, expected)
+
+    def test_server_connect_timeout(self):
+        """Testing for server_connect_timeout."""
+        # Initializing key variables
+        result = self.testobj.server_connect_timeout()
+        expected = 5.0
+        self.assertEqual(result, expected)
+
+    def test_server_read_timeout(self):
+        """Testing for server_read_timeout."""
+        # Initializing key variables
+        result = self.testobj.server_read_timeout()
+        expected = 30.0
+        self.assertEqual(result, expected)
+
+    def test_server_retries(self):
+        """Testing for server_retries."""
+        # Initializing key variables
+        result = self.testobj.server_retries()
+        expected = 3
+        self.assertEqual(result, expected)
+
+    def test_agent_batch_size(self):
+        """Testing for agent_batch_size."""
+        # Initializing key variables
+        result = self.testobj.agent_batch_size()
+        expected = 50
+        self.assertEqual(result, expected)
+
+    def test_agent_interval(self):
+        """Testing for agent_interval."""
+        # Initializing key variables
+        result = self.testobj.agent_interval()
+        expected = 300
+        self.assertEqual(result, expected)
+
+    def test_agent_threads(self):
+        """Testing for agent_threads."""
+        # Initializing key variables
+        result = self.testobj.agent_threads()
+        expected = 10
+        self.assertEqual(result, expected)
+
+    def test_agent_host_timeout(self):
+        """Testing for agent_host_timeout."""
+        # Initializing key variables
+        result = self.testobj.agent_host_timeout()
+        expected = 120
+        self.assertEqual(result, expected)
+
     def test_agent_name(self):
         """Testing for agent_name."""
         # Fails because directory doesn't exist
@@ -349,6 +461,7 @@ class TestConfigSNMP(unittest.TestCase):
                   snmp_authpassword: 123auth
                   snmp_privprotocol: aes
                   snmp_privpassword: 123priv
+                  snmp_max_repetitions: 10
             """
         # Create temporary configuration file
         cls.tmpdir = tempfile.mkdtemp()
@@ -383,7 +496,8 @@ class TestConfigSNMP(unittest.TestCase):
                 'snmp_authprotocol': 'sha',
                 'snmp_authpassword': 'auth123',
                 'snmp_privprotocol': 'des',
-                'snmp_privpassword': 'priv123'
+                'snmp_privpassword': 'priv123',
+                'snmp_max_repetitions': 25
             }, {
                 'group_name': 'Remote Sites',
                 'snmp_version': 3,
@@ -393,7 +507,8 @@ class TestConfigSNMP(unittest.TestCase):
                 'snmp_authprotocol': 'sha',
                 'snmp_authpassword': '123auth',
                 'snmp_privprotocol': 'aes',
-                'snmp_privpassword': '123priv'
+                'snmp_privpassword': '123priv',
+                'snmp_max_repetitions': 10
             }]
 
         # Do test
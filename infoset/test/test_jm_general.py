@@ -6,6 +6,7 @@ import shutil
 import random
 import os
 import string
+import json
 
 from infoset.utils import jm_general as testimport
 
@@ -152,6 +153,36 @@ two: test 2
         # Delete directory
         shutil.rmtree(path)
 
+    def test_atomic_json_dump(self):
+        """Testing function atomic_json_dump."""
+        # Initialize key variables
+        data = {'timestamp': 1468857600, 'uid': self.random_string}
+        path = ('/tmp/%s.json') % (self.random_string)
+        directory = os.path.dirname(path)
+        before = os.listdir(directory)
+
+        # Write file and check contents
+        testimport.atomic_json_dump(data, path)
+        with open(path, 'r') as f_handle:
+            self.assertEqual(json.load(f_handle), data)
+
+        # No temporary files must be left behind
+        after = os.listdir(directory)
+        self.assertEqual(
+            set(after) - set(before), set([os.path.basename(path)]))
+
+        # Permissions must be those of files created with open()
+        umask = os.umask(0o022)
+        try:
+            os.remove(path)
+            testimport.atomic_json_dump(data, path)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        finally:
+            os.umask(umask)
+
+        # Delete file
+        os.remove(path)
+
     def test_cleanstring(self):
         """Testing method / function cleanstring."""
         # Initializing key variables
@@ -463,6 +463,29 @@ bafc92b016597fb56ec51e57668')
         # self.assertEqual(result, False)
         print(result)
 
+    def test_datapoints(self):
+        """Test reading and checking data in a single pass."""
+        # Good data is provided, with chartable values as floats
+        testobj = test_class.ValidateCache(data=self.config_good_dict)
+        groups = []
+        for (data_type, label, _, base_type, rows) in testobj.datapoints():
+            groups.append((data_type, label, base_type, list(rows)))
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(
+            groups[0][:3], ('chartable', '_ifInOctets', 'counter32'))
+        self.assertEqual(
+            groups[0][3][0], (0, 19729125944.0, 'FastEthernet0/1'))
+        self.assertEqual(testobj.errors, [])
+        self.assertEqual(testobj.valid(), True)
+
+        # Non numeric chartable values are reported
+        data = json.loads(json.dumps(self.config_good_dict))
+        data['chartable']['_ifInOctets']['data'][1][1] = 'bad'
+        testobj = test_class.ValidateCache(data=data)
+        self.assertEqual(testobj.valid(), False)
+        self.assertEqual(len(testobj.errors), 1)
+        print(testobj.errors)
+
 
 def _filename(timestamp, uid):
     """This is to make naming files easier."""
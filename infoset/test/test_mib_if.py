@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test the mib_if module."""
+
+import unittest
+from mock import Mock
+
+from infoset.snmp import mib_if as testimport
+
+
+class Query(object):
+    """Class for snmp_manager.Query mock.
+
+    A detailed tutorial about Python mocks can be found here:
+    http://www.drdobbs.com/testing/using-mocks-in-python/240168251
+
+    """
+
+    def query(self):
+        """Do an SNMP query."""
+        pass
+
+    def oid_exists(self):
+        """Determine existence of OID on device."""
+        pass
+
+    def swalk(self):
+        """Do a failsafe SNMPwalk."""
+        pass
+
+    def walk(self):
+        """Do a SNMPwalk."""
+        pass
+
+    def walk_columns(self):
+        """Do a SNMPwalk of several OIDs."""
+        pass
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # SNMPwalk results used by Mocks.
+
+    # Normalized walk returning integers
+    nwalk_results_integer = {
+        100: 1234,
+        200: 5678
+    }
+
+    # Normalized walk returning byte strings
+    nwalk_results_bytes = {
+        100: b'eth0',
+        200: b'eth1'
+    }
+
+    def test_supported(self):
+        """Testing method / function supported."""
+        # Set the stage for oid_exists returning True
+        snmpobj = Mock(spec=Query)
+        mock_spec = {'oid_exists.return_value': True}
+        snmpobj.configure_mock(**mock_spec)
+
+        # Test supported
+        testobj = testimport.init_query(snmpobj)
+        self.assertEqual(testobj.supported(), True)
+
+        # Set the stage for oid_exists returning False
+        mock_spec = {'oid_exists.return_value': False}
+        snmpobj.configure_mock(**mock_spec)
+
+        # Test unsupported
+        testobj = testimport.init_query(snmpobj)
+        self.assertEqual(testobj.supported(), False)
+
+    def test_layer1(self):
+        """Testing method / function layer1."""
+        # Initializing key variables
+        columns = testimport.IfQuery.columns
+        walk_results = {}
+        for name, (oid, _) in columns.items():
+            if name in ['ifDescr', 'ifName', 'ifAlias', 'ifPhysAddress']:
+                walk_results[oid] = self.nwalk_results_bytes
+            else:
+                walk_results[oid] = self.nwalk_results_integer
+
+        # Set the stage for SNMPwalk of all columns at once
+        snmpobj = Mock(spec=Query)
+        mock_spec = {'walk_columns.return_value': walk_results}
+        snmpobj.configure_mock(**mock_spec)
+
+        # Get results
+        testobj = testimport.init_query(snmpobj)
+        results = testobj.layer1()
+
+        # The table is only walked once
+        self.assertEqual(snmpobj.walk_columns.call_count, 1)
+        self.assertEqual(snmpobj.walk.call_count, 0)
+
+        # Basic testing of results
+        self.assertEqual(sorted(results.keys()), [100, 200])
+        self.assertEqual(len(results[100]), len(columns))
+        self.assertEqual(results[100]['ifInOctets'], 1234)
+        self.assertEqual(results[200]['ifDescr'], 'eth1')
+        self.assertEqual(results[100]['ifPhysAddress'], '65746830')
+
+    def test_ifdescr(self):
+        """Testing method / function ifdescr."""
+        # Set the stage for SNMPwalk
+        snmpobj = Mock(spec=Query)
+        mock_spec = {'swalk.return_value': self.nwalk_results_bytes}
+        snmpobj.configure_mock(**mock_spec)
+
+        # Get results
+        testobj = testimport.init_query(snmpobj)
+        results = testobj.ifdescr(safe=True)
+
+        # Basic testing of results
+        self.assertEqual(results, {100: 'eth0', 200: 'eth1'})
+        snmpobj.swalk.assert_called_once_with(
+            '.1.3.6.1.2.1.2.2.1.2', normalized=True)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Test the pool module."""
+
+import threading
+import unittest
+
+from infoset.utils import pool as testimport
+
+
+def _square(value, offset=0):
+    """Square a value, failing for negative values."""
+    if value < 0:
+        raise ValueError(value)
+    return value * value + offset
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_map(self):
+        """Testing method / function map."""
+        # Initialize key variables
+        results = {}
+        errors = {}
+
+        # Run tasks
+        with testimport.Pool(threads=3) as workers:
+            for (item, result, error) in workers.map(
+                    _square, [1, 2, -3, 4], offset=1):
+                if error is None:
+                    results[item] = result
+                else:
+                    errors[item] = error
+
+        # Results and exceptions are returned for each item
+        self.assertEqual(results, {1: 2, 2: 5, 4: 17})
+        self.assertEqual(list(errors.keys()), [-3])
+        self.assertEqual(isinstance(errors[-3], ValueError), True)
+
+    def test_shutdown(self):
+        """Testing method / function shutdown."""
+        # Initialize key variables
+        before = threading.active_count()
+
+        # Threads are stopped when leaving the context
+        for _ in range(3):
+            with testimport.Pool(threads=5) as workers:
+                future = workers.submit(_square, 3)
+            self.assertEqual(future.result(), 9)
+        self.assertEqual(threading.active_count(), before)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test the snmp_capabilities module."""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from infoset.snmp import snmp_capabilities as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Device values
+    hostname = 'switch'
+    sysobjectid = '.1.3.6.1.4.1.9.1.1208'
+    sysuptime = 1000
+    supported = {'IfQuery': True, 'LldpQuery': False}
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.cache = testimport.Cache(
+            filename=os.path.join(self.directory, 'capabilities.db'),
+            ttl=60)
+
+    def tearDown(self):
+        """Delete the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_get(self):
+        """Testing method / function get."""
+        # Nothing cached
+        result = self.cache.get(
+            self.hostname, self.sysobjectid, self.sysuptime)
+        self.assertEqual(result, {})
+
+        # Cached results are valid while the device keeps running
+        self.cache.set(
+            self.hostname, self.sysobjectid, self.sysuptime, self.supported)
+        result = self.cache.get(
+            self.hostname, self.sysobjectid, self.sysuptime + 6000)
+        self.assertEqual(result, self.supported)
+
+        # The device was restarted
+        result = self.cache.get(
+            self.hostname, self.sysobjectid, self.sysuptime - 1)
+        self.assertEqual(result, {})
+
+        # The device is a different model
+        result = self.cache.get(
+            self.hostname, '.1.3.6.1.4.1.9.1.1', self.sysuptime)
+        self.assertEqual(result, {})
+
+        # The results are too old
+        self.cache.set(
+            self.hostname, self.sysobjectid, self.sysuptime, self.supported,
+            updated=time.time() - 61)
+        result = self.cache.get(
+            self.hostname, self.sysobjectid, self.sysuptime)
+        self.assertEqual(result, {})
+
+    def test_invalidate(self):
+        """Testing method / function invalidate."""
+        # Cache, then invalidate
+        self.cache.set(
+            self.hostname, self.sysobjectid, self.sysuptime, self.supported)
+        self.cache.invalidate(self.hostname)
+        result = self.cache.get(
+            self.hostname, self.sysobjectid, self.sysuptime)
+        self.assertEqual(result, {})
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
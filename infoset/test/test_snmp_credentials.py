@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Test the snmp_credentials module."""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import threading
+from mock import patch
+
+from infoset.snmp import snmp_credentials as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Device values
+    hostname = 'switch'
+    group_name = 'Remote Sites'
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.cache = testimport.Cache(
+            filename=os.path.join(self.directory, 'credentials.db'))
+
+    def tearDown(self):
+        """Delete the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_success(self):
+        """Testing method / function success."""
+        # Nothing cached
+        self.assertEqual(self.cache.get(self.hostname), (None, 0))
+
+        # Cache a working group
+        self.cache.success(self.hostname, self.group_name)
+        self.assertEqual(
+            self.cache.get(self.hostname), (self.group_name, 0))
+
+    def test_failure(self):
+        """Testing method / function failure."""
+        # Devices aren't backed off after the first few failures
+        self.cache.success(self.hostname, self.group_name)
+        for _ in range(testimport.FAILURES - 1):
+            self.assertEqual(self.cache.failure(self.hostname), 0)
+        self.assertEqual(
+            self.cache.get(self.hostname), (self.group_name, 0))
+
+        # Then the backoff period doubles, up to a maximum
+        self.assertEqual(self.cache.failure(self.hostname), testimport.BACKOFF)
+        self.assertEqual(
+            self.cache.failure(self.hostname), testimport.BACKOFF * 2)
+        for _ in range(10):
+            backoff = self.cache.failure(self.hostname)
+        self.assertEqual(backoff, testimport.MAX_BACKOFF)
+
+        # The group that last worked is kept
+        (group_name, retry_after) = self.cache.get(self.hostname)
+        self.assertEqual(group_name, self.group_name)
+        self.assertEqual(retry_after > time.time(), True)
+
+        # Success resets the count
+        self.cache.success(self.hostname, self.group_name)
+        self.assertEqual(self.cache.failure(self.hostname), 0)
+
+    def test_failure_concurrent(self):
+        """Testing method / function failure from several threads."""
+        # Every failure is counted
+        threads = [
+            threading.Thread(
+                target=self.cache.failure, args=(self.hostname,))
+            for _ in range(testimport.FAILURES + 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            self.cache.failure(self.hostname), testimport.BACKOFF * 4)
+
+    def test___init__(self):
+        """Testing method / function __init__."""
+        # The table is only created once per file
+        with patch.object(
+                testimport.jm_general, 'sqlite_transaction') as transaction:
+            testimport.Cache(filename=self.cache.filename)
+        self.assertEqual(transaction.call_count, 0)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
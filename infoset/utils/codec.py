@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Infoset serialization library for agent data.
+
+The fastest installed JSON library is used. The standard library "json"
+module is used if neither orjson nor ujson is installed. MessagePack is
+available when msgpack is installed.
+
+Payloads and cache files can be compressed with gzip, or with zstd when
+zstandard is installed.
+
+"""
+
+import re
+import gzip
+import json
+import zlib
+
+# Infoset libraries
+from infoset.utils import log
+
+# Optional libraries
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+_ALIASES = {
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.msgpack': MSGPACK
+}
+
+# Content encodings
+IDENTITY = 'identity'
+GZIP = 'gzip'
+ZSTD = 'zstd'
+
+# Cache filenames start with a numeric timestamp, then a hex agent UID.
+# The extension shows whether the file is compressed
+CACHE_FILENAME = re.compile(r'^(\d+)_([0-9a-f]+)\.json(\.gz|\.zst)?$')
+
+
+def content_type(value):
+    """Get the content type of data from a Content-Type header.
+
+    Args:
+        value: Content-Type header value
+
+    Returns:
+        result: Content type without parameters. JSON if value is empty
+
+    """
+    # Initialize key variables
+    if bool(value) is False:
+        return JSON
+
+    # Remove parameters such as "charset"
+    result = value.split(';')[0].strip().lower()
+    result = _ALIASES.get(result, result)
+    return result
+
+
+def content_encoding(value):
+    """Get the content encoding of data from a Content-Encoding header.
+
+    Args:
+        value: Content-Encoding header value
+
+    Returns:
+        encoding: Content encoding. IDENTITY if value is empty
+
+    """
+    # Return
+    if bool(value) is False:
+        return IDENTITY
+    encoding = value.strip().lower()
+    if encoding == 'x-gzip':
+        encoding = GZIP
+    return encoding
+
+
+def supported(ctype):
+    """Determine whether a content type can be encoded and decoded.
+
+    Args:
+        ctype: Content type
+
+    Returns:
+        result: True if supported
+
+    """
+    # Initialize key variables
+    result = False
+
+    # Check
+    ctype = content_type(ctype)
+    if ctype == JSON:
+        result = True
+    elif ctype == MSGPACK and msgpack is not None:
+        result = True
+    return result
+
+
+def dumps(data, ctype=JSON):
+    """Encode data.
+
+    Args:
+        data: Data to encode
+        ctype: Content type to use
+
+    Returns:
+        payload: Encoded data as bytes
+
+    """
+    # Initialize key variables
+    ctype = content_type(ctype)
+
+    # Encode
+    if ctype == JSON:
+        if orjson is not None:
+            # Convert non string keys like the "json" module does
+            payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        elif ujson is not None:
+            payload = ujson.dumps(data).encode()
+        else:
+            payload = json.dumps(data).encode()
+    elif ctype == MSGPACK and msgpack is not None:
+        payload = msgpack.packb(data, use_bin_type=True)
+    else:
+        log_message = ('Content type %s is not supported.') % (ctype)
+        log.log2die(1066, log_message)
+
+    # Return
+    return payload
+
+
+def loads(payload, ctype=JSON):
+    """Decode data.
+
+    Args:
+        payload: Encoded data as bytes or str
+        ctype: Content type of the payload
+
+    Returns:
+        data: Decoded data. ValueError is raised if the payload can't
+            be decoded
+
+    """
+    # Initialize key variables
+    ctype = content_type(ctype)
+
+    # Decode
+    if ctype == JSON:
+        if orjson is not None:
+            data = orjson.loads(payload)
+        elif ujson is not None:
+            data = ujson.loads(payload)
+        else:
+            # json.loads() only accepts bytes from Python 3.6
+            if isinstance(payload, bytes) is True:
+                payload = payload.decode('utf-8')
+            data = json.loads(payload)
+    elif ctype == MSGPACK and msgpack is not None:
+        try:
+            data = msgpack.unpackb(payload, raw=False)
+        except Exception as exception_error:
+            raise ValueError(exception_error)
+    else:
+        raise ValueError(('Content type %s is not supported.') % (ctype))
+
+    # Return
+    return data
+
+
+def encoding_supported(encoding):
+    """Determine whether a content encoding can be used.
+
+    Args:
+        encoding: Content encoding
+
+    Returns:
+        result: True if supported
+
+    """
+    # Initialize key variables
+    result = False
+
+    # Check
+    encoding = content_encoding(encoding)
+    if encoding in [IDENTITY, GZIP]:
+        result = True
+    elif encoding == ZSTD and zstandard is not None:
+        result = True
+    return result
+
+
+def compress(payload, encoding=GZIP):
+    """Compress data.
+
+    Args:
+        payload: Data as bytes
+        encoding: Content encoding to use
+
+    Returns:
+        result: Compressed data as bytes
+
+    """
+    # Initialize key variables
+    encoding = content_encoding(encoding)
+
+    # Compress
+    if encoding == IDENTITY:
+        result = payload
+    elif encoding == GZIP:
+        result = gzip.compress(payload, compresslevel=6)
+    elif encoding == ZSTD and zstandard is not None:
+        result = zstandard.ZstdCompressor().compress(payload)
+    else:
+        log_message = ('Content encoding %s is not supported.') % (encoding)
+        log.log2die(1068, log_message)
+
+    # Return
+    return result
+
+
+def decompress(payload, encoding=GZIP):
+    """Decompress data.
+
+    Args:
+        payload: Compressed data as bytes
+        encoding: Content encoding of the data
+
+    Returns:
+        result: Data as bytes. ValueError is raised if the payload can't
+            be decompressed
+
+    """
+    # Initialize key variables
+    encoding = content_encoding(encoding)
+
+    # Decompress
+    if encoding == IDENTITY:
+        result = payload
+    elif encoding == GZIP:
+        try:
+            result = gzip.decompress(payload)
+        except (OSError, EOFError, zlib.error) as exception_error:
+            raise ValueError(exception_error)
+    elif encoding == ZSTD and zstandard is not None:
+        try:
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+            result = decompressor.decompress(payload)
+        except zstandard.ZstdError as exception_error:
+            raise ValueError(exception_error)
+    else:
+        raise ValueError(
+            ('Content encoding %s is not supported.') % (encoding))
+
+    # Return
+    return result
+
+
+def cache_extension():
+    """Get the extension to use for new cache files.
+
+    Args:
+        None
+
+    Returns:
+        result: Extension. Cache files are compressed with zstd if
+            possible, otherwise gzip
+
+    """
+    # Return
+    if zstandard is not None:
+        result = '.json.zst'
+    else:
+        result = '.json.gz'
+    return result
+
+
+def cache_filename(timestamp, uid):
+    """Create the name of a new cache file.
+
+    Args:
+        timestamp: Timestamp of the data
+        uid: UID of the agent
+
+    Returns:
+        result: Filename without a directory
+
+    """
+    # Return
+    result = ('%s_%s%s') % (timestamp, uid, cache_extension())
+    return result
+
+
+def load(filepath):
+    """Read data from a JSON file.
+
+    The file is decompressed if its name ends with ".gz" or ".zst".
+
+    Args:
+        filepath: Name of file
+
+    Returns:
+        data: Decoded data. ValueError is raised if the file can't
+            be decoded
+
+    """
+    # Read and decode
+    with open(filepath, 'rb') as f_handle:
+        payload = f_handle.read()
+    data = loads(decompress(payload, _file_encoding(filepath)))
+    return data
+
+
+def dump(data, filepath):
+    """Create the contents of a JSON file.
+
+    The data is compressed if the filename ends with ".gz" or ".zst".
+
+    Args:
+        data: Data to encode
+        filepath: Name of file
+
+    Returns:
+        payload: File contents as bytes
+
+    """
+    # Return
+    payload = compress(dumps(data), _file_encoding(filepath))
+    return payload
+
+
+def _file_encoding(filepath):
+    """Get the content encoding of a file from its name.
+
+    Args:
+        filepath: Name of file
+
+    Returns:
+        encoding: Content encoding
+
+    """
+    # Initialize key variables
+    encoding = IDENTITY
+
+    # Check extension
+    if filepath.endswith('.gz') is True:
+        encoding = GZIP
+    elif filepath.endswith('.zst') is True:
+        encoding = ZSTD
+    return encoding
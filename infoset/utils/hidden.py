@@ -96,19 +96,34 @@ class File:
         value = ('%s/%s.uid') % (self.directory.uid(), prefix)
         return value
 
-    def snmp_cache(self, prefix):
-        """Method for defining the hidden snmp_cache directory.
+    def snmp_capabilities(self):
+        """Method for defining the hidden SNMP capabilities database.
 
         Args:
-            prefix: Prefix of file
+            None
 
         Returns:
-            value: snmp_cache directory
+            value: SNMP capabilities database file
+
+        """
+        # Return
+        _mkdir(self.directory.snmp_cache())
+        value = ('%s/capabilities.db') % (self.directory.snmp_cache())
+        return value
+
+    def snmp_credentials(self):
+        """Method for defining the hidden SNMP credentials database.
+
+        Args:
+            None
+
+        Returns:
+            value: SNMP credentials database file
 
         """
         # Return
         _mkdir(self.directory.snmp_cache())
-        value = ('%s/%s.yaml') % (self.directory.snmp_cache(), prefix)
+        value = ('%s/credentials.db') % (self.directory.snmp_cache())
         return value
 
     def pid(self, prefix):
@@ -291,6 +291,27 @@ class ConfigServer(object):
         result = self.config_dict['db_hostname']
         return result
 
+    def poller_threads(self):
+        """Get poller_threads.
+
+        The number of devices polled, or web pages made, at the same time.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'poller_threads' in self.config_dict:
+            result = int(self.config_dict['poller_threads'])
+        else:
+            result = 10
+
+        # Return
+        return max(1, result)
+
     def ingest_threads(self):
         """Get ingest_threads.
 
@@ -305,6 +326,140 @@ class ConfigServer(object):
         result = self.config_dict['ingest_threads']
         return result
 
+    def ingest_batch_size(self):
+        """Get ingest_batch_size.
+
+        The maximum number of cache files for an agent UID that are
+        applied to the database in a single transaction.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'ingest_batch_size' in self.config_dict:
+            result = int(self.config_dict['ingest_batch_size'])
+        else:
+            result = 100
+
+        # Return
+        return max(1, result)
+
+    def ingest_max_files(self):
+        """Get ingest_max_files.
+
+        The maximum number of cache files to process per ingest cycle.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'ingest_max_files' in self.config_dict:
+            result = int(self.config_dict['ingest_max_files'])
+        else:
+            result = 50000
+
+        # Return
+        return max(1, result)
+
+    def ingest_poll_interval(self):
+        """Get ingest_poll_interval.
+
+        The maximum number of seconds between scans of the ingest
+        cache directory.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'ingest_poll_interval' in self.config_dict:
+            result = int(self.config_dict['ingest_poll_interval'])
+        else:
+            result = 1
+
+        # Return
+        return max(1, result)
+
+    def ingest_direct(self):
+        """Get ingest_direct.
+
+        When True, the web server applies data received from agents to
+        the database itself. The ingest cache directory is only used
+        when this can't be done.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = False
+        if 'ingest_direct' in self.config_dict:
+            if self.config_dict['ingest_direct'] is True:
+                result = True
+
+        # Return
+        return result
+
+    def ingest_queue_size(self):
+        """Get ingest_queue_size.
+
+        The maximum number of agent posts waiting to be applied to
+        the database when ingest_direct is True.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'ingest_queue_size' in self.config_dict:
+            result = int(self.config_dict['ingest_queue_size'])
+        else:
+            result = 1000
+
+        # Return
+        return max(1, result)
+
+    def did_scheme(self):
+        """Get did_scheme.
+
+        The version of the scheme used to create datapoint IDs. Scheme 2
+        requires the "id_fast" column of the iset_datapoint table, which
+        sample_code/sql/migrate_id_fast.sql adds to existing databases.
+        Datapoints created with scheme 1 are migrated as they are seen.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 1
+        if 'did_scheme' in self.config_dict:
+            if int(self.config_dict['did_scheme']) == 2:
+                result = 2
+
+        # Return
+        return result
+
     def log_file(self):
         """Get log_file.
 
@@ -414,6 +569,182 @@ class ConfigAgent(object):
         result = self.config_dict['server_https']
         return result
 
+    def server_content_type(self):
+        """Get server_content_type.
+
+        The content type used to post data to the server.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'server_content_type' in self.config_dict:
+            result = self.config_dict['server_content_type']
+        else:
+            result = 'application/json'
+        return result
+
+    def server_content_encoding(self):
+        """Get server_content_encoding.
+
+        The compression used to post data to the server. "identity",
+        the default, disables it. Servers that can't decompress posts
+        are sent uncompressed data instead.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'server_content_encoding' in self.config_dict:
+            result = self.config_dict['server_content_encoding']
+        else:
+            result = 'identity'
+        return result
+
+    def server_connect_timeout(self):
+        """Get server_connect_timeout.
+
+        Seconds to wait for a connection to the server.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'server_connect_timeout' in self.config_dict:
+            result = float(self.config_dict['server_connect_timeout'])
+        else:
+            result = 5.0
+        return result
+
+    def server_read_timeout(self):
+        """Get server_read_timeout.
+
+        Seconds to wait for the server to respond to a post.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'server_read_timeout' in self.config_dict:
+            result = float(self.config_dict['server_read_timeout'])
+        else:
+            result = 30.0
+        return result
+
+    def server_retries(self):
+        """Get server_retries.
+
+        The number of times to retry a failed post before caching the
+        data.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'server_retries' in self.config_dict:
+            result = int(self.config_dict['server_retries'])
+        else:
+            result = 3
+        return result
+
+    def agent_batch_size(self):
+        """Get agent_batch_size.
+
+        The maximum number of cached samples to post to the server at
+        once.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'agent_batch_size' in self.config_dict:
+            result = int(self.config_dict['agent_batch_size'])
+        else:
+            result = 50
+        return result
+
+    def agent_interval(self):
+        """Get agent_interval.
+
+        Seconds between polls.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'agent_interval' in self.config_dict:
+            result = int(self.config_dict['agent_interval'])
+        else:
+            result = 300
+        return result
+
+    def agent_threads(self):
+        """Get agent_threads.
+
+        The maximum number of hosts to poll at once.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'agent_threads' in self.config_dict:
+            result = int(self.config_dict['agent_threads'])
+        else:
+            result = 10
+        return result
+
+    def agent_host_timeout(self):
+        """Get agent_host_timeout.
+
+        Seconds that polling a host may take before it is reported as
+        slow, and no longer waited for.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        if 'agent_host_timeout' in self.config_dict:
+            result = int(self.config_dict['agent_host_timeout'])
+        else:
+            result = 120
+        return result
+
     def log_file(self):
         """Get log_file.
 
@@ -540,6 +871,7 @@ class ConfigSNMP(object):
         seed_dict['snmp_privprotocol'] = None
         seed_dict['snmp_privpassword'] = None
         seed_dict['snmp_port'] = 161
+        seed_dict['snmp_max_repetitions'] = 25
         seed_dict['group_name'] = None
 
         # Read configuration's SNMP information. Return 'None' if none found
@@ -568,6 +900,8 @@ class ConfigSNMP(object):
             # Convert relevant strings to integers
             new_dict['snmp_version'] = int(new_dict['snmp_version'])
             new_dict['snmp_port'] = int(new_dict['snmp_port'])
+            new_dict['snmp_max_repetitions'] = int(
+                new_dict['snmp_max_repetitions'])
 
             # Append data to list
             snmp_data.append(new_dict)
@@ -5,10 +5,14 @@ import os
 import shutil
 import json
 import time
+import sqlite3
+import binascii
+import contextlib
 import yaml
 
 # Infoset libraries
 from infoset.utils import log
+from infoset.utils import codec
 
 
 def validate_timestamp(timestamp):
@@ -127,6 +131,85 @@ def delete_files(target_dir):
             log.log2die(1015, log_message)
 
 
+def atomic_json_dump(data, filepath):
+    """Write data to a JSON file that is never seen partially written.
+
+    The file is compressed if its name ends with ".gz" or ".zst".
+
+    Args:
+        data: Data to write
+        filepath: Name of file
+
+    Returns:
+        None
+
+    """
+    # Write
+    atomic_write(codec.dump(data, filepath), filepath)
+
+
+def atomic_write(payload, filepath):
+    """Write bytes to a file that is never seen partially written.
+
+    The data is written to a hidden temporary file in the same directory,
+    then renamed into place.
+
+    Args:
+        payload: Bytes to write
+        filepath: Name of file
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    (directory, filename) = os.path.split(os.path.abspath(filepath))
+
+    # Write to a temporary file. It starts with a "." so that it is
+    # ignored by readers looking for completed files. Unlike
+    # tempfile.mkstemp(), which always uses mode 0600, the file gets
+    # the same permissions as files created with open()
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    while True:
+        temp_filepath = os.path.join(directory, ('.%s.%s.tmp') % (
+            filename, binascii.hexlify(os.urandom(6)).decode()))
+        try:
+            handle = os.open(temp_filepath, flags, 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(handle, 'wb') as f_handle:
+            f_handle.write(payload)
+        os.rename(temp_filepath, filepath)
+    except:
+        if os.path.exists(temp_filepath) is True:
+            os.remove(temp_filepath)
+        raise
+
+
+@contextlib.contextmanager
+def sqlite_transaction(filename):
+    """Connect to a SQLite database for a single transaction.
+
+    Args:
+        filename: Name of database file
+
+    Returns:
+        connection: sqlite3.Connection object. The transaction is
+            committed, or rolled back on errors, then the connection is
+            closed
+
+    """
+    # Wait for other processes to finish writing
+    connection = sqlite3.connect(filename, timeout=30)
+    try:
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
 def cleanstring(data):
     """Remove multiple whitespaces and linefeeds from string.
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Pool of threads for running many tasks at the same time."""
+
+import sys
+import threading
+from concurrent import futures
+
+# Default number of threads
+THREADS = 10
+
+
+class Pool(object):
+    """Pool of threads running tasks.
+
+    Threads are only started when there are tasks for them, and they are
+    all stopped by shutdown(). The pool can be used as a context manager,
+    which calls shutdown() when leaving the context.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        submit: Run a function in a thread
+        map: Run a function for each of a list of items
+        shutdown: Stop the threads
+
+    """
+
+    def __init__(self, threads=THREADS, name='infoset'):
+        """Method initializing the class.
+
+        Args:
+            threads: Maximum number of threads
+            name: Prefix of thread names. Ignored before Python 3.6
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables. Threads can only be named
+        # from Python 3.6
+        self.threads = max(1, int(threads))
+        if sys.version_info >= (3, 6):
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix=name)
+        else:
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=self.threads)
+
+        # Tasks that haven't finished
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def __enter__(self):
+        """Start using the pool.
+
+        Args:
+            None
+
+        Returns:
+            self: The pool
+
+        """
+        # Return
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the threads after their tasks are done.
+
+        Unstarted tasks are cancelled if leaving the context because of
+        an exception.
+
+        Args:
+            exc_type: Type of exception raised, if any
+            exc_value: Exception raised, if any
+            traceback: Traceback of exception raised, if any
+
+        Returns:
+            None
+
+        """
+        # Stop
+        self.shutdown(wait=True, cancel=exc_type is not None)
+
+    def submit(self, function, *args, **kwargs):
+        """Run a function in a thread.
+
+        Args:
+            function: Function to run
+            args: Positional arguments of the function
+            kwargs: Keyword arguments of the function
+
+        Returns:
+            future: concurrent.futures.Future object of the result
+
+        """
+        # Track the task until it finishes
+        future = self._executor.submit(function, *args, **kwargs)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+        # Return
+        return future
+
+    def map(self, function, items, *args, **kwargs):
+        """Run a function for each of a list of items.
+
+        The function is called with each item as its first argument.
+
+        Args:
+            function: Function to run
+            items: List of items
+            args: Other positional arguments of the function
+            kwargs: Keyword arguments of the function
+
+        Returns:
+            results: Generator of (item, result, error) tuples, in the
+                order tasks finish. error is the exception raised by the
+                function, None if it didn't raise one. Exceptions include
+                SystemExit, so one failed task doesn't stop the others
+
+        """
+        # Initialize key variables
+        pending = {}
+
+        # Submit
+        for item in items:
+            future = self.submit(function, item, *args, **kwargs)
+            pending[future] = item
+
+        # Return results as they are ready
+        for future in futures.as_completed(pending):
+            error = future.exception()
+            if error is None:
+                yield (pending[future], future.result(), None)
+            else:
+                yield (pending[future], None, error)
+
+    def shutdown(self, wait=True, cancel=False):
+        """Stop the threads.
+
+        Args:
+            wait: Wait for running and submitted tasks if True
+            cancel: Cancel tasks that haven't started if True
+
+        Returns:
+            None
+
+        """
+        # Cancel tasks
+        if cancel is True:
+            with self._lock:
+                pending = list(self._pending)
+            for future in pending:
+                future.cancel()
+
+        # Stop
+        self._executor.shutdown(wait=wait)
+
+    def _done(self, future):
+        """Stop tracking a finished task.
+
+        Args:
+            future: concurrent.futures.Future object of the task
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self._pending.discard(future)
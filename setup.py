@@ -22,7 +22,9 @@ setup(
     classifiers=[
       # Get strings from http://pypi.python.org/pypi?%3Aaction=list_classifiers
     "Environment :: Console",
-    "Programming Language :: Python :: 3"
+    "Programming Language :: Python :: 3",
+    "Programming Language :: Python :: 3.5",
+    "Programming Language :: Python :: 3 :: Only"
     ],
     keywords='infoset snmp switchmap network map',
     author='UWIComputingSociety',
@@ -34,6 +36,7 @@ setup(
     include_package_data=True,
     zip_safe=False,
     install_requires=install_requires,
+    python_requires='>=3.5',
     entry_points={
         'console_scripts':
         ['infoset=infoset.toolbox:main']
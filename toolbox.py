@@ -85,7 +85,7 @@ def do_test(cli_args, config):
     """
     # Show host information
     validate = snmp_manager.Validate(cli_args.host, config.snmp_auth())
-    snmp_params = validate.credentials()
+    snmp_params = validate.credentials(backoff=False)
     snmp_object = snmp_manager.Interact(snmp_params)
 
     if bool(snmp_params) is True:
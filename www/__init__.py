@@ -12,6 +12,8 @@ from flask import Flask, url_for
 from datetime import timedelta
 import os
 from infoset.utils import ConfigServer
+from infoset.db import db
+from infoset.cache import engine
 
 # Initializes the Flask Object
 infoset = Flask(__name__)
@@ -19,10 +21,21 @@ infoset = Flask(__name__)
 # Initializes configurations for server
 global_config = ConfigServer('./infoset/sample_code/etc/')
 
+# Share persistent database connections between requests
+db.initialize_pool(global_config)
+
+# Apply agent data to the database without using cache files if required
+ingest_engine = None
+if global_config.ingest_direct() is True:
+    ingest_engine = engine.Engine(
+        global_config, queue_size=global_config.ingest_queue_size())
+    ingest_engine.start(scan=False)
+
 # Adds objects to global dict
 infoset.config.update(
     SNMP_CONFIG='infoset/etc',
-    GLOBAL_CONFIG=global_config
+    GLOBAL_CONFIG=global_config,
+    INGEST_ENGINE=ingest_engine
 )
 
 # Determines the destination of the build
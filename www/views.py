@@ -5,11 +5,13 @@ Contains all routes that infoset's Flask webserver uses
 """
 import yaml
 import time
-import json
 from infoset.db.db_agent import Get
 from infoset.db.db_data import GetIDX
 from infoset.db.db_agent import GetDataPoint
 from infoset.db.db_chart import Chart
+from infoset.utils import jm_general
+from infoset.utils import codec
+from infoset.cache.validate import ValidateCache
 from flask import render_template, jsonify, send_file, request, make_response
 from www import infoset
 from os import listdir, walk, path, makedirs, remove
@@ -128,20 +130,152 @@ def receive(uid):
     config = infoset.config['GLOBAL_CONFIG']
     cache_dir = config.ingest_cache_directory()
     
-    # Get Json from incoming agent POST
-    data = request.json
+    # Get data from incoming agent POST
+    (data, error) = _decode_post(keys=['timestamp', 'uid'])
+    if error is not None:
+        return error
+    content_type = codec.content_type(request.content_type)
+    content_encoding = codec.content_encoding(
+        request.headers.get('Content-Encoding'))
+    payload = request.get_data()
     timestamp = data['timestamp']
     data_uid = data['uid']
-    json_path = cache_dir + ("/%s_%s.json") % (timestamp, str(data_uid))
 
-    with open(json_path, "w+") as temp_file:
-        json.dump(data, temp_file)
-        temp_file.close()
+    # The timestamp and UID must make a cache filename that ingestd reads
+    if bool(codec.CACHE_FILENAME.match(
+            codec.cache_filename(timestamp, data_uid))) is False:
+        return "Bad Request", 400
+
+    # Apply valid data to the database directly if possible
+    ingest_engine = infoset.config['INGEST_ENGINE']
+    if ingest_engine is not None:
+        validator = ValidateCache(data=data)
+        if validator.valid() is True:
+            if ingest_engine.submit([validator]) is True:
+                print("Agent:%s recieved" % uid)
+                return "Received"
+
+    # Hand the file over to ingestd only when it is complete.
+    # Compressed JSON is saved as received
+    filename = ('%s_%s') % (timestamp, str(data_uid))
+    if content_type == codec.JSON and (
+            content_encoding in [codec.GZIP, codec.ZSTD]):
+        if content_encoding == codec.GZIP:
+            json_path = ('%s/%s.json.gz') % (cache_dir, filename)
+        else:
+            json_path = ('%s/%s.json.zst') % (cache_dir, filename)
+        jm_general.atomic_write(payload, json_path)
+    else:
+        json_path = ('%s/%s%s') % (
+            cache_dir, filename, codec.cache_extension())
+        jm_general.atomic_json_dump(data, json_path)
     
     print("Agent:%s recieved" % uid)
     return "Received"
 
 
+@infoset.route('/receive/<uid>/batch', methods=["POST"])
+def receive_batch(uid):
+    """Function for handling /receive/<uid>/batch route.
+
+    Agents post their cached samples in batches of the form
+    {"uid": uid, "samples": [data, ...]}.
+
+    Args:
+        uid: Unique Identifier of an Infoset Agent
+
+    Returns:
+        Text response of Received
+
+    """
+    config = infoset.config['GLOBAL_CONFIG']
+    cache_dir = config.ingest_cache_directory()
+
+    # Get data from incoming agent POST
+    (data, error) = _decode_post(keys=['samples'])
+    if error is not None:
+        return error
+    if isinstance(data['samples'], list) is False:
+        return "Bad Request", 400
+
+    # Group samples by the UID in the sample. Samples that can't be
+    # named as cache files are discarded
+    batches = {}
+    for sample in data['samples']:
+        validator = ValidateCache(data=sample)
+        if validator.check_meta() is True:
+            filename = codec.cache_filename(
+                sample['timestamp'], sample['uid'])
+            if bool(codec.CACHE_FILENAME.match(filename)) is True:
+                batches.setdefault(sample['uid'], []).append(
+                    (filename, validator))
+                continue
+        print("Agent:%s sent an invalid sample" % uid)
+
+    # Apply each agent's valid samples to the database in one
+    # transaction if possible
+    ingest_engine = infoset.config['INGEST_ENGINE']
+    for samples in batches.values():
+        validators = [validator for (_, validator) in samples]
+        if ingest_engine is not None:
+            if False not in [
+                    validator.valid() for validator in validators]:
+                if ingest_engine.submit(validators) is True:
+                    continue
+
+        # Hand the files over to ingestd otherwise. It ingests the files
+        # of each agent in a single transaction too
+        for (filename, validator) in samples:
+            json_path = ('%s/%s') % (cache_dir, filename)
+            jm_general.atomic_json_dump(validator.information, json_path)
+
+    print("Agent:%s recieved %s samples" % (uid, len(data['samples'])))
+    return "Received"
+
+
+def _decode_post(keys=None):
+    """Decode the body of an agent POST.
+
+    The Content-Type and Content-Encoding headers are used.
+
+    Args:
+        keys: List of keys the body must have. The body must be a dict
+            if not None
+
+    Returns:
+        (data, error): Decoded data, and the response to send if the
+            body can't be decoded or doesn't have the required keys.
+            error is None on success
+
+    """
+    # Initialize key variables
+    data = None
+    content_type = codec.content_type(request.content_type)
+    content_encoding = codec.content_encoding(
+        request.headers.get('Content-Encoding'))
+
+    # Decode
+    if codec.supported(content_type) is False:
+        return (data, ("Unsupported Media Type", 415))
+    if codec.encoding_supported(content_encoding) is False:
+        return (data, ("Unsupported Media Type", 415))
+    try:
+        data = codec.loads(
+            codec.decompress(request.get_data(), content_encoding),
+            content_type)
+    except ValueError:
+        return (data, ("Bad Request", 400))
+
+    # Check the keys
+    if keys is not None:
+        if isinstance(data, dict) is False:
+            return (data, ("Bad Request", 400))
+        for key in keys:
+            if key not in data:
+                return (data, ("Bad Request", 400))
+    return (data, None)
+
+
 @infoset.route('/fetch/agent/<uid>', methods=["GET", "POST"])
 def fetch_agent_dp(uid):
     """Function for handling /fetch/agent/<uid> route.